@@ -0,0 +1,336 @@
+# ==========================================
+# INSTANTÁNEA BINARIA COMPACTA
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Alternativa a estudiantes.json (que con indent=4 es sobre todo espacios y
+# claves repetidas). Se activa en control_notas.py con
+# NOTAS_ALMACENAMIENTO=binario.
+#
+# - Las cadenas se guardan una sola vez en un diccionario y cada campo de
+#   texto es un índice de 4 bytes.
+# - Cada estudiante es una fila de ancho fijo (struct): índices de sus
+#   cadenas, año, ingreso del padre y dónde empiezan sus notas.
+# - Las notas van en dos columnas (array): materia (índice de cadena) y nota.
+# - Lo que no encaja en ese esquema (campos extra como "version", tipos
+#   distintos de los habituales) se guarda como JSON aparte para cada
+#   estudiante, junto con el orden de sus claves, así que la conversión
+#   ida y vuelta con el JSON actual no pierde nada.
+#
+# El fichero se lee con mmap: abrirlo solo lee la cabecera, y cada
+# estudiante se decodifica cuando se pide, a partir de su posición.
+#
+# Conversión:
+#     python almacen_binario.py a_binario [estudiantes.json] [estudiantes.bin]
+#     python almacen_binario.py a_json [estudiantes.bin] [estudiantes.json]
+# ==========================================
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from operator import itemgetter
+
+ARCHIVO_BINARIO = "estudiantes.bin"
+
+FIRMA = b"NOTASBIN"
+VERSION_FORMATO = 1
+
+CADENAS = (
+    "carnet", "nombre", "estado_civil", "sexo", "cedula", "direccion",
+    "departamento", "municipio", "area_conocimiento", "carrera", "plan_estudio",
+)
+_POSICION_CADENA = {campo: i for i, campo in enumerate(CADENAS)}
+
+# Firma, versión, cantidad de estudiantes y (posición, tamaño) de cada sección
+SECCIONES = ("indice_cadenas", "cadenas", "formas", "filas", "materias", "notas", "extras")
+_CABECERA = struct.Struct("<8sHxxI" + "QQ" * len(SECCIONES))
+
+# forma, un índice por cada campo de CADENAS, año, ingreso del padre, primera
+# nota, cantidad de notas, posición y tamaño del JSON de campos extra
+_FILA = struct.Struct("<I" + "I" * len(CADENAS) + "qdQIQI")
+
+# Al leer, cada fila se convierte en la lista de valores [cadenas..., año,
+# ingreso del padre, notas, None] y cada clave sale de una de esas posiciones
+# (los campos extra se toman de la última y luego se reemplazan)
+_ANIO = len(CADENAS)
+_INGRESO = _ANIO + 1
+_NOTAS = _ANIO + 2
+_EXTRA = _ANIO + 3
+
+
+def _origen(clave):
+    if clave == "notas":
+        return _NOTAS
+    if clave == "anio":
+        return _ANIO
+    if clave == "ingreso_padre":
+        return _INGRESO
+    return _POSICION_CADENA[clave]
+
+
+def _plan(forma):
+    # (claves en orden, función que toma sus valores, claves extra)
+    claves = tuple(clave for clave, _ in forma)
+    origenes = [_origen(clave) if origen == "c" else _EXTRA for clave, origen in forma]
+    # El _EXTRA del final hace que itemgetter devuelva siempre una tupla; zip
+    # lo descarta porque hay una clave menos
+    tomar = itemgetter(*origenes, _EXTRA) if origenes else (lambda valores: ())
+    extra = [clave for clave, origen in forma if origen == "x"]
+    return claves, tomar, extra
+
+
+def _es(valor, tipo):
+    # Tipo exacto: un int no pasa por float ni un bool por int
+    return type(valor) is tipo
+
+
+def _notas_compactables(notas):
+    return _es(notas, list) and all(
+        _es(n, dict) and list(n) == ["materia", "nota"] and _es(n["materia"], str) and _es(n["nota"], float)
+        for n in notas)
+
+
+_TIPOS = dict.fromkeys(CADENAS, str)
+_TIPOS.update(anio=int, ingreso_padre=float, notas=list)
+
+
+def _en_columna(clave, valor):
+    if type(valor) is not _TIPOS.get(clave):
+        return False
+    if clave == "anio":
+        return -2 ** 63 <= valor < 2 ** 63
+    if clave == "notas":
+        return _notas_compactables(valor)
+    return True
+
+
+# ---------- ESCRITURA ----------
+
+def guardar(estudiantes, archivo=ARCHIVO_BINARIO):
+    """Escribe la instantánea en un temporal y la renombra al terminar."""
+    cadenas = {"": 0}  # texto -> índice; el 0 es el de los campos que no están en columna
+    formas = {}   # (claves con "c" columna o "x" extra) -> índice
+    filas = bytearray()
+    materias = array("I")
+    notas = array("d")
+    extras = bytearray()
+
+    def cadena(texto):
+        indice = cadenas.get(texto)
+        if indice is None:
+            indice = cadenas[texto] = len(cadenas)
+        return indice
+
+    for est in estudiantes:
+        forma = []
+        columnas = {}
+        fuera = {}
+        for clave, valor in est.items():
+            if _en_columna(clave, valor):
+                forma.append((clave, "c"))
+                columnas[clave] = valor
+            else:
+                forma.append((clave, "x"))
+                fuera[clave] = valor
+        indice_forma = formas.setdefault(tuple(forma), len(formas))
+
+        primera = len(notas)
+        for n in columnas.get("notas", ()):
+            materias.append(cadena(n["materia"]))
+            notas.append(n["nota"])
+        textos = [cadena(columnas[c]) if c in columnas else 0 for c in CADENAS]
+        anio = columnas.get("anio", 0)
+        ingreso = columnas.get("ingreso_padre", 0.0)
+
+        inicio_extra = len(extras)
+        if fuera:
+            extras += json.dumps(fuera, ensure_ascii=False).encode("utf-8")
+        filas += _FILA.pack(indice_forma, *textos, anio, ingreso, primera, len(notas) - primera,
+                            inicio_extra, len(extras) - inicio_extra)
+
+    bloque = bytearray()
+    indice_cadenas = array("Q", [0])
+    for texto in cadenas:  # los diccionarios conservan el orden de inserción
+        bloque += texto.encode("utf-8")
+        indice_cadenas.append(len(bloque))
+    lista_formas = json.dumps([list(map(list, f)) for f in formas], ensure_ascii=False).encode("utf-8")
+
+    if sys.byteorder == "big":  # el fichero siempre es little-endian
+        for columna in (indice_cadenas, materias, notas):
+            columna.byteswap()
+    contenido = [indice_cadenas.tobytes(), bytes(bloque), lista_formas, bytes(filas),
+                 materias.tobytes(), notas.tobytes(), bytes(extras)]
+
+    # Cada sección empieza en un múltiplo de 8
+    posiciones = []
+    posicion = _CABECERA.size
+    for datos in contenido:
+        posicion += -posicion % 8
+        posiciones += [posicion, len(datos)]
+        posicion += len(datos)
+
+    temporal = archivo + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(_CABECERA.pack(FIRMA, VERSION_FORMATO, len(filas) // _FILA.size, *posiciones))
+        for datos, inicio in zip(contenido, posiciones[::2]):
+            f.write(b"\0" * (inicio - f.tell()))
+            f.write(datos)
+    os.replace(temporal, archivo)
+
+
+# ---------- LECTURA ----------
+
+class Instantanea:
+    """Instantánea abierta con mmap. Se usa como secuencia de estudiantes
+    (len, índice, iteración) y los decodifica uno a uno al pedirlos."""
+
+    def __init__(self, archivo=ARCHIVO_BINARIO):
+        with open(archivo, "rb") as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        firma, version, self._cantidad, *posiciones = _CABECERA.unpack_from(self._mapa, 0)
+        if firma != FIRMA or version != VERSION_FORMATO:
+            self._mapa.close()
+            raise ValueError(f"{archivo} no es una instantánea binaria de estudiantes.")
+        self._secciones = {nombre: (posiciones[2 * i], posiciones[2 * i + 1])
+                           for i, nombre in enumerate(SECCIONES)}
+        inicio, tamano = self._secciones["formas"]
+        self._formas = [_plan(forma) for forma in json.loads(self._mapa[inicio:inicio + tamano].decode("utf-8"))]
+        self._cadenas = {}  # índice -> texto ya decodificado
+        self._por_carnet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self._mapa.close()
+
+    def __len__(self):
+        return self._cantidad
+
+    def _cadena(self, indice):
+        texto = self._cadenas.get(indice)
+        if texto is None:
+            posicion = self._secciones["indice_cadenas"][0] + 8 * indice
+            desde, hasta = struct.unpack_from("<QQ", self._mapa, posicion)
+            base = self._secciones["cadenas"][0]
+            texto = self._cadenas[indice] = self._mapa[base + desde:base + hasta].decode("utf-8")
+        return texto
+
+    def _fila(self, i):
+        if not 0 <= i < self._cantidad:
+            raise IndexError(i)
+        return _FILA.unpack_from(self._mapa, self._secciones["filas"][0] + i * _FILA.size)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._cantidad
+        fila = self._fila(i)
+        primera, cantidad = fila[-4], fila[-3]
+        materias = struct.unpack_from(f"<{cantidad}I", self._mapa, self._secciones["materias"][0] + 4 * primera)
+        notas = struct.unpack_from(f"<{cantidad}d", self._mapa, self._secciones["notas"][0] + 8 * primera)
+        return self._armar(fila, self._cadena, materias, notas)
+
+    def _armar(self, fila, cadena, materias, notas):
+        # 'materias' y 'notas' son solo las del estudiante de esta fila
+        claves, tomar, extra = self._formas[fila[0]]
+        valores = list(map(cadena, fila[1:1 + len(CADENAS)]))
+        valores += (fila[1 + _ANIO], fila[1 + _INGRESO],
+                    [{"materia": cadena(m), "nota": n} for m, n in zip(materias, notas)], None)
+        est = dict(zip(claves, tomar(valores)))
+        if extra:
+            inicio = self._secciones["extras"][0] + fila[-2]
+            fuera = json.loads(self._mapa[inicio:inicio + fila[-1]].decode("utf-8"))
+            for clave in extra:
+                est[clave] = fuera[clave]
+        return est
+
+    def __iter__(self):
+        # Recorrido completo: se decodifican de una vez todas las cadenas y
+        # las columnas de notas, en vez de estudiante por estudiante
+        base, tamano = self._secciones["indice_cadenas"]
+        limites = array("Q")
+        limites.frombytes(self._mapa[base:base + tamano])
+        materias = array("I")
+        materias.frombytes(self._mapa[slice(*self._rango("materias"))])
+        notas = array("d")
+        notas.frombytes(self._mapa[slice(*self._rango("notas"))])
+        if sys.byteorder == "big":
+            for columna in (limites, materias, notas):
+                columna.byteswap()
+        bloque = self._mapa[slice(*self._rango("cadenas"))]
+        cadenas = [bloque[a:b].decode("utf-8") for a, b in zip(limites, limites[1:])]
+
+        for fila in _FILA.iter_unpack(self._mapa[slice(*self._rango("filas"))]):
+            primera, cantidad = fila[-4], fila[-3]
+            yield self._armar(fila, cadenas.__getitem__, materias[primera:primera + cantidad],
+                              notas[primera:primera + cantidad])
+
+    def _rango(self, seccion):
+        inicio, tamano = self._secciones[seccion]
+        return inicio, inicio + tamano
+
+    def buscar(self, carnet):
+        """Estudiante con ese carnet, o None. La primera búsqueda arma un
+        índice carnet -> posición leyendo solo la columna de carnets."""
+        if self._por_carnet is None:
+            self._por_carnet = {}
+            for i in range(self._cantidad):
+                fila = self._fila(i)
+                if "carnet" not in self._formas[fila[0]][2]:
+                    self._por_carnet[self._cadena(fila[1])] = i
+                else:  # carnet con un tipo poco habitual, guardado como extra
+                    self._por_carnet[self[i].get("carnet")] = i
+        i = self._por_carnet.get(carnet)
+        return None if i is None else self[i]
+
+
+def abrir(archivo=ARCHIVO_BINARIO):
+    return Instantanea(archivo)
+
+
+def cargar_estudiantes(archivo=ARCHIVO_BINARIO):
+    """Lista completa, como json.load sobre estudiantes.json."""
+    with abrir(archivo) as instantanea:
+        return list(instantanea)
+
+
+# ---------- CONVERSIÓN ----------
+
+def a_binario(archivo_json="estudiantes.json", archivo=ARCHIVO_BINARIO):
+    with open(archivo_json, "r", encoding="utf-8") as f:
+        estudiantes = json.load(f)
+    guardar(estudiantes, archivo)
+    # Se comprueba que la vuelta da exactamente el mismo JSON (tipos y orden)
+    if json.dumps(cargar_estudiantes(archivo)) != json.dumps(estudiantes):
+        raise ValueError("La instantánea binaria no reproduce el JSON original.")
+    return len(estudiantes)
+
+
+def a_json(archivo=ARCHIVO_BINARIO, archivo_json="estudiantes.json"):
+    estudiantes = cargar_estudiantes(archivo)
+    temporal = archivo_json + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(estudiantes, f, ensure_ascii=False, indent=4)
+    os.replace(temporal, archivo_json)
+    return len(estudiantes)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("a_binario", "a_json"):
+        print("Uso: python almacen_binario.py a_binario|a_json [origen] [destino]")
+        sys.exit(1)
+    if sys.argv[1] == "a_binario":
+        origen = sys.argv[2] if len(sys.argv) > 2 else "estudiantes.json"
+        destino = sys.argv[3] if len(sys.argv) > 3 else ARCHIVO_BINARIO
+        total = a_binario(origen, destino)
+    else:
+        origen = sys.argv[2] if len(sys.argv) > 2 else ARCHIVO_BINARIO
+        destino = sys.argv[3] if len(sys.argv) > 3 else "estudiantes.json"
+        total = a_json(origen, destino)
+    print(f"{total} estudiantes convertidos: {origen} ({os.path.getsize(origen):,} bytes) -> "
+          f"{destino} ({os.path.getsize(destino):,} bytes).")
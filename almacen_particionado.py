@@ -0,0 +1,197 @@
+# ==========================================
+# ALMACENAMIENTO PARTICIONADO POR CARRERA Y AÑO
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Un fichero JSON por cada combinación carrera/año dentro de DIRECTORIO, más
+# un manifiesto pequeño con, por partición, su fichero, la carrera, el año y
+# los agregados (estudiantes, suma y cantidad de notas). Se activa en
+# control_notas.py con NOTAS_ALMACENAMIENTO=particionado.
+#
+# - Guardar un cambio reescribe solo las particiones afectadas (la del
+#   estudiante, y la anterior si cambió de carrera o año) y el manifiesto.
+# - Las consultas filtradas por carrera o año leen solo esas particiones; los
+#   promedios salen del manifiesto sin leer ninguna.
+#
+# Migración de un estudiantes.json existente:
+#     python almacen_particionado.py [estudiantes.json] [estudiantes_particiones]
+# ==========================================
+
+import json
+import os
+import re
+import sys
+
+import busqueda
+
+DIRECTORIO = "estudiantes_particiones"
+MANIFIESTO = "manifiesto.json"
+
+# carnet -> clave de la partición donde está guardado, según la última
+# lectura o escritura de esta sesión (para saber de dónde quitarlo si cambia
+# de carrera o año). Cuando otra sesión escribe, control_notas vuelve a leer
+# todo con iterar_estudiantes antes de fusionar, y eso la pone al día.
+ubicacion = {}
+
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def clave(est):
+    carrera = _NO_ALFANUMERICO.sub("_", busqueda.normalizar(est["carrera"])).strip("_") or "sin_carrera"
+    return f"{carrera}__{est['anio']}"
+
+
+def coincide(registro, carrera, anio):
+    # Sirve para una entrada del manifiesto y para un estudiante (ambos tienen
+    # "carrera" y "anio"); None en un filtro significa "cualquiera"
+    if carrera is not None and busqueda.normalizar(registro["carrera"]) != busqueda.normalizar(carrera):
+        return False
+    return anio is None or str(registro["anio"]) == str(anio)
+
+
+# ---------- LECTURA Y ESCRITURA DE FICHEROS ----------
+
+def _escribir_json(ruta, datos):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def leer_manifiesto(directorio=DIRECTORIO):
+    ruta = os.path.join(directorio, MANIFIESTO)
+    if not os.path.exists(ruta):
+        return {"particiones": {}}
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _leer_particion(directorio, manifiesto, nombre):
+    info = manifiesto["particiones"].get(nombre)
+    if info is None:
+        return []
+    with open(os.path.join(directorio, info["archivo"]), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escribir_particion(directorio, manifiesto, nombre, estudiantes):
+    # Escribe la partición y actualiza su entrada en el manifiesto (que se
+    # guarda aparte, una vez por operación)
+    archivo = nombre + ".json"
+    if not estudiantes:
+        if nombre in manifiesto["particiones"]:
+            del manifiesto["particiones"][nombre]
+            ruta = os.path.join(directorio, archivo)
+            if os.path.exists(ruta):
+                os.remove(ruta)
+        return
+    _escribir_json(os.path.join(directorio, archivo), estudiantes)
+    notas = [n["nota"] for est in estudiantes for n in est["notas"]]
+    manifiesto["particiones"][nombre] = {
+        "archivo": archivo,
+        "carrera": estudiantes[0]["carrera"],
+        "anio": estudiantes[0]["anio"],
+        "estudiantes": len(estudiantes),
+        "suma": sum(notas),
+        "cantidad": len(notas),
+    }
+
+
+def _guardar_manifiesto(directorio, manifiesto):
+    _escribir_json(os.path.join(directorio, MANIFIESTO), manifiesto)
+
+
+# ---------- API ----------
+
+def cargar_estudiantes(directorio=DIRECTORIO):
+    manifiesto = leer_manifiesto(directorio)
+    estudiantes = []
+    ubicacion.clear()
+    for nombre in manifiesto["particiones"]:
+        for est in _leer_particion(directorio, manifiesto, nombre):
+            estudiantes.append(est)
+            ubicacion[est["carnet"]] = nombre
+    return estudiantes
+
+
+def iterar_estudiantes(carrera=None, anio=None, directorio=DIRECTORIO):
+    """Recorre los estudiantes leyendo solo las particiones que coinciden con
+    el filtro de carrera y/o año."""
+    manifiesto = leer_manifiesto(directorio)
+    for nombre, info in manifiesto["particiones"].items():
+        if coincide(info, carrera, anio):
+            for est in _leer_particion(directorio, manifiesto, nombre):
+                ubicacion[est["carnet"]] = nombre
+                yield est
+
+
+def agregados(carrera=None, anio=None, directorio=DIRECTORIO):
+    """Suma y cantidad de notas y total de estudiantes, solo con el manifiesto."""
+    total = {"suma": 0.0, "cantidad": 0, "estudiantes": 0}
+    for info in leer_manifiesto(directorio)["particiones"].values():
+        if coincide(info, carrera, anio):
+            for campo in total:
+                total[campo] += info[campo]
+    return total
+
+
+def guardar_estudiantes(estudiantes, directorio=DIRECTORIO):
+    """Reescribe todas las particiones (migración o compactación)."""
+    os.makedirs(directorio, exist_ok=True)
+    particiones = {}
+    for est in {est["carnet"]: est for est in estudiantes}.values():
+        particiones.setdefault(clave(est), []).append(est)
+    manifiesto = leer_manifiesto(directorio)
+    for nombre in set(manifiesto["particiones"]) - set(particiones):
+        _escribir_particion(directorio, manifiesto, nombre, [])
+    ubicacion.clear()
+    for nombre, grupo in particiones.items():
+        _escribir_particion(directorio, manifiesto, nombre, grupo)
+        ubicacion.update((est["carnet"], nombre) for est in grupo)
+    _guardar_manifiesto(directorio, manifiesto)
+
+
+def guardar_cambios(cambios, directorio=DIRECTORIO):
+    """Aplica una lista de (operación, estudiante, versión base) leyendo y
+    reescribiendo solo las particiones afectadas: la del estudiante y, si
+    cambió de carrera o año, la anterior. Los cambios llegan ya fusionados y
+    con la versión puesta, con el bloqueo de control_notas tomado."""
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = leer_manifiesto(directorio)
+    afectadas = set()
+    for operacion, est, _ in cambios:
+        if est["carnet"] in ubicacion:
+            afectadas.add(ubicacion[est["carnet"]])
+        if operacion != "eliminar":
+            afectadas.add(clave(est))
+    # nombre de la partición -> {carnet: registro}, tal como están en el disco
+    en_disco = {nombre: {e["carnet"]: e for e in _leer_particion(directorio, manifiesto, nombre)}
+                for nombre in afectadas}
+
+    for operacion, est, _ in cambios:
+        carnet = est["carnet"]
+        anterior = ubicacion.pop(carnet, None)
+        if anterior is not None:
+            en_disco[anterior].pop(carnet, None)
+        if operacion != "eliminar":
+            en_disco[clave(est)][carnet] = est
+            ubicacion[carnet] = clave(est)
+
+    for nombre, registros in en_disco.items():
+        _escribir_particion(directorio, manifiesto, nombre, list(registros.values()))
+    _guardar_manifiesto(directorio, manifiesto)
+
+
+def migrar_json(archivo_json="estudiantes.json", directorio=DIRECTORIO):
+    """Reparte una sola vez el estudiantes.json existente en particiones."""
+    with open(archivo_json, "r", encoding="utf-8") as f:
+        estudiantes = json.load(f)
+    guardar_estudiantes(estudiantes, directorio)
+    return len(estudiantes)
+
+
+if __name__ == "__main__":
+    origen = sys.argv[1] if len(sys.argv) > 1 else "estudiantes.json"
+    destino = sys.argv[2] if len(sys.argv) > 2 else DIRECTORIO
+    total = migrar_json(origen, destino)
+    print(f"{total} estudiantes repartidos en {len(leer_manifiesto(destino)['particiones'])} "
+          f"particiones en {destino}.")
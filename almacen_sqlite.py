@@ -0,0 +1,169 @@
+# ==========================================
+# ALMACENAMIENTO EN SQLITE
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Guarda los estudiantes en tablas normalizadas (estudiantes y notas) en vez de
+# un único arreglo JSON. Se activa en control_notas.py con
+# NOTAS_ALMACENAMIENTO=sqlite.
+#
+# Migración de un estudiantes.json existente:
+#     python almacen_sqlite.py [estudiantes.json] [estudiantes.db]
+# ==========================================
+
+import json
+import sqlite3
+import sys
+
+ARCHIVO_SQLITE = "estudiantes.db"
+
+CAMPOS = [
+    "carnet", "nombre", "estado_civil", "sexo", "cedula", "direccion",
+    "departamento", "municipio", "area_conocimiento", "carrera", "anio",
+    "plan_estudio", "ingreso_padre",
+]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS estudiantes (
+    carnet            TEXT PRIMARY KEY,
+    nombre            TEXT,
+    estado_civil      TEXT,
+    sexo              TEXT,
+    cedula            TEXT,
+    direccion         TEXT,
+    departamento      TEXT,
+    municipio         TEXT,
+    area_conocimiento TEXT,
+    carrera           TEXT,
+    anio              INTEGER,
+    plan_estudio      TEXT,
+    ingreso_padre     REAL
+);
+CREATE TABLE IF NOT EXISTS notas (
+    carnet  TEXT NOT NULL REFERENCES estudiantes(carnet) ON DELETE CASCADE,
+    orden   INTEGER NOT NULL,
+    materia TEXT NOT NULL,
+    nota    REAL NOT NULL,
+    PRIMARY KEY (carnet, orden)
+);
+CREATE INDEX IF NOT EXISTS idx_estudiantes_cedula ON estudiantes(cedula);
+CREATE INDEX IF NOT EXISTS idx_estudiantes_carrera ON estudiantes(carrera);
+CREATE INDEX IF NOT EXISTS idx_notas_materia ON notas(materia);
+"""
+
+_SQL_UPSERT = (
+    f"INSERT INTO estudiantes ({', '.join(CAMPOS)}) "
+    f"VALUES ({', '.join('?' for _ in CAMPOS)}) "
+    f"ON CONFLICT(carnet) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in CAMPOS[1:])
+)
+
+
+def conectar(ruta=ARCHIVO_SQLITE):
+    """Abre la base de datos y crea las tablas si no existen."""
+    con = sqlite3.connect(ruta)
+    con.execute("PRAGMA foreign_keys = ON")
+    con.execute("PRAGMA journal_mode = WAL")
+    con.executescript(ESQUEMA)
+    return con
+
+
+def _filas_notas(est):
+    return [(est["carnet"], i, n["materia"], n["nota"]) for i, n in enumerate(est["notas"])]
+
+
+def _escribir(con, est):
+    con.execute(_SQL_UPSERT, [est.get(c) for c in CAMPOS])
+    con.execute("DELETE FROM notas WHERE carnet = ?", (est["carnet"],))
+    con.executemany("INSERT INTO notas VALUES (?, ?, ?, ?)", _filas_notas(est))
+
+
+def cargar_estudiantes(con):
+    """Devuelve la lista de estudiantes con el mismo formato que estudiantes.json."""
+    estudiantes = {}
+    for fila in con.execute(f"SELECT {', '.join(CAMPOS)} FROM estudiantes ORDER BY rowid"):
+        est = dict(zip(CAMPOS, fila))
+        est["notas"] = []
+        estudiantes[est["carnet"]] = est
+    for carnet, materia, nota in con.execute(
+            "SELECT carnet, materia, nota FROM notas ORDER BY carnet, orden"):
+        estudiantes[carnet]["notas"].append({"materia": materia, "nota": nota})
+    return list(estudiantes.values())
+
+
+def iterar_estudiantes(con):
+    """Recorre los estudiantes uno a uno con un cursor, sin cargarlos todos."""
+    columnas = ", ".join(f"e.{c}" for c in CAMPOS)
+    cursor = con.execute(
+        f"SELECT {columnas}, n.materia, n.nota FROM estudiantes e "
+        f"LEFT JOIN notas n ON n.carnet = e.carnet ORDER BY e.rowid, n.orden")
+    est = None
+    for fila in cursor:
+        if est is None or est["carnet"] != fila[0]:
+            if est is not None:
+                yield est
+            est = dict(zip(CAMPOS, fila))
+            est["notas"] = []
+        if fila[-2] is not None:
+            est["notas"].append({"materia": fila[-2], "nota": fila[-1]})
+    if est is not None:
+        yield est
+
+
+def agregados(con):
+    """Suma y cantidad de notas y total de estudiantes, calculados por SQLite."""
+    suma, cantidad = con.execute("SELECT COALESCE(SUM(nota), 0), COUNT(*) FROM notas").fetchone()
+    (total,) = con.execute("SELECT COUNT(*) FROM estudiantes").fetchone()
+    return {"suma": suma, "cantidad": cantidad, "estudiantes": total}
+
+
+def guardar_estudiante(con, est):
+    """Inserta o actualiza un estudiante y sus notas en una sola transacción."""
+    with con:
+        _escribir(con, est)
+
+
+def guardar_lote(con, estudiantes):
+    """Inserta o actualiza varios estudiantes en una sola transacción."""
+    with con:
+        con.executemany(_SQL_UPSERT, [[est.get(c) for c in CAMPOS] for est in estudiantes])
+        con.executemany("DELETE FROM notas WHERE carnet = ?", [(est["carnet"],) for est in estudiantes])
+        con.executemany("INSERT INTO notas VALUES (?, ?, ?, ?)",
+                        [fila for est in estudiantes for fila in _filas_notas(est)])
+
+
+def eliminar_estudiante(con, carnet):
+    with con:
+        con.execute("DELETE FROM estudiantes WHERE carnet = ?", (carnet,))
+
+
+def guardar_estudiantes(con, estudiantes, tamano_lote=1000):
+    """Reemplaza todo el contenido en una transacción, insertando por lotes."""
+    # Si hay carnets repetidos se conserva el último, igual que el índice en memoria
+    estudiantes = list({est["carnet"]: est for est in estudiantes}.values())
+    with con:
+        con.execute("DELETE FROM notas")
+        con.execute("DELETE FROM estudiantes")
+        for inicio in range(0, len(estudiantes), tamano_lote):
+            lote = estudiantes[inicio:inicio + tamano_lote]
+            con.executemany(_SQL_UPSERT, [[est.get(c) for c in CAMPOS] for est in lote])
+            con.executemany("INSERT INTO notas VALUES (?, ?, ?, ?)",
+                            [fila for est in lote for fila in _filas_notas(est)])
+
+
+def migrar_json(archivo_json="estudiantes.json", ruta=ARCHIVO_SQLITE):
+    """Importa una sola vez el estudiantes.json existente a la base SQLite."""
+    with open(archivo_json, "r", encoding="utf-8") as f:
+        estudiantes = json.load(f)
+    con = conectar(ruta)
+    try:
+        guardar_estudiantes(con, estudiantes)
+    finally:
+        con.close()
+    return len(estudiantes)
+
+
+if __name__ == "__main__":
+    origen = sys.argv[1] if len(sys.argv) > 1 else "estudiantes.json"
+    destino = sys.argv[2] if len(sys.argv) > 2 else ARCHIVO_SQLITE
+    total = migrar_json(origen, destino)
+    print(f"{total} estudiantes migrados de {origen} a {destino}.")
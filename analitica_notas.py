@@ -0,0 +1,133 @@
+# ==========================================
+# REPORTES ESTADÍSTICOS DE NOTAS (NumPy)
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Convierte la lista de estudiantes en columnas (una fila por nota) y calcula
+# estadísticas agrupadas sin ciclos de Python sobre las notas:
+# media, mediana, desviación estándar, percentiles y tasa de aprobación
+# por carrera, materia, año y departamento.
+# ==========================================
+
+import numpy as np
+
+import modelo
+
+PERCENTILES = (25, 75, 90)
+AGRUPACIONES = ["carrera", "materia", "anio", "departamento"]
+TITULOS = {"carrera": "carrera", "materia": "materia", "anio": "año", "departamento": "departamento"}
+
+
+def _codificar(valor, categorias, codigos):
+    codigo = codigos.get(valor)
+    if codigo is None:
+        codigo = codigos[valor] = len(categorias)
+        categorias.append(valor)
+    return codigo
+
+
+def construir_columnas(estudiantes):
+    """Devuelve un diccionario de columnas NumPy a partir de la lista (o flujo)
+    de estudiantes. Las categorías de texto se codifican como enteros."""
+    categorias = {campo: [] for campo in AGRUPACIONES}
+    codigos = {campo: {} for campo in AGRUPACIONES}
+    carrera_est, anio_est, depto_est = [], [], []
+    id_estudiante, materia, nota = [], [], []
+
+    for i, est in enumerate(estudiantes):
+        carrera_est.append(_codificar(est["carrera"], categorias["carrera"], codigos["carrera"]))
+        anio_est.append(_codificar(est["anio"], categorias["anio"], codigos["anio"]))
+        depto_est.append(_codificar(est["departamento"], categorias["departamento"], codigos["departamento"]))
+        for n in est["notas"]:
+            id_estudiante.append(i)
+            materia.append(_codificar(n["materia"], categorias["materia"], codigos["materia"]))
+            nota.append(n["nota"])
+
+    id_estudiante = np.array(id_estudiante, dtype=np.int32)
+    return {
+        "id_estudiante": id_estudiante,
+        "nota": np.array(nota, dtype=np.float32),
+        "materia": np.array(materia, dtype=np.int32),
+        # Las columnas por estudiante se expanden a una fila por nota
+        "carrera": np.array(carrera_est, dtype=np.int32)[id_estudiante],
+        "anio": np.array(anio_est, dtype=np.int32)[id_estudiante],
+        "departamento": np.array(depto_est, dtype=np.int32)[id_estudiante],
+        "categorias": categorias,
+    }
+
+
+def estadisticas_por(columnas, campo, percentiles=PERCENTILES):
+    """Estadísticas de las notas agrupadas por 'campo'.
+
+    Devuelve una lista de diccionarios, uno por grupo, ordenada por categoría.
+    """
+    notas = columnas["nota"]
+    grupo = columnas[campo]
+    categorias = columnas["categorias"][campo]
+    k = len(categorias)
+    if len(notas) == 0:
+        return []
+
+    cantidad = np.bincount(grupo, minlength=k)
+    suma = np.bincount(grupo, weights=notas, minlength=k)
+    suma_cuadrados = np.bincount(grupo, weights=notas.astype(np.float64) ** 2, minlength=k)
+    aprobados = np.bincount(grupo, weights=notas >= modelo.NOTA_APROBACION, minlength=k)
+
+    con_notas = cantidad > 0
+    divisor = np.where(con_notas, cantidad, 1)
+    media = suma / divisor
+    desviacion = np.sqrt(np.maximum(suma_cuadrados / divisor - media ** 2, 0))
+
+    # Percentiles: se ordenan las notas dentro de cada grupo y se interpola
+    # linealmente en la posición q * (n - 1) de cada segmento.
+    ordenadas = notas[np.lexsort((notas, grupo))].astype(np.float64)
+    inicio = np.concatenate(([0], np.cumsum(cantidad)[:-1]))
+    ultimo = np.maximum(cantidad - 1, 0)
+
+    def percentil(q):
+        posicion = q / 100 * ultimo
+        abajo = np.floor(posicion).astype(np.int64)
+        arriba = np.ceil(posicion).astype(np.int64)
+        tope = len(ordenadas) - 1
+        v_abajo = ordenadas[np.minimum(inicio + abajo, tope)]
+        v_arriba = ordenadas[np.minimum(inicio + arriba, tope)]
+        return v_abajo + (v_arriba - v_abajo) * (posicion - abajo)
+
+    mediana = percentil(50)
+    extra = {q: percentil(q) for q in percentiles}
+
+    resultado = []
+    for c in np.flatnonzero(con_notas):
+        fila = {
+            campo: categorias[c],
+            "cantidad": int(cantidad[c]),
+            "media": float(media[c]),
+            "mediana": float(mediana[c]),
+            "desviacion": float(desviacion[c]),
+            "aprobacion": float(aprobados[c] / cantidad[c] * 100),
+        }
+        for q in percentiles:
+            fila[f"p{q}"] = float(extra[q][c])
+        resultado.append(fila)
+    resultado.sort(key=lambda fila: str(fila[campo]))
+    return resultado
+
+
+def mostrar_reportes(estudiantes):
+    print("\n=== REPORTES ESTADÍSTICOS DE NOTAS ===")
+    columnas = construir_columnas(estudiantes)
+    if len(columnas["nota"]) == 0:
+        print("No hay notas registradas.\n")
+        return
+
+    encabezado = f"{'GRUPO':<30}{'N':>8}{'MEDIA':>9}{'MEDIANA':>9}{'DESV':>8}{'APROB%':>9}"
+    encabezado += "".join(f"{'P' + str(q):>8}" for q in PERCENTILES)
+    for campo in AGRUPACIONES:
+        print(f"\n--- Por {TITULOS[campo]} ---")
+        print(encabezado)
+        print("-" * len(encabezado))
+        for fila in estadisticas_por(columnas, campo):
+            linea = (f"{str(fila[campo]):<30}{fila['cantidad']:>8}{fila['media']:>9.2f}"
+                     f"{fila['mediana']:>9.2f}{fila['desviacion']:>8.2f}{fila['aprobacion']:>9.1f}")
+            linea += "".join(f"{fila[f'p{q}']:>8.2f}" for q in PERCENTILES)
+            print(linea)
+    print()
@@ -0,0 +1,11 @@
+# ==========================================
+# BENCHMARKS
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# generador.py: matrículas sintéticas en los formatos del CLI y de la GUI.
+# medir.py:     mide las operaciones principales a varios tamaños y guarda
+#               los resultados en JSON para comparar corridas.
+#
+# Uso (desde la carpeta del proyecto):
+#     python -m benchmarks [--tamanos 1000,10000,100000,1000000] [--salida resultados.json]
+# ==========================================
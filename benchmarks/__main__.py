@@ -0,0 +1,3 @@
+from benchmarks.medir import main
+
+main()
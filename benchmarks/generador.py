@@ -0,0 +1,164 @@
+# ==========================================
+# GENERADOR DE MATRÍCULAS SINTÉTICAS
+# ==========================================
+# Produce N estudiantes con carnets y cédulas únicos (las cédulas con el
+# formato que acepta validar_cedula: código de municipio, fecha de
+# nacimiento, consecutivo y letra), departamentos y municipios de Nicaragua,
+# carreras con sus materias y un número variable de notas. Con la misma semilla se obtienen los mismos
+# datos, para que las corridas sean comparables.
+#
+#     python -m benchmarks.generador 10000 estudiantes.json [--gui]
+# ==========================================
+
+import argparse
+import json
+import random
+
+# departamento -> [(municipio, código de cédula)]
+MUNICIPIOS = {
+    "Managua": [("Managua", "001"), ("Tipitapa", "007"), ("Ciudad Sandino", "006")],
+    "Leon": [("Leon", "281"), ("Nagarote", "287"), ("La Paz Centro", "286")],
+    "Chinandega": [("Chinandega", "081"), ("Corinto", "087"), ("El Viejo", "085")],
+    "Masaya": [("Masaya", "401"), ("Nindiri", "402"), ("Masatepe", "405")],
+    "Granada": [("Granada", "201"), ("Nandaime", "204")],
+    "Esteli": [("Esteli", "161"), ("Condega", "164")],
+    "Matagalpa": [("Matagalpa", "441"), ("Sebaco", "448")],
+    "Jinotega": [("Jinotega", "241"), ("San Rafael Del Norte", "243")],
+    "Carazo": [("Jinotepe", "041"), ("Diriamba", "043")],
+    "Rivas": [("Rivas", "561"), ("San Juan Del Sur", "568")],
+    "Boaco": [("Boaco", "361"), ("Camoapa", "362")],
+    "Chontales": [("Juigalpa", "121"), ("Acoyapa", "122")],
+    "Madriz": [("Somoto", "321")],
+    "Nueva Segovia": [("Ocotal", "481")],
+    "Rio San Juan": [("San Carlos", "501")],
+}
+
+# carrera -> (área de conocimiento, materias)
+CARRERAS = {
+    "Medicina": ("Ciencias Medicas", ["Anatomia", "Bioquimica", "Fisiologia", "Histologia", "Farmacologia"]),
+    "Odontologia": ("Ciencias Medicas", ["Anatomia Dental", "Bioquimica", "Periodoncia", "Radiologia"]),
+    "Ingenieria En Sistemas": ("Ciencias Y Tecnologia", ["Calculo", "Programacion", "Bases De Datos", "Redes", "Estadistica"]),
+    "Matematica": ("Ciencias Y Tecnologia", ["Calculo", "Algebra Lineal", "Topologia", "Estadistica"]),
+    "Derecho": ("Ciencias Juridicas", ["Derecho Civil", "Derecho Penal", "Derecho Romano", "Filosofia"]),
+    "Psicologia": ("Educacion Y Humanidades", ["Psicologia General", "Estadistica", "Neurociencia", "Filosofia"]),
+    "Contaduria Publica": ("Ciencias Economicas", ["Contabilidad", "Matematica Financiera", "Auditoria", "Estadistica"]),
+    "Economia": ("Ciencias Economicas", ["Microeconomia", "Macroeconomia", "Calculo", "Estadistica"]),
+    "Agroecologia": ("Ciencias Agrarias", ["Botanica", "Suelos", "Quimica", "Entomologia"]),
+    "Biologia": ("Ciencias Y Tecnologia", ["Botanica", "Zoologia", "Genetica", "Quimica"]),
+}
+
+NOMBRES = ["Carlos", "Maria", "Jose", "Ana", "Luis", "Sofia", "Wiston", "Natasha", "Sergio",
+           "Karla", "Juan", "Fernanda", "Oscar", "Gabriela", "Miguel", "Valeria", "Jorge", "Daniela"]
+APELLIDOS = ["Juarez", "Lainez", "Maldonado", "Espinosa", "Lopez", "Garcia", "Martinez", "Hernandez",
+             "Gonzalez", "Rodriguez", "Perez", "Sanchez", "Ramirez", "Flores", "Chevez", "Balladares"]
+ESTADOS_CIVILES = ["Soltero", "Soltero", "Soltero", "Casado", "Divorciado", "Viudo"]
+LETRAS = "ABCDEFGHJKLMNPQRSTUVWXY"
+
+
+def carnet(i):
+    # Únicos hasta 10 millones: año de ingreso, consecutivo de 5 cifras y dígito
+    return f"{25 - i // 1000000:02d}-{i % 100000:05d}-{i // 100000 % 10}"
+
+
+def cedula(i, codigo, anio_nacimiento):
+    # Únicas como los carnets: consecutivo, letra, día y mes salen de i, así
+    # que no se repiten hasta 10000 * 23 * 28 * 12 (más de 77 millones)
+    consecutivo, resto = i % 10000, i // 10000
+    letra, resto = LETRAS[resto % len(LETRAS)], resto // len(LETRAS)
+    dia, mes = resto % 28 + 1, resto // 28 % 12 + 1
+    return f"{codigo}-{dia:02d}{mes:02d}{anio_nacimiento % 100:02d}-{consecutivo:04d}{letra}"
+
+
+def _nota(rng):
+    return round(min(100.0, max(0.0, rng.gauss(72, 15))), 2)
+
+
+def _base(rng, i):
+    departamento = rng.choice(list(MUNICIPIOS))
+    municipio, codigo = rng.choice(MUNICIPIOS[departamento])
+    carrera = rng.choice(list(CARRERAS))
+    anio = rng.randint(1, 6)
+    nacimiento = 2007 - anio - rng.randint(0, 6)
+    return {
+        "i": i, "departamento": departamento, "municipio": municipio, "carrera": carrera,
+        "anio": anio, "nacimiento": nacimiento, "cedula": cedula(i, codigo, nacimiento),
+        "nombre": f"{rng.choice(NOMBRES)} {rng.choice(NOMBRES)}",
+        "apellido": f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+        "sexo": rng.choice("MF"), "estado_civil": rng.choice(ESTADOS_CIVILES),
+        "ingreso": round(rng.lognormvariate(9.5, 0.6), 2),
+    }
+
+
+def generar_cli(n, semilla=0):
+    """Lista de n estudiantes en el formato de estudiantes.json."""
+    rng = random.Random(semilla)
+    estudiantes = []
+    for i in range(n):
+        b = _base(rng, i)
+        area, materias = CARRERAS[b["carrera"]]
+        cantidad = rng.randint(1, len(materias) + 3)  # algunas materias se repiten (reprobadas)
+        estudiantes.append({
+            "carnet": carnet(i),
+            "nombre": f"{b['nombre']} {b['apellido']}",
+            "estado_civil": b["estado_civil"],
+            "sexo": b["sexo"],
+            "cedula": b["cedula"],
+            "direccion": f"Barrio {rng.choice(APELLIDOS)}, {rng.randint(1, 20)} C. Al Sur",
+            "departamento": b["departamento"],
+            "municipio": b["municipio"],
+            "area_conocimiento": area,
+            "carrera": b["carrera"],
+            "anio": b["anio"],
+            "plan_estudio": f"PLAN {2016 + rng.randint(0, 8)}",
+            "ingreso_padre": b["ingreso"],
+            "notas": [{"materia": rng.choice(materias), "nota": _nota(rng)} for _ in range(cantidad)],
+        })
+    return estudiantes
+
+
+def generar_gui(n, semilla=0):
+    """Lista de n estudiantes en el formato de la GUI (matricula_gui.json)."""
+    import modelo
+
+    rng = random.Random(semilla)
+    estudiantes = []
+    for i in range(n):
+        b = _base(rng, i)
+        parciales = [f"{_nota(rng):g}" if rng.random() < 0.85 else "" for _ in modelo.PARCIALES]
+        est = {
+            "Cedula": b["cedula"], "Nombre": b["nombre"], "Apellido": b["apellido"],
+            "Sexo": "Masculino" if b["sexo"] == "M" else "Femenino",
+            "Fecha Nac": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{b['nacimiento']}",
+            "Estado Civil": b["estado_civil"] + "/a", "Nacionalidad": "Nicaraguense",
+            "Departamento": b["departamento"], "Direccion": f"{b['municipio']}, Barrio {rng.choice(APELLIDOS)}",
+            "Telefono": f"8{rng.randint(0, 9999999):07d}",
+            "Correo": f"{b['nombre'].split()[0].lower()}.{i}@estudiantes.unanleon.edu.ni",
+            "Carrera": b["carrera"], "Año": str(b["anio"]),
+            "Nombre Padre": f"{rng.choice(NOMBRES)} {b['apellido'].split()[0]}",
+            "Nombre Madre": f"{rng.choice(NOMBRES)} {b['apellido'].split()[1]}",
+            "Ingresos Padres": f"{b['ingreso']:.2f}",
+        }
+        for parcial, nota in zip(modelo.PARCIALES, parciales):
+            est[parcial] = nota
+        promedio = round(modelo.promedio(float(p) for p in parciales if p), 2)
+        est["Promedio"] = promedio
+        est["Estado"] = ("Sin notas" if promedio == 0 else
+                         "Aprobado ✅" if promedio >= modelo.NOTA_APROBACION else "Reprobado ❌")
+        estudiantes.append(est)
+    return estudiantes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una matrícula sintética.")
+    parser.add_argument("cantidad", type=int)
+    parser.add_argument("archivo")
+    parser.add_argument("--gui", action="store_true", help="formato de la GUI en vez del CLI")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    generar = generar_gui if args.gui else generar_cli
+    with open(args.archivo, "w", encoding="utf-8") as f:
+        json.dump(generar(args.cantidad, args.semilla), f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# ==========================================
+# MEDICIÓN DE LAS OPERACIONES PRINCIPALES
+# ==========================================
+# Para cada tamaño genera una matrícula sintética y mide, en un directorio
+# temporal (no toca los datos reales):
+#
+#   CLI (control_notas.py, en el modo de NOTAS_ALMACENAMIENTO):
+#     guardar_estudiantes, cargar_estudiantes, buscar_estudiante (por carnet),
+#     calcular_promedio, recalcular_agregados y mostrar_todos (primera página,
+#     por carnet, el orden por defecto, y por promedio con el índice en frío)
+#   GUI (interfaz_notas.py):
+#     actualizar_tabla con la ventana oculta; se omite si no hay pantalla
+#
+# Cada operación se repite y se guardan todos los tiempos junto con el mejor y
+# la mediana. Los resultados se escriben en JSON para comparar corridas.
+# ==========================================
+
+import argparse
+import builtins
+import contextlib
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import control_notas as cn
+import modelo
+from benchmarks import generador
+
+TAMANOS = [1000, 10000, 100000, 1000000]
+REPETICIONES = 3
+BUSQUEDAS = 1000  # búsquedas por carnet en cada repetición
+
+
+@contextlib.contextmanager
+def _sesion(respuestas):
+    # Responde a input() con las respuestas dadas (en ciclo) y descarta la salida
+    original = builtins.input
+    ciclo = itertools.cycle(respuestas)
+    builtins.input = lambda *_: next(ciclo)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as nulo, contextlib.redirect_stdout(nulo):
+            yield
+    finally:
+        builtins.input = original
+
+
+def _tiempos(funcion, repeticiones, preparar=None):
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def _resultado(operacion, tamano, tiempos, llamadas=1):
+    return {
+        "operacion": operacion,
+        "tamano": tamano,
+        "llamadas": llamadas,
+        "mejor": min(tiempos),
+        "mediana": statistics.median(tiempos),
+        "por_llamada": min(tiempos) / llamadas,
+        "tiempos": tiempos,
+    }
+
+
+def medir_cli(tamano, repeticiones):
+    resultados = []
+    estudiantes = generador.generar_cli(tamano)
+    cn.reconstruir_indices(estudiantes)
+    cn.recalcular_agregados(estudiantes)
+
+    t = _tiempos(lambda: cn.guardar_estudiantes(estudiantes), repeticiones)
+    resultados.append(_resultado("guardar_estudiantes", tamano, t))
+
+    cargados = []
+    t = _tiempos(lambda: cargados.append(cn.cargar_estudiantes()), repeticiones, cargados.clear)
+    resultados.append(_resultado("cargar_estudiantes", tamano, t))
+    estudiantes = cargados[0]
+    del cargados
+    cn.cargar_agregados(estudiantes)
+
+    carnets = [est["carnet"] for est in random.Random(1).choices(estudiantes, k=BUSQUEDAS)]
+    with _sesion(carnets):
+        t = _tiempos(lambda: [cn.buscar_estudiante(estudiantes) for _ in range(BUSQUEDAS)], repeticiones)
+    resultados.append(_resultado("buscar_estudiante", tamano, t, BUSQUEDAS))
+
+    with _sesion([""]):
+        t = _tiempos(lambda: cn.calcular_promedio(estudiantes), repeticiones)
+    resultados.append(_resultado("calcular_promedio", tamano, t))
+
+    t = _tiempos(lambda: cn.recalcular_agregados(estudiantes), repeticiones)
+    resultados.append(_resultado("recalcular_agregados", tamano, t))
+
+    # Primera página y salir; con orden se parte sin el índice de orden construido
+    with _sesion([""]):
+        t = _tiempos(lambda: cn.mostrar_todos(estudiantes), repeticiones)
+    resultados.append(_resultado("mostrar_todos", tamano, t))
+    with _sesion(["P", ""]):
+        t = _tiempos(lambda: cn.mostrar_todos(estudiantes), repeticiones,
+                     lambda: cn.reconstruir_indices(estudiantes))
+    resultados.append(_resultado("mostrar_todos_por_promedio", tamano, t))
+    return resultados
+
+
+def _cargar_gui():
+    # interfaz_notas crea la ventana al importarse; sin pantalla se omite
+    try:
+        import tkinter
+    except ImportError:
+        return None, "tkinter no está disponible"
+    try:
+        import interfaz_notas
+    except tkinter.TclError as e:
+        return None, f"sin pantalla ({e})"
+    interfaz_notas.ventana.withdraw()
+    return interfaz_notas, None
+
+
+def medir_gui(gui, tamano, repeticiones):
+    gui.estudiantes.clear()
+    gui.orden_iids.clear()
+    for est in generador.generar_gui(tamano):
+        iid = gui.nuevo_iid()
+        gui.estudiantes[iid] = modelo.desde_gui(est)
+        gui.orden_iids.append(iid)
+
+    def actualizar():
+        gui.actualizar_tabla()
+        gui.ventana.update_idletasks()
+
+    t = _tiempos(actualizar, repeticiones)
+    gui.tabla.delete(*gui.tabla.get_children())
+    gui.estudiantes.clear()
+    gui.orden_iids.clear()
+    return [_resultado("gui_actualizar_tabla", tamano, t)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de control_notas.py e interfaz_notas.py.")
+    parser.add_argument("--tamanos", default=",".join(map(str, TAMANOS)),
+                        help="tamaños separados por comas (por defecto 1k, 10k, 100k y 1M)")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--salida", default=f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument("--sin-gui", action="store_true", help="no medir la GUI")
+    args = parser.parse_args()
+    tamanos = [int(t) for t in args.tamanos.split(",") if t.strip()]
+    salida = os.path.abspath(args.salida)
+
+    original = os.getcwd()
+    directorio = tempfile.mkdtemp(prefix="bench_notas_")
+    os.chdir(directorio)
+    resultados = []
+    try:
+        gui, motivo = (None, "--sin-gui") if args.sin_gui else _cargar_gui()
+        if gui is None:
+            print(f" GUI omitida: {motivo}")
+        for tamano in tamanos:
+            print(f" Midiendo {tamano:,} estudiantes...")
+            resultados.extend(medir_cli(tamano, args.repeticiones))
+            if gui is not None:
+                resultados.extend(medir_gui(gui, tamano, args.repeticiones))
+            gc.collect()
+    finally:
+        os.chdir(original)
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    informe = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "almacenamiento": cn.ALMACENAMIENTO,
+        "repeticiones": args.repeticiones,
+        "resultados": resultados,
+    }
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+
+    print(f"\n {'OPERACIÓN':<28}{'TAMAÑO':>10}{'MEJOR (s)':>12}{'MEDIANA (s)':>13}{'POR LLAMADA':>14}")
+    for r in resultados:
+        print(f" {r['operacion']:<28}{r['tamano']:>10,}{r['mejor']:>12.4f}{r['mediana']:>13.4f}"
+              f"{r['por_llamada'] * 1e3:>11.3f} ms")
+    print(f"\n Resultados guardados en {salida}\n")
@@ -0,0 +1,127 @@
+# ==========================================
+# BÚSQUEDA POR TEXTO (índice invertido)
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Índice invertido sin distinción de mayúsculas ni tildes para buscar por
+# prefijo o por subcadena en nombre, apellido, carrera, municipio, etc.
+# Se mantiene incrementalmente: agregar / quitar / actualizar un registro solo
+# toca las palabras de ese registro.
+#
+#   palabra  -> ids de los registros que la contienen
+#   trigrama -> palabras que lo contienen (para búsqueda por subcadena)
+#   lista ordenada de palabras (para búsqueda por prefijo con bisect)
+# ==========================================
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+import instrumentacion
+
+_SEPARADORES = re.compile(r"[^\w]+")
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: 'León' -> 'leon'."""
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def palabras(texto):
+    return [p for p in _SEPARADORES.split(normalizar(texto)) if p]
+
+
+def coincide(consulta, textos):
+    """Misma regla que IndiceTexto.buscar (subcadena) pero sin índice, para
+    revisar un solo registro."""
+    propias = [p for texto in textos for p in palabras(texto)]
+    return all(any(f in p for p in propias) for f in palabras(consulta))
+
+
+def _trigramas(palabra):
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+class IndiceTexto:
+    def __init__(self):
+        self._ids_por_palabra = {}
+        self._palabras_por_id = {}
+        self._palabras_por_trigrama = {}
+        self._vocabulario = []  # ordenado
+
+    def __len__(self):
+        return len(self._palabras_por_id)
+
+    def __contains__(self, id_registro):
+        return id_registro in self._palabras_por_id
+
+    # ---------- Mantenimiento ----------
+
+    def agregar(self, id_registro, textos):
+        if id_registro in self._palabras_por_id:
+            self.quitar(id_registro)
+        propias = set()
+        for texto in textos:
+            propias.update(palabras(texto))
+        self._palabras_por_id[id_registro] = propias
+        for palabra in propias:
+            ids = self._ids_por_palabra.get(palabra)
+            if ids is None:
+                ids = self._ids_por_palabra[palabra] = set()
+                insort(self._vocabulario, palabra)
+                for t in _trigramas(palabra):
+                    self._palabras_por_trigrama.setdefault(t, set()).add(palabra)
+            ids.add(id_registro)
+
+    def quitar(self, id_registro):
+        for palabra in self._palabras_por_id.pop(id_registro, ()):
+            ids = self._ids_por_palabra[palabra]
+            ids.discard(id_registro)
+            if ids:
+                continue
+            # La palabra ya no aparece en ningún registro
+            del self._ids_por_palabra[palabra]
+            del self._vocabulario[bisect_left(self._vocabulario, palabra)]
+            for t in _trigramas(palabra):
+                conjunto = self._palabras_por_trigrama[t]
+                conjunto.discard(palabra)
+                if not conjunto:
+                    del self._palabras_por_trigrama[t]
+
+    actualizar = agregar
+
+    # ---------- Consultas ----------
+
+    def _palabras_con_prefijo(self, prefijo):
+        i = bisect_left(self._vocabulario, prefijo)
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(prefijo):
+            yield self._vocabulario[i]
+            i += 1
+
+    def _palabras_con_subcadena(self, fragmento):
+        if len(fragmento) < 3:
+            # Fragmentos cortos: se recorre el vocabulario (palabras distintas,
+            # no registros), que es mucho más pequeño que la lista
+            return [p for p in self._vocabulario if fragmento in p]
+        candidatas = None
+        for t in _trigramas(fragmento):
+            conjunto = self._palabras_por_trigrama.get(t)
+            if not conjunto:
+                return []
+            candidatas = set(conjunto) if candidatas is None else candidatas & conjunto
+        return [p for p in candidatas if fragmento in p]
+
+    @instrumentacion.medir("buscar_texto")
+    def buscar(self, consulta, modo="subcadena"):
+        """Ids de los registros que contienen todas las palabras de la consulta
+        (como prefijo o como subcadena de alguna de sus palabras)."""
+        buscar_palabras = self._palabras_con_prefijo if modo == "prefijo" else self._palabras_con_subcadena
+        resultado = None
+        for fragmento in palabras(consulta):
+            ids = set()
+            for palabra in buscar_palabras(fragmento):
+                ids |= self._ids_por_palabra[palabra]
+            resultado = ids if resultado is None else resultado & ids
+            if not resultado:
+                return set()
+        return resultado or set()
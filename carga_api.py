@@ -0,0 +1,155 @@
+# ==========================================
+# GENERADOR DE CARGA PARA servidor_api.py
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Abre varios clientes concurrentes (una conexión keep-alive cada uno) que
+# mezclan consultas por carnet, páginas del listado y el promedio general.
+# Con --escrituras una parte de las peticiones registra un estudiante de prueba
+# y luego lo elimina, así que los datos quedan como estaban.
+# Al final informa peticiones por segundo y latencias (p50, p90, p99).
+#
+# Uso:
+#     python carga_api.py [--url http://127.0.0.1:8080] [--clientes 50] [--peticiones 200] [--escrituras 0.1]
+# ==========================================
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+_secuencia = itertools.count()
+
+
+def _carnet_prueba():
+    n = next(_secuencia)
+    return f"{90 + n // 1000000 % 10}-{n % 100000:05d}-{n // 100000 % 10}"
+
+
+def _cedula_prueba(carnet):
+    # Única por carnet (la cédula no se puede repetir): sus 8 dígitos
+    digitos = carnet.replace("-", "")
+    return f"001-{digitos[:6]}-{digitos[6:]}00A"
+
+
+def _estudiante_prueba():
+    carnet = _carnet_prueba()
+    return {
+        "carnet": carnet, "nombre": "Prueba De Carga", "estado_civil": "Soltero",
+        "sexo": "M", "cedula": _cedula_prueba(carnet), "direccion": "", "departamento": "Leon",
+        "municipio": "Leon", "area_conocimiento": "", "carrera": "Sistemas", "anio": 1,
+        "plan_estudio": "", "ingreso_padre": 0,
+        "notas": [{"materia": "Carga", "nota": random.randint(0, 100)}],
+    }
+
+
+class Cliente:
+    def __init__(self, host, puerto):
+        self.host, self.puerto = host, puerto
+        self.reader = self.writer = None
+
+    async def peticion(self, metodo, ruta, datos=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.puerto)
+        cuerpo = b"" if datos is None else json.dumps(datos).encode("utf-8")
+        self.writer.write(
+            f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+        await self.writer.drain()
+        cabecera = await self.reader.readuntil(b"\r\n\r\n")
+        lineas = cabecera.decode("latin-1").split("\r\n")
+        estado = int(lineas[0].split(" ")[1])
+        largo = 0
+        for linea in lineas[1:]:
+            nombre, _, valor = linea.partition(":")
+            if nombre.lower() == "content-length":
+                largo = int(valor)
+        respuesta = await self.reader.readexactly(largo)
+        return estado, json.loads(respuesta) if respuesta else None
+
+    def cerrar(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def _cliente(host, puerto, peticiones, escrituras, carnets, paginas, latencias, errores):
+    cliente = Cliente(host, puerto)
+    propios = []
+    try:
+        for _ in range(peticiones):
+            sorteo = random.random()
+            if sorteo < escrituras:
+                if propios and random.random() < 0.5:
+                    metodo, ruta, datos = "DELETE", f"/estudiantes/{propios.pop()}", None
+                else:
+                    datos = _estudiante_prueba()
+                    metodo, ruta = "POST", "/estudiantes"
+                    propios.append(datos["carnet"])
+            elif sorteo < escrituras + (1 - escrituras) * 0.6 and carnets:
+                metodo, ruta, datos = "GET", f"/estudiantes/{random.choice(carnets)}", None
+            elif sorteo < escrituras + (1 - escrituras) * 0.9:
+                orden = random.choice(["", "&orden=promedio", "&orden=nombre"])
+                metodo, ruta, datos = "GET", f"/estudiantes?pagina={random.randint(1, paginas)}{orden}", None
+            else:
+                metodo, ruta, datos = "GET", "/promedio", None
+
+            inicio = time.perf_counter()
+            estado, _ = await cliente.peticion(metodo, ruta, datos)
+            latencias.append(time.perf_counter() - inicio)
+            if estado >= 400:
+                errores.append((metodo, ruta, estado))
+        for carnet in propios:  # deja los datos como estaban
+            await cliente.peticion("DELETE", f"/estudiantes/{carnet}")
+    finally:
+        cliente.cerrar()
+
+
+def _percentil(ordenadas, q):
+    return ordenadas[min(len(ordenadas) - 1, int(q / 100 * len(ordenadas)))]
+
+
+async def medir(url, clientes, peticiones, escrituras):
+    partes = urlsplit(url)
+    host, puerto = partes.hostname or "127.0.0.1", partes.port or 80
+
+    # Carnets reales para las consultas por carnet
+    preparacion = Cliente(host, puerto)
+    _, listado = await preparacion.peticion("GET", "/estudiantes?tamano=500")
+    preparacion.cerrar()
+    carnets = [est["carnet"] for est in listado["estudiantes"]]
+    paginas = max(listado["total"] // 20, 1)
+
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, puerto, peticiones, escrituras, carnets, paginas, latencias, errores)
+                           for _ in range(clientes)))
+    segundos = time.perf_counter() - inicio
+    return latencias, errores, segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para servidor_api.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--peticiones", type=int, default=200, help="peticiones por cliente")
+    parser.add_argument("--escrituras", type=float, default=0.0,
+                        help="fracción de peticiones que registran o eliminan estudiantes de prueba")
+    args = parser.parse_args()
+
+    latencias, errores, segundos = asyncio.run(medir(args.url, args.clientes, args.peticiones, args.escrituras))
+    ordenadas = sorted(latencias)
+    print(f"\n {len(latencias)} peticiones de {args.clientes} clientes en {segundos:.2f} s")
+    print(f" Peticiones por segundo: {len(latencias) / segundos:,.0f}")
+    print(f" Latencia p50: {_percentil(ordenadas, 50) * 1000:.2f} ms   "
+          f"p90: {_percentil(ordenadas, 90) * 1000:.2f} ms   "
+          f"p99: {_percentil(ordenadas, 99) * 1000:.2f} ms   "
+          f"máx: {ordenadas[-1] * 1000:.2f} ms")
+    print(f" Respuestas con error: {len(errores)}\n")
+    for metodo, ruta, estado in errores[:10]:
+        print(f"   {estado} {metodo} {ruta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# ==========================================
+# CONSULTAS CON FILTROS (índices secundarios)
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Responde preguntas como "estudiantes de León con ingreso del padre menor
+# que C$5000 en año 1" sin recorrer a todos los estudiantes:
+#
+#   campo categórico -> valor normalizado -> ids     (departamento, municipio,
+#                                                     carrera, sexo, estado civil)
+#   campo numérico   -> lista ordenada de (valor, id) (ingreso_padre, anio)
+#
+# Cada condición da un conjunto (o un tramo de la lista ordenada, que se
+# encuentra con bisect). Se parte del más pequeño y las demás condiciones
+# solo se comprueban sobre esos candidatos. Los índices se mantienen
+# incrementalmente, como IndiceTexto en busqueda.py.
+#
+# Los filtros se escriben separados por comas; un campo categórico admite
+# varios valores con "|":
+#     departamento=Leon, ingreso_padre<5000, anio=1
+#     municipio=Leon|Nagarote, sexo=F, anio>=3
+# ==========================================
+
+import re
+from bisect import bisect_left, insort
+
+import busqueda
+import instrumentacion
+
+CATEGORICOS = ("departamento", "municipio", "carrera", "sexo", "estado_civil")
+NUMERICOS = ("ingreso_padre", "anio")
+OPERADORES = ("<=", ">=", "=", "<", ">")
+SINONIMOS = {"año": "anio", "ingreso": "ingreso_padre", "estado civil": "estado_civil"}
+
+_CONDICION = re.compile(r"^\s*([^<>=]+?)\s*(<=|>=|=|<|>)\s*(.+?)\s*$")
+
+
+class _Maximo:
+    # Mayor que cualquier id: (valor, _MAXIMO) queda después de todos los
+    # pares con ese mismo valor en la lista ordenada
+    def __lt__(self, otro):
+        return False
+
+    def __gt__(self, otro):
+        return True
+
+
+_MAXIMO = _Maximo()
+
+
+def _numero(valor):
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return valor
+    return None
+
+
+def interpretar(texto):
+    """Convierte el texto de los filtros en una lista de (campo, operador,
+    valor). Lanza ValueError si algún filtro no se entiende."""
+    condiciones = []
+    for parte in texto.split(","):
+        if not parte.strip():
+            continue
+        encontrado = _CONDICION.match(parte)
+        if not encontrado:
+            raise ValueError(f"Filtro no válido: '{parte.strip()}'. Ejemplo: anio=1")
+        campo, operador, valor = encontrado.groups()
+        campo = campo.lower()
+        campo = SINONIMOS.get(campo, campo).replace(" ", "_")
+        if campo in CATEGORICOS:
+            if operador != "=":
+                raise ValueError(f"El campo {campo} solo admite '='.")
+            condiciones.append((campo, operador, {busqueda.normalizar(v.strip()) for v in valor.split("|")}))
+        elif campo in NUMERICOS:
+            try:
+                condiciones.append((campo, operador, float(valor)))
+            except ValueError:
+                raise ValueError(f"El valor de {campo} debe ser un número.") from None
+        else:
+            raise ValueError(f"Campo desconocido: {campo}. Campos: {', '.join(CATEGORICOS + NUMERICOS)}.")
+    return condiciones
+
+
+def _cumple_numero(valor, operador, limite):
+    if valor is None:
+        return False
+    if operador == "=":
+        return valor == limite
+    if operador == "<":
+        return valor < limite
+    if operador == "<=":
+        return valor <= limite
+    if operador == ">":
+        return valor > limite
+    return valor >= limite
+
+
+def cumple(registro, condiciones):
+    """Misma regla que IndiceConsultas.consultar pero sin índice, para
+    revisar un solo registro."""
+    for campo, operador, valor in condiciones:
+        if campo in CATEGORICOS:
+            if busqueda.normalizar(registro.get(campo, "")) not in valor:
+                return False
+        elif not _cumple_numero(_numero(registro.get(campo)), operador, valor):
+            return False
+    return True
+
+
+class IndiceConsultas:
+    def __init__(self):
+        self._por_valor = {campo: {} for campo in CATEGORICOS}
+        self._ordenados = {campo: [] for campo in NUMERICOS}
+        self._valores_por_id = {}  # id -> {campo: valor indexado}
+        self._normalizados = {}    # texto -> normalizado (hay pocos valores distintos)
+
+    def __len__(self):
+        return len(self._valores_por_id)
+
+    # ---------- Mantenimiento ----------
+
+    def _normalizar(self, texto):
+        normalizado = self._normalizados.get(texto)
+        if normalizado is None:
+            normalizado = self._normalizados[texto] = busqueda.normalizar(texto)
+        return normalizado
+
+    def _indexar(self, id_registro, registro):
+        valores = {}
+        for campo in CATEGORICOS:
+            valor = valores[campo] = self._normalizar(registro.get(campo, ""))
+            self._por_valor[campo].setdefault(valor, set()).add(id_registro)
+        for campo in NUMERICOS:
+            valores[campo] = _numero(registro.get(campo))
+        self._valores_por_id[id_registro] = valores
+        return valores
+
+    def construir(self, pares):
+        """Carga de una vez (id, registro); las listas se ordenan al final."""
+        for id_registro, registro in pares:
+            if id_registro in self._valores_por_id:
+                self.quitar(id_registro)
+            valores = self._indexar(id_registro, registro)
+            for campo in NUMERICOS:
+                if valores[campo] is not None:
+                    self._ordenados[campo].append((valores[campo], id_registro))
+        for ordenados in self._ordenados.values():
+            ordenados.sort()
+
+    def agregar(self, id_registro, registro):
+        if id_registro in self._valores_por_id:
+            self.quitar(id_registro)
+        valores = self._indexar(id_registro, registro)
+        for campo in NUMERICOS:
+            if valores[campo] is not None:
+                insort(self._ordenados[campo], (valores[campo], id_registro))
+
+    def quitar(self, id_registro):
+        valores = self._valores_por_id.pop(id_registro, None)
+        if valores is None:
+            return
+        for campo in CATEGORICOS:
+            ids = self._por_valor[campo][valores[campo]]
+            ids.discard(id_registro)
+            if not ids:
+                del self._por_valor[campo][valores[campo]]
+        for campo in NUMERICOS:
+            if valores[campo] is not None:
+                ordenados = self._ordenados[campo]
+                del ordenados[bisect_left(ordenados, (valores[campo], id_registro))]
+
+    actualizar = agregar
+
+    # ---------- Consultas ----------
+
+    def _tramo(self, campo, operador, limite):
+        # Posiciones [desde, hasta) de la lista ordenada que cumplen la condición
+        ordenados = self._ordenados[campo]
+        antes = bisect_left(ordenados, (limite,))
+        despues = bisect_left(ordenados, (limite, _MAXIMO))
+        return {"=": (antes, despues), "<": (0, antes), "<=": (0, despues),
+                ">": (despues, len(ordenados)), ">=": (antes, len(ordenados))}[operador]
+
+    @instrumentacion.medir("consultar_filtros")
+    def consultar(self, condiciones):
+        """Ids de los registros que cumplen todas las condiciones (lista de
+        interpretar). Sin condiciones devuelve todos."""
+        if not condiciones:
+            return set(self._valores_por_id)
+        # Cada filtro es un conjunto de ids (o la unión de varios) o un tramo de
+        # una lista ordenada; los tramos del mismo campo se intersecan entre sí
+        conjuntos = []
+        tramos = {}
+        for campo, operador, valor in condiciones:
+            if campo in CATEGORICOS:
+                conjuntos.append([self._por_valor[campo].get(v, set()) for v in valor])
+            else:
+                desde, hasta = self._tramo(campo, operador, valor)
+                anterior = tramos.get(campo, (0, len(self._ordenados[campo])))
+                tramos[campo] = (max(desde, anterior[0]), min(hasta, anterior[1]))
+
+        # Se parte del filtro con menos ids y los demás se aplican sobre él
+        filtros = [(sum(map(len, grupo)), "conjunto", grupo) for grupo in conjuntos]
+        filtros += [(max(hasta - desde, 0), campo, (desde, hasta)) for campo, (desde, hasta) in tramos.items()]
+        filtros.sort(key=lambda filtro: filtro[0])
+
+        _, tipo, datos = filtros[0]
+        if tipo == "conjunto":
+            resultado = set().union(*datos)
+        else:
+            resultado = {id_registro for _, id_registro in self._ordenados[tipo][datos[0]:datos[1]]}
+        for _, tipo, datos in filtros[1:]:
+            if not resultado:
+                break
+            if tipo == "conjunto" and len(datos) == 1:
+                resultado &= datos[0]  # recorre el menor de los dos conjuntos
+            elif tipo == "conjunto":
+                resultado = {i for i in resultado if any(i in ids for ids in datos)}
+            else:
+                # Se comprueba la posición del propio valor dentro del tramo
+                ordenados = self._ordenados[tipo]
+                desde, hasta = datos
+                minimo = ordenados[desde] if desde < hasta else None
+                maximo = ordenados[hasta - 1] if desde < hasta else None
+                resultado = {i for i in resultado if minimo is not None
+                             and self._valores_por_id[i][tipo] is not None
+                             and minimo <= (self._valores_por_id[i][tipo], i) <= maximo}
+        return resultado
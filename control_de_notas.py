@@ -9,57 +9,61 @@
 # y control de múltiples notas académicas.
 # ==========================================
 
-import re
+import modelo
+import validacion
 
 # ---------- FUNCIONES DE VALIDACIÓN ----------
+# Envolturas de un solo valor sobre el motor por columnas de validacion.py
+
+def _validar(campo, valor):
+    valor, codigo = validacion.validar(campo, valor)
+    if codigo is not None:
+        raise ValueError(validacion.MENSAJES[codigo])
+    return valor
+
 
 def validar_carnet(carnet):
     """Valida el formato del carnet (##-#####-#)."""
-    patron = r"^\d{2}-\d{5}-\d$"
-    if not re.match(patron, carnet):
-        raise ValueError("Carnet inválido. Ejemplo válido: 25-02395-0")
-    return carnet
+    return _validar("carnet", carnet)
 
 
 def validar_estado_civil(estado):
     """Valida el estado civil del estudiante."""
-    opciones = ["soltero", "casado", "divorciado", "viudo"]
-    if estado.lower() not in opciones:
-        raise ValueError("Estado civil inválido. Opciones: Soltero, Casado, Divorciado, Viudo.")
-    return estado.capitalize()
+    return _validar("estado_civil", estado)
 
 
 def validar_sexo(sexo):
     """Valida el sexo (M/F)."""
-    if sexo.upper() not in ["M", "F"]:
-        raise ValueError("Sexo inválido. Debe ser M (masculino) o F (femenino).")
-    return sexo.upper()
+    return _validar("sexo", sexo)
 
 
 def validar_cedula(cedula):
     """Valida el formato de la cédula nicaragüense."""
-    patron = r"^\d{3}-\d{6}-\d{4}[A-Z]$"
-    if not re.match(patron, cedula):
-        raise ValueError("Cédula inválida. Ejemplo válido: 001-123456-0000A")
-    return cedula
+    return _validar("cedula", cedula)
 
 
 def validar_anio(anio):
     """Valida el año de estudio (1 a 6)."""
-    if not anio.isdigit() or not (1 <= int(anio) <= 6):
-        raise ValueError("Año inválido. Debe estar entre 1 y 6.")
-    return int(anio)
+    return _validar("anio", anio)
 
 
 def validar_nota(nota):
     """Valida una nota entre 0 y 100."""
-    try:
-        nota = float(nota)
-        if nota < 0 or nota > 100:
-            raise ValueError("La nota debe estar entre 0 y 100.")
-    except ValueError:
-        raise ValueError("Nota inválida. Debe ser un número entre 0 y 100.")
-    return nota
+    return _validar("nota", str(nota))
+
+
+# ---------- UNICIDAD ----------
+# Carnets y cédulas ya registrados, para rechazar duplicados en O(1)
+carnets_registrados = set()
+cedulas_registradas = set()
+
+
+def validar_unicos(carnet=None, cedula=None):
+    """Rechaza un carnet o una cédula que ya estén registrados."""
+    if carnet in carnets_registrados:
+        raise ValueError(validacion.MENSAJES["carnet_repetido"])
+    if cedula in cedulas_registradas:
+        raise ValueError(validacion.MENSAJES["cedula_repetida"])
 
 
 # ---------- FUNCIONES PRINCIPALES ----------
@@ -71,10 +75,12 @@ def agregar_estudiante(estudiantes):
         print("           REGISTRO DE MATRÍCULA")
         print("===========================================")
         carnet = validar_carnet(input("Carnet (ejemplo 25-02395-0): "))
+        validar_unicos(carnet=carnet)
         nombre = input("Nombre completo: ").title()
         estado_civil = validar_estado_civil(input("Estado civil (Soltero/Casado/Divorciado/Viudo): "))
         sexo = validar_sexo(input("Sexo (M/F): "))
         cedula = validar_cedula(input("Cédula (001-123456-0000A): "))
+        validar_unicos(cedula=cedula)
         direccion = input("Dirección: ").title()
         departamento = input("Departamento: ").title()
         municipio = input("Municipio: ").title()
@@ -97,8 +103,8 @@ def agregar_estudiante(estudiantes):
             print("   No se ingresaron notas. El registro no se guardará.")
             return
 
-        # Guardar toda la información
-        estudiantes.append({
+        # Guardar toda la información (en memoria como modelo.Estudiante)
+        estudiantes.append(modelo.desde_cli({
             "carnet": carnet,
             "nombre": nombre,
             "estado_civil": estado_civil,
@@ -112,7 +118,9 @@ def agregar_estudiante(estudiantes):
             "anio": anio,
             "plan_estudio": plan_estudio,
             "notas": notas
-        })
+        }))
+        carnets_registrados.add(carnet)
+        cedulas_registradas.add(cedula)
         print(f"\n  Estudiante '{nombre}' matriculado correctamente.\n")
 
     except ValueError as e:
@@ -124,26 +132,26 @@ def mostrar_matricula(est):
     print("\n===========================================")
     print("          HOJA DE MATRÍCULA - UNAN-León")
     print("===========================================\n")
-    print(f"Carnet:           {est['carnet']}")
-    print(f"Nombre completo:  {est['nombre']}")
-    print(f"Cédula:           {est['cedula']}")
-    print(f"Sexo:             {est['sexo']}")
-    print(f"Estado civil:     {est['estado_civil']}")
-    print(f"Dirección:        {est['direccion']}")
-    print(f"Departamento:     {est['departamento']}")
-    print(f"Municipio:        {est['municipio']}")
-    print(f"Área:             {est['area_conocimiento']}")
-    print(f"Carrera:          {est['carrera']}")
-    print(f"Año:              {est['anio']}")
-    print(f"Plan de estudio:  {est['plan_estudio']}")
+    print(f"Carnet:           {est.carnet}")
+    print(f"Nombre completo:  {est.nombre}")
+    print(f"Cédula:           {est.cedula}")
+    print(f"Sexo:             {est.sexo}")
+    print(f"Estado civil:     {est.estado_civil}")
+    print(f"Dirección:        {est.direccion}")
+    print(f"Departamento:     {est.departamento}")
+    print(f"Municipio:        {est.municipio}")
+    print(f"Área:             {est.area_conocimiento}")
+    print(f"Carrera:          {est.carrera}")
+    print(f"Año:              {est.anio}")
+    print(f"Plan de estudio:  {est.plan_estudio}")
     print("-------------------------------------------")
     print("            DETALLE DE NOTAS")
     print("-------------------------------------------")
     print(f"{'Materia':<25}{'Nota':>10}{'Estado':>15}")
     print("-" * 50)
-    for n in est["notas"]:
-        estado = "Aprobado ✅" if n["nota"] >= 60 else "Reprobado ❌"
-        print(f"{n['materia']:<25}{n['nota']:>10.2f}{estado:>15}")
+    for n in est.lista_notas():
+        estado = "Aprobado ✅" if n.aprobada else "Reprobado ❌"
+        print(f"{n.materia:<25}{n.nota:>10.2f}{estado:>15}")
     print("-" * 50)
 
 
@@ -151,7 +159,7 @@ def buscar_estudiante(estudiantes):
     """Busca e imprime la hoja de matrícula de un estudiante."""
     carnet = input("\nIngrese el carnet del estudiante a buscar: ")
     for est in estudiantes:
-        if est["carnet"] == carnet:
+        if est.carnet == carnet:
             mostrar_matricula(est)
             return
     print("\nNo se encontró un estudiante con ese carnet.\n")
@@ -167,9 +175,8 @@ def calcular_promedio(estudiantes):
     total_notas = 0
     cantidad_notas = 0
     for est in estudiantes:
-        for n in est["notas"]:
-            total_notas += n["nota"]
-            cantidad_notas += 1
+        total_notas += sum(est.notas)
+        cantidad_notas += len(est.notas)
 
     promedio = total_notas / cantidad_notas if cantidad_notas > 0 else 0
     print(f"Promedio general de notas: {promedio:.2f}\n")
@@ -186,8 +193,7 @@ def mostrar_todos(estudiantes):
     print("-" * 80)
 
     for est in estudiantes:
-        promedio = sum(n["nota"] for n in est["notas"]) / len(est["notas"])
-        print(f"{est['carnet']:<15}{est['nombre']:<30}{est['carrera']:<25}{promedio:<10.2f}")
+        print(f"{est.carnet:<15}{est.nombre:<30}{est.carrera:<25}{est.promedio:<10.2f}")
     print("-" * 80 + "\n")
 
 
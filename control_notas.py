@@ -6,74 +6,693 @@
 # Sergio Angel Maldonado Serrano y Natasha Michelle Espinosa Fonseca
 # ==========================================
 
-import re
+import copy
+import heapq
 import json
 import os
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from itertools import islice
+from string import Template
+
+import almacen_binario
+import almacen_particionado
+import almacen_sqlite
+import busqueda
+import consultas
+import historial
+import instrumentacion
+import modelo
+import validacion
 
 ARCHIVO = "estudiantes.json"
+ARCHIVO_DIARIO = "estudiantes.diario.jsonl"
+ARCHIVO_AGREGADOS = "estudiantes.agregados.json"
+ARCHIVO_VERSION = "estudiantes.version"
+ARCHIVO_HISTORIAL = "estudiantes.historial.jsonl"
+
+# "json": reescribe estudiantes.json en cada cambio
+# "diario": agrega cada cambio como una línea en ARCHIVO_DIARIO
+# "sqlite": usa la base de datos de almacen_sqlite.py
+# "particionado": un fichero por carrera y año (almacen_particionado.py)
+# "binario": reescribe en cada cambio la instantánea compacta de almacen_binario.py
+ALMACENAMIENTO = os.environ.get("NOTAS_ALMACENAMIENTO", "json")
+UMBRAL_COMPACTACION = 1024 * 1024  # bytes del diario antes de compactar
+
+# Con NOTAS_CARGA_PEREZOSA=1 las consultas de solo lectura recorren el fichero
+# estudiante por estudiante y la lista completa solo se carga al modificar datos
+CARGA_PEREZOSA = os.environ.get("NOTAS_CARGA_PEREZOSA") == "1"
+TAMANO_BLOQUE = 64 * 1024
+
+TAMANO_PAGINA = int(os.environ.get("NOTAS_TAMANO_PAGINA", "20"))
+
+# Historial de cambios por registro para deshacer, rehacer y volver a una
+# fecha (historial.py). NOTAS_HISTORIAL=0 lo desactiva.
+HISTORIAL = os.environ.get("NOTAS_HISTORIAL", "1") != "0"
+historial_cambios = historial.Historial(ARCHIVO_HISTORIAL, clave=lambda est: est["carnet"],
+                                        ignorados=("version", "promedio"))
+
+# Ficheros que leen o escriben las funciones medidas (ver instrumentacion.py)
+def _ficheros_datos(*_):
+    if ALMACENAMIENTO == "sqlite":
+        return [almacen_sqlite.ARCHIVO_SQLITE]
+    if ALMACENAMIENTO == "binario":
+        return [almacen_binario.ARCHIVO_BINARIO]
+    if ALMACENAMIENTO == "particionado":
+        directorio = almacen_particionado.DIRECTORIO
+        particiones = almacen_particionado.leer_manifiesto()["particiones"].values()
+        return ([os.path.join(directorio, almacen_particionado.MANIFIESTO)]
+                + [os.path.join(directorio, info["archivo"]) for info in particiones])
+    return [ARCHIVO, ARCHIVO_DIARIO]
+
+def _fichero_principal(*_):
+    if ALMACENAMIENTO in ("particionado", "binario"):
+        return _ficheros_datos()
+    return [almacen_sqlite.ARCHIVO_SQLITE if ALMACENAMIENTO == "sqlite" else ARCHIVO]
 
 # ---------- FUNCIONES DE VALIDACIÓN ----------
+# Envolturas de un solo valor sobre el motor por columnas de validacion.py
+
+def _validar(campo, valor):
+    valor, codigo = validacion.validar(campo, valor)
+    if codigo is not None:
+        raise ValueError(validacion.MENSAJES[codigo])
+    return valor
 
+@instrumentacion.medir("validar_carnet")
 def validar_carnet(carnet):
-    patron = r"^\d{2}-\d{5}-\d$"
-    if not re.match(patron, carnet):
-        raise ValueError("Carnet inválido. Ejemplo válido: 25-02395-0")
-    return carnet
+    return _validar("carnet", carnet)
 
+@instrumentacion.medir("validar_estado_civil")
 def validar_estado_civil(estado):
-    opciones = ["soltero", "casado", "divorciado", "viudo"]
-    if estado.lower() not in opciones:
-        raise ValueError("Estado civil inválido. Opciones: Soltero, Casado, Divorciado, Viudo.")
-    return estado.capitalize()
+    return _validar("estado_civil", estado)
 
+@instrumentacion.medir("validar_sexo")
 def validar_sexo(sexo):
-    if sexo.upper() not in ["M", "F"]:
-        raise ValueError("Sexo inválido. Debe ser M o F.")
-    return sexo.upper()
+    return _validar("sexo", sexo)
 
+@instrumentacion.medir("validar_cedula")
 def validar_cedula(cedula):
-    patron = r"^\d{3}-\d{6}-\d{4}[A-Z]$"
-    if not re.match(patron, cedula):
-        raise ValueError("Cédula inválida. Ejemplo válido: 001-123456-0000A")
-    return cedula
+    return _validar("cedula", cedula)
 
+@instrumentacion.medir("validar_anio")
 def validar_anio(anio):
-    if not anio.isdigit() or not (1 <= int(anio) <= 6):
-        raise ValueError("Año inválido. Debe estar entre 1 y 6.")
-    return int(anio)
+    return _validar("anio", anio)
 
+@instrumentacion.medir("validar_nota")
 def validar_nota(nota):
-    try:
-        nota = float(nota)
-        if nota < 0 or nota > 100:
-            raise ValueError
-    except ValueError:
-        raise ValueError("Nota inválida. Debe estar entre 0 y 100.")
-    return nota
+    return _validar("nota", str(nota))
 
+@instrumentacion.medir("validar_ingreso")
 def validar_ingreso(monto):
-    try:
-        monto = float(monto)
-        if monto < 0:
-            raise ValueError
-    except ValueError:
-        raise ValueError("Monto inválido. Debe ser un número positivo.")
-    return monto
+    return _validar("ingreso_padre", str(monto))
+
+# ---------- ÍNDICES EN MEMORIA ----------
+# indice_carnet: carnet -> posición del estudiante en la lista
+# indice_cedula: cédula -> carnet
+# Son también las restricciones de unicidad (ver comprobar_unicos)
+indice_carnet = {}
+indice_cedula = {}
+
+# Índice de texto para "buscar por nombre"; se construye la primera vez que
+# se usa y desde ahí se mantiene en cada cambio
+CAMPOS_BUSQUEDA = ("nombre", "carrera", "municipio")
+_indice_texto = None
+
+def indice_texto(estudiantes):
+    global _indice_texto
+    if _indice_texto is None:
+        _indice_texto = busqueda.IndiceTexto()
+        for est in estudiantes:
+            _indice_texto.agregar(est["carnet"], [est.get(c, "") for c in CAMPOS_BUSQUEDA])
+    return _indice_texto
+
+# Índices secundarios para "consultar con filtros" (departamento, municipio,
+# ingreso del padre, año...); igual que el de texto, al primer uso
+_indice_consultas = None
+
+def indice_consultas(estudiantes):
+    global _indice_consultas
+    if _indice_consultas is None:
+        _indice_consultas = consultas.IndiceConsultas()
+        _indice_consultas.construir((est["carnet"], est) for est in estudiantes)
+    return _indice_consultas
+
+# Índices de orden para el listado: criterio -> lista ordenada de (clave, carnet).
+# También se construyen al primer uso y se mantienen con bisect. La lista no
+# conserva el orden de ingreso (una baja mueve al último al hueco), así que el
+# listado por defecto con la lista en memoria se ordena por carnet.
+ORDENES = {"K": "carnet", "P": "promedio", "N": "nombre", "C": "carrera"}
+_indices_orden = {}
+_claves_orden = {}  # criterio -> {carnet: clave}, para poder quitar la clave vieja
+
+def clave_orden(criterio, est):
+    if criterio == "carnet":
+        return (est["carnet"],)
+    if criterio == "promedio":
+        promedio = est["promedio"] if "promedio" in est else promedio_estudiante(est)
+        return (-promedio, est["carnet"])
+    nombre = busqueda.normalizar(est["nombre"])
+    if criterio == "nombre":
+        return (nombre, est["carnet"])
+    return (busqueda.normalizar(est["carrera"]), nombre, est["carnet"])
+
+def indice_orden(estudiantes, criterio):
+    if criterio not in _indices_orden:
+        claves = {est["carnet"]: clave_orden(criterio, est) for est in estudiantes}
+        _claves_orden[criterio] = claves
+        _indices_orden[criterio] = sorted((clave, carnet) for carnet, clave in claves.items())
+    return _indices_orden[criterio]
+
+def _quitar_de_orden(carnet):
+    for criterio, claves in _claves_orden.items():
+        clave = claves.pop(carnet, None)
+        if clave is not None:
+            orden = _indices_orden[criterio]
+            del orden[bisect_left(orden, (clave, carnet))]
+
+def reindexar_estudiante(est):
+    # Se llama después de modificar los datos de un estudiante ya insertado
+    if _indice_texto is not None:
+        _indice_texto.actualizar(est["carnet"], [est.get(c, "") for c in CAMPOS_BUSQUEDA])
+    if _indice_consultas is not None:
+        _indice_consultas.actualizar(est["carnet"], est)
+    _quitar_de_orden(est["carnet"])
+    for criterio, claves in _claves_orden.items():
+        clave = claves[est["carnet"]] = clave_orden(criterio, est)
+        insort(_indices_orden[criterio], (clave, est["carnet"]))
+
+def reconstruir_indices(estudiantes):
+    global _indice_texto, _indice_consultas
+    _indice_texto = None
+    _indice_consultas = None
+    _indices_orden.clear()
+    _claves_orden.clear()
+    indice_carnet.clear()
+    indice_cedula.clear()
+    for i, est in enumerate(estudiantes):
+        indice_carnet[est["carnet"]] = i
+        indice_cedula[est["cedula"]] = est["carnet"]
+
+@instrumentacion.medir("obtener_estudiante")
+def obtener_estudiante(estudiantes, carnet):
+    i = indice_carnet.get(carnet)
+    return estudiantes[i] if i is not None else None
+
+@instrumentacion.medir("obtener_por_cedula")
+def obtener_por_cedula(estudiantes, cedula):
+    carnet = indice_cedula.get(cedula)
+    return obtener_estudiante(estudiantes, carnet) if carnet is not None else None
+
+def comprobar_unicos(carnet=None, cedula=None, propio=None):
+    # Carnet y cédula son únicos; los índices lo comprueban en O(1). 'propio'
+    # es el carnet del registro que se actualiza (None al agregar uno nuevo).
+    if carnet is not None and carnet != propio and carnet in indice_carnet:
+        raise ValueError(validacion.MENSAJES["carnet_repetido"])
+    if cedula is not None and indice_cedula.get(cedula, propio) != propio:
+        raise ValueError(validacion.MENSAJES["cedula_repetida"])
+
+def insertar_estudiante(estudiantes, est):
+    estudiantes.append(est)
+    indice_carnet[est["carnet"]] = len(estudiantes) - 1
+    indice_cedula[est["cedula"]] = est["carnet"]
+    reindexar_estudiante(est)
+
+def reemplazar_estudiante(estudiantes, est):
+    i = indice_carnet[est["carnet"]]
+    if indice_cedula.get(estudiantes[i]["cedula"]) == est["carnet"]:
+        del indice_cedula[estudiantes[i]["cedula"]]
+    estudiantes[i] = est
+    indice_cedula[est["cedula"]] = est["carnet"]
+    reindexar_estudiante(est)
+
+def quitar_estudiante(estudiantes, carnet):
+    # Se mueve el último estudiante al hueco para que el borrado sea O(1)
+    i = indice_carnet.pop(carnet)
+    est = estudiantes[i]
+    ultimo = estudiantes.pop()
+    if ultimo is not est:
+        estudiantes[i] = ultimo
+        indice_carnet[ultimo["carnet"]] = i
+    if indice_cedula.get(est["cedula"]) == carnet:
+        del indice_cedula[est["cedula"]]
+    if _indice_texto is not None:
+        _indice_texto.quitar(carnet)
+    if _indice_consultas is not None:
+        _indice_consultas.quitar(carnet)
+    _quitar_de_orden(carnet)
+    return est
+
+# ---------- AGREGADOS ----------
+# Suma y cantidad de todas las notas, mantenidas en cada alta, baja o
+# actualización para que el promedio general no recorra a todos los estudiantes.
+# Se guardan en ARCHIVO_AGREGADOS junto con la firma (tamaño y fecha) de los
+# ficheros de datos; si la firma no coincide se vuelven a calcular.
+agregados = {"suma": 0.0, "cantidad": 0, "estudiantes": 0}
+
+def promedio_estudiante(est):
+    return modelo.promedio(n["nota"] for n in est["notas"])
+
+def sumar_agregados(est, signo=1):
+    # signo=1 al agregar al estudiante, signo=-1 al quitarlo
+    if signo > 0:
+        est["promedio"] = promedio_estudiante(est)
+    agregados["suma"] += signo * sum(n["nota"] for n in est["notas"])
+    agregados["cantidad"] += signo * len(est["notas"])
+    agregados["estudiantes"] += signo
+
+def recalcular_agregados(estudiantes):
+    agregados.update(suma=0.0, cantidad=0, estudiantes=0)
+    for est in estudiantes:
+        sumar_agregados(est)
+
+def _firma_datos():
+    firma = []
+    principal = almacen_binario.ARCHIVO_BINARIO if ALMACENAMIENTO == "binario" else ARCHIVO
+    for archivo in (principal, ARCHIVO_DIARIO):
+        if os.path.exists(archivo):
+            info = os.stat(archivo)
+            firma.append([info.st_size, info.st_mtime_ns])
+        else:
+            firma.append(None)
+    return firma
+
+def guardar_agregados(totales=None):
+    # 'totales' permite guardar unos agregados distintos de los globales
+    # (los de una instantánea escrita desde otro hilo). En "sqlite" salen de
+    # la base y en "particionado", del manifiesto.
+    if ALMACENAMIENTO in ("sqlite", "particionado"):
+        return
+    # cargar_agregados lo llama sin el bloqueo: cada proceso usa su temporal
+    temporal = f"{ARCHIVO_AGREGADOS}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(dict(totales or agregados, firma=_firma_datos()), f)
+    os.replace(temporal, ARCHIVO_AGREGADOS)
+
+def cargar_agregados(estudiantes=None):
+    # 'estudiantes' es la lista ya cargada, o None en carga perezosa
+    if ALMACENAMIENTO == "sqlite":
+        agregados.update(almacen_sqlite.agregados(conexion_sqlite()))
+        return
+    if ALMACENAMIENTO == "particionado":
+        agregados.update(almacen_particionado.agregados())
+        return
+    if os.path.exists(ARCHIVO_AGREGADOS):
+        with open(ARCHIVO_AGREGADOS, "r", encoding="utf-8") as f:
+            try:
+                guardados = json.load(f)
+            except json.JSONDecodeError:
+                guardados = {}
+        if guardados.get("firma") == _firma_datos():
+            agregados.update(suma=guardados["suma"], cantidad=guardados["cantidad"],
+                             estudiantes=guardados["estudiantes"])
+            return
+    recalcular_agregados(estudiantes if estudiantes is not None else iterar_estudiantes())
+    guardar_agregados()
+
+# ---------- ACCESO CONCURRENTE ----------
+# Varias sesiones pueden trabajar sobre el mismo estudiantes.json. Toda lectura
+# o escritura de los ficheros de datos se hace con un bloqueo exclusivo sobre
+# ARCHIVO_VERSION, que además guarda un contador que sube en cada escritura.
+# Cada registro lleva su propio campo "version".
+#
+# Al guardar, si el contador no es el que se leyó al cargar, otra sesión
+# escribió entretanto: se vuelve a leer el estado del disco y se le aplican
+# solo los cambios propios cuyo registro no cambió en el disco (la versión
+# coincide). Los que sí cambiaron quedan en conflicto y gana el disco.
+# En modo "sqlite" la concurrencia la resuelve la base de datos.
+
+try:
+    import fcntl
+
+    def _bloquear(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _desbloquear(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _bloquear(f):
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                pass  # LK_LOCK se rinde tras 10 intentos; se sigue esperando
+
+    def _desbloquear(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+version_cargada = None  # contador de ARCHIVO_VERSION visto en la última lectura o escritura
+conflictos = []  # carnets cuyo cambio no se guardó por haber sido modificados en otra sesión
+cedulas_en_conflicto = {}  # de esos, carnet -> carnet que registró su cédula en otra sesión
+
+def describir_conflictos():
+    return ", ".join(f"{carnet} (su cédula ya es de {cedulas_en_conflicto[carnet]})"
+                     if carnet in cedulas_en_conflicto else carnet for carnet in conflictos)
+
+@contextmanager
+def bloqueo_datos():
+    with open(ARCHIVO_VERSION, "a+b") as f:
+        _bloquear(f)
+        try:
+            yield f
+        finally:
+            _desbloquear(f)
+
+def _leer_version(f):
+    f.seek(0)
+    texto = f.read().strip()
+    return int(texto) if texto.isdigit() else 0
+
+def _escribir_version(f, version):
+    f.seek(0)
+    f.truncate()
+    f.write(str(version).encode())
+    f.flush()
+
+def marcar_escritura(bloqueo):
+    # Para herramientas que reescriben los ficheros con el bloqueo tomado: al
+    # subir el contador, las sesiones abiertas vuelven a leer antes de guardar
+    _escribir_version(bloqueo, _leer_version(bloqueo) + 1)
+
+def fusionar(estudiantes, cambios, disco=None):
+    # Aplica al estado del disco los cambios propios que no chocan (si no se
+    # pasa 'disco' se vuelve a leer). La lista en memoria queda igual al
+    # resultado. Devuelve los cambios aceptados.
+    if disco is None:
+        disco = iterar_estudiantes()
+    disco = {est["carnet"]: est for est in disco}
+    cedulas = {est["cedula"]: carnet for carnet, est in disco.items()}
+    aceptados = []
+    for operacion, est, base in cambios:
+        carnet = est["carnet"]
+        actual = disco.get(carnet)
+        if operacion == "eliminar" and actual is None:
+            continue  # otra sesión ya lo eliminó
+        if (None if actual is None else actual.get("version", 0)) != base:
+            conflictos.append(carnet)
+            continue
+        # La cédula sigue siendo única: otra sesión pudo registrarla entretanto
+        otro = None if operacion == "eliminar" else cedulas.get(est["cedula"], carnet)
+        if otro is not None and otro != carnet:
+            conflictos.append(carnet)
+            cedulas_en_conflicto[carnet] = otro
+            continue
+        if actual is not None and cedulas.get(actual["cedula"]) == carnet:
+            del cedulas[actual["cedula"]]
+        if operacion == "eliminar":
+            del disco[carnet]
+        else:
+            disco[carnet] = est
+            cedulas[est["cedula"]] = carnet
+        aceptados.append((operacion, est, base))
+    estudiantes[:] = disco.values()
+    reconstruir_indices(estudiantes)
+    recalcular_agregados(estudiantes)
+    return aceptados
+
+def _escribir_cambios(estudiantes, cambios, compactar=False, totales=None):
+    # Se llama con el bloqueo tomado y las versiones de los registros ya puestas
+    if ALMACENAMIENTO == "particionado":
+        almacen_particionado.guardar_cambios(cambios)
+    elif ALMACENAMIENTO == "diario":
+        for operacion, est, _ in cambios:
+            registrar_cambio(operacion, est["carnet"], None if operacion == "eliminar" else est)
+        if compactar or (os.path.exists(ARCHIVO_DIARIO)
+                         and os.path.getsize(ARCHIVO_DIARIO) > UMBRAL_COMPACTACION):
+            compactar_diario(estudiantes, totales)
+        guardar_agregados(totales)
+    else:
+        guardar_estudiantes(estudiantes, totales)
+
+def registrar_historial(estudiantes, cambios, anteriores=None, marca=None):
+    # Se llama con el bloqueo tomado, después de escribir. 'anteriores' es
+    # {carnet: registro antes del cambio}; si falta, en una baja es el propio
+    # registro y en un cambio queda como desconocido (no se podrá deshacer).
+    if not HISTORIAL:
+        return
+    anteriores = anteriores or {}
+    registro = []
+    for operacion, est, _ in cambios:
+        carnet = est["carnet"]
+        if carnet in anteriores:
+            antes = anteriores[carnet]
+        elif operacion == "actualizar":
+            antes = historial.DESCONOCIDO
+        else:
+            antes = est if operacion == "eliminar" else None
+        registro.append((carnet, antes, None if operacion == "eliminar" else est))
+    historial_cambios.registrar(registro, lambda: estudiantes, marca)
+
+@instrumentacion.medir("guardar_cambios")
+def guardar_cambios(estudiantes, cambios, compactar=False, anteriores=None, marca=None):
+    """Guarda con bloqueo una lista de (operación, estudiante, versión base),
+    donde la versión base es la que tenía el registro al cargarse (None si es
+    nuevo). 'anteriores' y 'marca' van al historial (ver
+    registrar_historial). Devuelve True si no hubo conflictos."""
+    global version_cargada
+    del conflictos[:]
+    cedulas_en_conflicto.clear()
+    with bloqueo_datos() as f:
+        version = _leer_version(f)
+        if version != version_cargada:
+            cambios = fusionar(estudiantes, cambios)
+        _escribir_version(f, version + 1)
+        for operacion, est, base in cambios:
+            if operacion != "eliminar":
+                est["version"] = (base or 0) + 1
+        _escribir_cambios(estudiantes, cambios, compactar)
+        registrar_historial(estudiantes, cambios, anteriores, marca)
+        version_cargada = version + 1
+    return not conflictos
+
+def escribir_cambios(instantanea, cambios, version_esperada, totales, anteriores=None):
+    """Variante de guardar_cambios que no toca el estado en memoria, para
+    escribir desde otro hilo. 'instantanea' es la lista completa con los
+    cambios ya aplicados y las versiones nuevas puestas; 'totales', los
+    agregados que le corresponden.
+
+    Devuelve (versión, None) si se escribió, o (versión actual, estado del
+    disco) si otra sesión escribió antes: hay que fusionar y reintentar."""
+    with bloqueo_datos() as f:
+        version = _leer_version(f)
+        if version != version_esperada:
+            return version, list(iterar_estudiantes())
+        _escribir_version(f, version + 1)
+        _escribir_cambios(instantanea, cambios, totales=totales)
+        registrar_historial(instantanea, cambios, anteriores)
+    return version + 1, None
 
 # ---------- FUNCIONES DE ARCHIVO ----------
 
+_conexion = None
+
+def conexion_sqlite():
+    global _conexion
+    if _conexion is None:
+        _conexion = almacen_sqlite.conectar()
+    return _conexion
+
+@instrumentacion.medir("cargar_estudiantes", lee=_ficheros_datos)
 def cargar_estudiantes():
+    global version_cargada
+    if ALMACENAMIENTO == "sqlite":
+        estudiantes = almacen_sqlite.cargar_estudiantes(conexion_sqlite())
+        reconstruir_indices(estudiantes)
+        return estudiantes
+    estudiantes = []
+    # Con el bloqueo la instantánea y el diario se leen sin una compactación a medias
+    with bloqueo_datos() as bloqueo:
+        version_cargada = _leer_version(bloqueo)
+        if ALMACENAMIENTO == "particionado":
+            estudiantes = almacen_particionado.cargar_estudiantes()
+            reconstruir_indices(estudiantes)
+            return estudiantes
+        if ALMACENAMIENTO == "binario":
+            if os.path.exists(almacen_binario.ARCHIVO_BINARIO):
+                estudiantes = almacen_binario.cargar_estudiantes()
+        elif os.path.exists(ARCHIVO):
+            with open(ARCHIVO, "r", encoding="utf-8") as f:
+                try:
+                    estudiantes = json.load(f)
+                except json.JSONDecodeError:
+                    estudiantes = []
+        reconstruir_indices(estudiantes)
+        aplicar_diario(estudiantes)
+    return estudiantes
+
+@instrumentacion.medir("guardar_estudiantes", escribe=_fichero_principal)
+def guardar_estudiantes(estudiantes, totales=None):
+    if ALMACENAMIENTO == "sqlite":
+        almacen_sqlite.guardar_estudiantes(conexion_sqlite(), estudiantes)
+        return
+    if ALMACENAMIENTO == "particionado":
+        almacen_particionado.guardar_estudiantes(estudiantes)
+        return
+    if ALMACENAMIENTO == "binario":
+        almacen_binario.guardar(estudiantes)
+        guardar_agregados(totales)
+        return
+    # Se escribe en un temporal y se renombra para no dejar el fichero a medias
+    temporal = ARCHIVO + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(estudiantes, f, ensure_ascii=False, indent=4)
+    os.replace(temporal, ARCHIVO)
+    guardar_agregados(totales)
+
+# ---------- LECTURA POR FLUJO ----------
+
+def _iterar_json(archivo):
+    # Decodifica el arreglo principal elemento por elemento, leyendo el fichero
+    # en bloques, sin tener nunca más de un estudiante decodificado a la vez.
+    decodificador = json.JSONDecoder()
+    with open(archivo, "r", encoding="utf-8") as f:
+        buffer = f.read(TAMANO_BLOQUE)
+        pos = 0
+        en_arreglo = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                bloque = f.read(TAMANO_BLOQUE)
+                if not bloque:
+                    return
+                buffer = buffer[pos:] + bloque
+                pos = 0
+                continue
+            if not en_arreglo:
+                if buffer[pos] != "[":
+                    return
+                en_arreglo = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                est, pos = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # El estudiante quedó partido entre dos bloques
+                bloque = f.read(TAMANO_BLOQUE)
+                if not bloque:
+                    return
+                buffer = buffer[pos:] + bloque
+                pos = 0
+                continue
+            yield est
+
+def _leer_diario():
+    # carnet -> datos más recientes (None si fue eliminado)
+    cambios = {}
+    if os.path.exists(ARCHIVO_DIARIO):
+        with open(ARCHIVO_DIARIO, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    break
+                cambios.pop(registro["carnet"], None)
+                cambios[registro["carnet"]] = registro.get("datos")
+    return cambios
+
+def iterar_estudiantes(carrera=None, anio=None):
+    """Recorre los estudiantes uno a uno sin cargar la lista completa. Con
+    'carrera' y/o 'anio' devuelve solo los que coinciden; en modo
+    "particionado" solo se leen esas particiones."""
+    if ALMACENAMIENTO == "particionado":
+        yield from almacen_particionado.iterar_estudiantes(carrera, anio)
+        return
+    for est in _iterar_todos():
+        if almacen_particionado.coincide(est, carrera, anio):
+            yield est
+
+def _iterar_todos():
+    if ALMACENAMIENTO == "sqlite":
+        yield from almacen_sqlite.iterar_estudiantes(conexion_sqlite())
+        return
+    if ALMACENAMIENTO == "binario":
+        if os.path.exists(almacen_binario.ARCHIVO_BINARIO):
+            with almacen_binario.abrir() as instantanea:
+                yield from instantanea
+        return
+    cambios = _leer_diario()
     if os.path.exists(ARCHIVO):
-        with open(ARCHIVO, "r", encoding="utf-8") as f:
+        for est in _iterar_json(ARCHIVO):
+            if est["carnet"] in cambios:
+                est = cambios.pop(est["carnet"])
+                if est is None:
+                    continue
+            yield est
+    for est in cambios.values():
+        if est is not None:
+            yield est
+
+# ---------- DIARIO DE CAMBIOS ----------
+
+def registrar_cambio(operacion, carnet, datos=None):
+    registro = {"op": operacion, "carnet": carnet}
+    if datos is not None:
+        registro["datos"] = datos
+    with open(ARCHIVO_DIARIO, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+def aplicar_diario(estudiantes):
+    # Reproduce el diario sobre la instantánea cargada. Es idempotente para que
+    # una compactación interrumpida no duplique registros.
+    if not os.path.exists(ARCHIVO_DIARIO):
+        return
+    with open(ARCHIVO_DIARIO, "r", encoding="utf-8") as f:
+        for linea in f:
             try:
-                return json.load(f)
+                registro = json.loads(linea)
             except json.JSONDecodeError:
-                return []
-    return []
+                break  # última línea incompleta por una escritura cortada
+            carnet = registro["carnet"]
+            if registro["op"] == "eliminar":
+                if carnet in indice_carnet:
+                    quitar_estudiante(estudiantes, carnet)
+            elif carnet in indice_carnet:
+                reemplazar_estudiante(estudiantes, registro["datos"])
+            else:
+                insertar_estudiante(estudiantes, registro["datos"])
 
-def guardar_estudiantes(estudiantes):
-    with open(ARCHIVO, "w", encoding="utf-8") as f:
-        json.dump(estudiantes, f, ensure_ascii=False, indent=4)
+def compactar_diario(estudiantes, totales=None):
+    guardar_estudiantes(estudiantes, totales)
+    if os.path.exists(ARCHIVO_DIARIO):
+        os.remove(ARCHIVO_DIARIO)
+
+def persistir_cambio(estudiantes, operacion, est, anterior=None):
+    # Devuelve False si el registro fue modificado en otra sesión y el cambio
+    # no se guardó (la lista en memoria ya quedó con la versión del disco).
+    # 'anterior' es una copia del registro antes de modificarlo en sitio.
+    base = None if operacion == "agregar" else est.get("version", 0)
+    anteriores = None if anterior is None else {est["carnet"]: anterior}
+    return persistir_cambios(estudiantes, [(operacion, est, base)], anteriores)
+
+def persistir_cambios(estudiantes, cambios, anteriores=None, marca=None):
+    if ALMACENAMIENTO == "sqlite":
+        for operacion, est, _ in cambios:
+            if operacion == "eliminar":
+                almacen_sqlite.eliminar_estudiante(conexion_sqlite(), est["carnet"])
+            else:
+                almacen_sqlite.guardar_estudiante(conexion_sqlite(), est)
+        with bloqueo_datos():
+            registrar_historial(estudiantes, cambios, anteriores, marca)
+        return True
+    return guardar_cambios(estudiantes, cambios, anteriores=anteriores, marca=marca)
+
+def persistir_lote(estudiantes, nuevos):
+    # Guarda de una sola vez varios estudiantes ya insertados en la lista
+    cambios = [("agregar", est, None) for est in nuevos]
+    if ALMACENAMIENTO == "sqlite":
+        almacen_sqlite.guardar_lote(conexion_sqlite(), nuevos)
+        with bloqueo_datos():
+            registrar_historial(estudiantes, cambios)
+        return True
+    return guardar_cambios(estudiantes, cambios, compactar=True)
 
 # ---------- FUNCIONES PRINCIPALES ----------
 
@@ -85,10 +704,12 @@ def agregar_estudiante(estudiantes):
             print("===========================================")
 
             carnet = validar_carnet(input("Carnet (ejemplo 25-02395-0): "))
+            comprobar_unicos(carnet=carnet)
             nombre = input("Nombre completo: ").title()
             estado_civil = validar_estado_civil(input("Estado civil (Soltero/Casado/Divorciado/Viudo): "))
             sexo = validar_sexo(input("Sexo (M/F): "))
             cedula = validar_cedula(input("Cédula (001-250108-1001B): "))
+            comprobar_unicos(cedula=cedula)
             direccion = input("Dirección: ").title()
             departamento = input("Departamento: ").title()
             municipio = input("Municipio: ").title()
@@ -115,7 +736,7 @@ def agregar_estudiante(estudiantes):
                 print("\n No se ingresaron notas. El registro no se guardará.\n")
                 return
 
-            estudiantes.append({
+            est = {
                 "carnet": carnet,
                 "nombre": nombre,
                 "estado_civil": estado_civil,
@@ -130,10 +751,16 @@ def agregar_estudiante(estudiantes):
                 "plan_estudio": plan_estudio,
                 "ingreso_padre": ingreso_padre,
                 "notas": notas
-            })
+            }
+            insertar_estudiante(estudiantes, est)
+            sumar_agregados(est)
 
-            guardar_estudiantes(estudiantes)
-            print(f"\n Estudiante '{nombre}' matriculado correctamente y guardado en fichero.\n")
+            if persistir_cambio(estudiantes, "agregar", est):
+                print(f"\n Estudiante '{nombre}' matriculado correctamente y guardado en fichero.\n")
+            elif carnet in cedulas_en_conflicto:
+                print(f"\n La cédula {cedula} fue registrada en otra sesión por {cedulas_en_conflicto[carnet]}. No se guardó.\n")
+            else:
+                print(f"\n El carnet {carnet} fue registrado en otra sesión. No se guardó.\n")
             break  # Salimos si no hubo errores
 
         except ValueError as e:
@@ -142,115 +769,412 @@ def agregar_estudiante(estudiantes):
             # Si querés limpiar la pantalla aquí:
             # os.system("cls" if os.name == "nt" else "clear")
 
+# Plantilla compilada una sola vez; la usan mostrar_matricula y los lotes de
+# hojas_matricula.py
+PLANTILLA_MATRICULA = Template("""
+===========================================
+          HOJA DE MATRÍCULA - UNAN-León
+===========================================
+
+Carnet:           $carnet
+Nombre completo:  $nombre
+Cédula:           $cedula
+Sexo:             $sexo
+Estado civil:     $estado_civil
+Dirección:        $direccion
+Departamento:     $departamento
+Municipio:        $municipio
+Área:             $area_conocimiento
+Carrera:          $carrera
+Año:              $anio
+Plan de estudio:  $plan_estudio
+Ingreso Padre:    C$$$ingreso_padre
+-------------------------------------------
+            DETALLE DE NOTAS
+-------------------------------------------
+$encabezado
+--------------------------------------------------
+$notas--------------------------------------------------""")
+
+def hoja_matricula(est):
+    filas = "".join(f"{n['materia']:<25}{n['nota']:>10.2f}"
+                    f"{'Aprobado' if n['nota'] >= modelo.NOTA_APROBACION else 'Reprobado':>15}\n" for n in est["notas"])
+    return PLANTILLA_MATRICULA.substitute(
+        est, ingreso_padre=f"{est['ingreso_padre']:.2f}",
+        encabezado=f"{'Materia':<25}{'Nota':>10}{'Estado':>15}", notas=filas)
+
 def mostrar_matricula(est):
-    print("\n===========================================")
-    print("          HOJA DE MATRÍCULA - UNAN-León")
-    print("===========================================\n")
-    print(f"Carnet:           {est['carnet']}")
-    print(f"Nombre completo:  {est['nombre']}")
-    print(f"Cédula:           {est['cedula']}")
-    print(f"Sexo:             {est['sexo']}")
-    print(f"Estado civil:     {est['estado_civil']}")
-    print(f"Dirección:        {est['direccion']}")
-    print(f"Departamento:     {est['departamento']}")
-    print(f"Municipio:        {est['municipio']}")
-    print(f"Área:             {est['area_conocimiento']}")
-    print(f"Carrera:          {est['carrera']}")
-    print(f"Año:              {est['anio']}")
-    print(f"Plan de estudio:  {est['plan_estudio']}")
-    print(f"Ingreso Padre:    C${est['ingreso_padre']:.2f}")
-    print("-------------------------------------------")
-    print("            DETALLE DE NOTAS")
-    print("-------------------------------------------")
-    print(f"{'Materia':<25}{'Nota':>10}{'Estado':>15}")
-    print("-" * 50)
-    for n in est["notas"]:
-        estado = "Aprobado" if n["nota"] >= 60 else "Reprobado"
-        print(f"{n['materia']:<25}{n['nota']:>10.2f}{estado:>15}")
-    print("-" * 50)
+    print(hoja_matricula(est))
 
 def buscar_estudiante(estudiantes):
     carnet = input("\nIngrese el carnet del estudiante a buscar: ")
-    for est in estudiantes:
-        if est["carnet"] == carnet:
-            mostrar_matricula(est)
-            return
-    print("\nNo se encontró un estudiante con ese carnet.\n")
+    if estudiantes is None and ALMACENAMIENTO == "binario":
+        # La instantánea binaria lee solo la columna de carnets y decodifica uno
+        est = None
+        if os.path.exists(almacen_binario.ARCHIVO_BINARIO):
+            with almacen_binario.abrir() as instantanea:
+                est = instantanea.buscar(carnet)
+    elif estudiantes is None:  # carga perezosa: se recorre el fichero hasta encontrarlo
+        est = next((e for e in iterar_estudiantes() if e["carnet"] == carnet), None)
+    else:
+        est = obtener_estudiante(estudiantes, carnet)
+    if est is None:
+        print("\nNo se encontró un estudiante con ese carnet.\n")
+        return
+    mostrar_matricula(est)
 
 def eliminar_estudiante(estudiantes):
     carnet = input("\nIngrese el carnet del estudiante a eliminar: ")
-    for i, est in enumerate(estudiantes):
-        if est["carnet"] == carnet:
-            confirm = input(f"¿Seguro que desea eliminar a {est['nombre']}? (S/N): ").upper()
-            if confirm == "S":
-                estudiantes.pop(i)
-                guardar_estudiantes(estudiantes)
-                print("\nEstudiante eliminado y fichero actualizado.\n")
-            else:
-                print("\nOperación cancelada.\n")
-            return
-    print("\nNo se encontró un estudiante con ese carnet.\n")
+    est = obtener_estudiante(estudiantes, carnet)
+    if est is None:
+        print("\nNo se encontró un estudiante con ese carnet.\n")
+        return
+    confirm = input(f"¿Seguro que desea eliminar a {est['nombre']}? (S/N): ").upper()
+    if confirm == "S":
+        quitar_estudiante(estudiantes, carnet)
+        sumar_agregados(est, -1)
+        if persistir_cambio(estudiantes, "eliminar", est):
+            print("\nEstudiante eliminado y fichero actualizado.\n")
+        else:
+            print("\nEl estudiante fue modificado en otra sesión. No se eliminó.\n")
+    else:
+        print("\nOperación cancelada.\n")
 
 def actualizar_estudiante(estudiantes):
     carnet = input("\nIngrese el carnet del estudiante a actualizar: ")
-    for est in estudiantes:
-        if est["carnet"] == carnet:
-            print(f"\nActualizando datos de {est['nombre']}")
-            nuevo_nombre = input(f"Nombre ({est['nombre']}): ").title() or est['nombre']
-            est['nombre'] = nuevo_nombre
+    est = obtener_estudiante(estudiantes, carnet)
+    if est is None:
+        print("\nNo se encontró un estudiante con ese carnet.\n")
+        return
+    anterior = copy.deepcopy(est)
+    print(f"\nActualizando datos de {est['nombre']}")
+    nuevo_nombre = input(f"Nombre ({est['nombre']}): ").title() or est['nombre']
+    est['nombre'] = nuevo_nombre
 
-            nueva_carrera = input(f"Carrera ({est['carrera']}): ").title() or est['carrera']
-            est['carrera'] = nueva_carrera
+    nueva_carrera = input(f"Carrera ({est['carrera']}): ").title() or est['carrera']
+    est['carrera'] = nueva_carrera
 
-            opc = input("¿Desea actualizar notas? (S/N): ").upper()
-            if opc == "S":
-                est['notas'].clear()
-                while True:
-                    materia = input("Nombre de la materia (o ENTER para terminar): ").title()
-                    if materia == "":
-                        break
-                    nota = validar_nota(input(f"Ingrese la nota de {materia} (0-100): "))
-                    est['notas'].append({"materia": materia, "nota": nota})
-            guardar_estudiantes(estudiantes)
-            print("\nDatos actualizados y guardados en fichero.\n")
-            return
-    print("\nNo se encontró un estudiante con ese carnet.\n")
+    opc = input("¿Desea actualizar notas? (S/N): ").upper()
+    if opc == "S":
+        sumar_agregados(est, -1)
+        est['notas'].clear()
+        try:
+            while True:
+                materia = input("Nombre de la materia (o ENTER para terminar): ").title()
+                if materia == "":
+                    break
+                nota = validar_nota(input(f"Ingrese la nota de {materia} (0-100): "))
+                est['notas'].append({"materia": materia, "nota": nota})
+        finally:
+            sumar_agregados(est)
+    reindexar_estudiante(est)
+    if persistir_cambio(estudiantes, "actualizar", est, anterior):
+        print("\nDatos actualizados y guardados en fichero.\n")
+    elif est["carnet"] in cedulas_en_conflicto:
+        print(f"\nLa cédula {est['cedula']} fue registrada en otra sesión por "
+              f"{cedulas_en_conflicto[est['carnet']]}. Se conservan los datos anteriores.\n")
+    else:
+        print("\nEl estudiante fue modificado o eliminado en otra sesión. Se conservan esos datos.\n")
+
+def buscar_por_nombre(estudiantes):
+    consulta = input("\nNombre, carrera o municipio a buscar (parte del texto): ").strip()
+    if not consulta:
+        return
+    if estudiantes is None:  # carga perezosa: se revisa el fichero registro por registro
+        encontrados = [est for est in iterar_estudiantes()
+                       if busqueda.coincide(consulta, [est.get(c, "") for c in CAMPOS_BUSQUEDA])]
+    else:
+        carnets = indice_texto(estudiantes).buscar(consulta)
+        encontrados = [obtener_estudiante(estudiantes, c) for c in carnets]
+
+    if not encontrados:
+        print("\nNo se encontraron estudiantes.\n")
+        return
+    encontrados.sort(key=lambda est: est["nombre"])
+    print(f"\n{'CARNET':<15}{'NOMBRE':<30}{'CARRERA':<25}{'MUNICIPIO':<15}")
+    print("-" * 85)
+    for est in encontrados:
+        print(f"{est['carnet']:<15}{est['nombre']:<30}{est['carrera']:<25}{est.get('municipio', ''):<15}")
+    print("-" * 85)
+    print(f"{len(encontrados)} estudiante(s) encontrado(s).\n")
+
+def consultar_filtros(estudiantes):
+    print("\nCampos: " + ", ".join(consultas.CATEGORICOS + consultas.NUMERICOS))
+    texto = input("Filtros separados por coma (ej.: departamento=Leon, ingreso_padre<5000, anio=1): ").strip()
+    if not texto:
+        return
+    try:
+        condiciones = consultas.interpretar(texto)
+    except ValueError as e:
+        print(f"\nError: {e}\n")
+        return
+    if estudiantes is None:  # carga perezosa: se revisa el fichero registro por registro
+        encontrados = [est for est in iterar_estudiantes() if consultas.cumple(est, condiciones)]
+    else:
+        carnets = indice_consultas(estudiantes).consultar(condiciones)
+        encontrados = [obtener_estudiante(estudiantes, c) for c in carnets]
+
+    if not encontrados:
+        print("\nNo se encontraron estudiantes.\n")
+        return
+    encontrados.sort(key=lambda est: est["nombre"])
+    print(f"\n{'CARNET':<15}{'NOMBRE':<30}{'CARRERA':<25}{'MUNICIPIO':<15}{'AÑO':<5}{'INGRESO PADRE':>14}")
+    print("-" * 104)
+    for est in encontrados:
+        print(f"{est['carnet']:<15}{est['nombre']:<30}{est['carrera']:<25}{est.get('municipio', ''):<15}"
+              f"{est['anio']!s:<5}{est['ingreso_padre']:>14.2f}")
+    print("-" * 104)
+    print(f"{len(encontrados)} estudiante(s) encontrado(s).\n")
 
-def calcular_promedio(estudiantes):
+def promedio_de(fuente=None, carrera=None, anio=None):
+    """Agregados (suma, cantidad de notas y estudiantes) de una carrera y/o un
+    año. 'fuente' es la lista cargada, o None para leer del almacenamiento.
+    En modo "particionado" salen del manifiesto sin leer ningún estudiante."""
+    if ALMACENAMIENTO == "particionado":
+        return almacen_particionado.agregados(carrera, anio)
+    if fuente is None:
+        fuente = iterar_estudiantes(carrera, anio)
+    total = {"suma": 0.0, "cantidad": 0, "estudiantes": 0}
+    for est in fuente:
+        if almacen_particionado.coincide(est, carrera, anio):
+            total["suma"] += sum(n["nota"] for n in est["notas"])
+            total["cantidad"] += len(est["notas"])
+            total["estudiantes"] += 1
+    return total
+
+def calcular_promedio(estudiantes=None):
+    # Usa los agregados mantenidos; no necesita recorrer a los estudiantes
     print("\n=== PROMEDIO GENERAL ===")
-    if not estudiantes:
+    if agregados["estudiantes"] == 0:
         print("No hay estudiantes registrados.\n")
         return
 
-    total_notas = 0
-    cantidad_notas = 0
-    for est in estudiantes:
-        for n in est["notas"]:
-            total_notas += n["nota"]
-            cantidad_notas += 1
-
-    promedio = total_notas / cantidad_notas if cantidad_notas > 0 else 0
+    cantidad_notas = agregados["cantidad"]
+    promedio = agregados["suma"] / cantidad_notas if cantidad_notas > 0 else 0
     print(f"Promedio general de notas: {promedio:.2f}\n")
 
+    carrera = input("Carrera para ver su promedio (ENTER para omitir): ").strip()
+    if not carrera:
+        return
+    total = promedio_de(estudiantes, carrera)
+    if total["estudiantes"] == 0:
+        print("No hay estudiantes registrados en esa carrera.\n")
+        return
+    promedio = total["suma"] / total["cantidad"] if total["cantidad"] > 0 else 0
+    print(f"Promedio de {carrera.title()} ({total['estudiantes']} estudiantes): {promedio:.2f}\n")
+
 def mostrar_todos(estudiantes):
+    # 'estudiantes' es la lista, o None con carga perezosa
     print("\n=== LISTA GENERAL DE ESTUDIANTES ===")
-    if not estudiantes:
+    # Con carga perezosa el listado por defecto se lee del fichero página a
+    # página, en el orden en que está guardado
+    defecto = "archivo" if estudiantes is None else "carnet"
+    opcion = input(f"Ordenar por (ENTER={defecto}, P=promedio, N=nombre, C=carrera): ").strip().upper()
+    criterio = ORDENES.get(opcion) if opcion else None
+
+    if estudiantes is None and criterio is not None:
+        print("Para ordenar se cargarán todos los estudiantes.")
+        estudiantes = cargar_estudiantes()
+
+    # obtener_pagina(inicio) devuelve solo los estudiantes de esa página
+    if estudiantes is None:
+        total = agregados["estudiantes"]
+        def obtener_pagina(inicio):
+            return list(islice(iterar_estudiantes(), inicio, inicio + TAMANO_PAGINA))
+    else:
+        orden = indice_orden(estudiantes, criterio or "carnet")
+        total = len(orden)
+        def obtener_pagina(inicio):
+            return [obtener_estudiante(estudiantes, carnet) for _, carnet in orden[inicio:inicio + TAMANO_PAGINA]]
+
+    if total == 0:
         print("No hay estudiantes registrados.\n")
         return
 
-    print(f"{'CARNET':<15}{'NOMBRE':<30}{'CARRERA':<25}{'PROMEDIO':<10}")
-    print("-" * 80)
+    paginas = (total + TAMANO_PAGINA - 1) // TAMANO_PAGINA
+    pagina = 1
+    while True:
+        print(f"\n{'CARNET':<15}{'NOMBRE':<30}{'CARRERA':<25}{'PROMEDIO':<10}")
+        print("-" * 80)
+        for est in obtener_pagina((pagina - 1) * TAMANO_PAGINA):
+            promedio = est["promedio"] if "promedio" in est else promedio_estudiante(est)
+            print(f"{est['carnet']:<15}{est['nombre']:<30}{est['carrera']:<25}{promedio:<10.2f}")
+        print("-" * 80)
+        print(f"Página {pagina} de {paginas} ({total} estudiantes)\n")
+        if paginas == 1:
+            return
 
-    for est in estudiantes:
-        promedio = sum(n["nota"] for n in est["notas"]) / len(est["notas"])
-        print(f"{est['carnet']:<15}{est['nombre']:<30}{est['carrera']:<25}{promedio:<10.2f}")
-    print("-" * 80 + "\n")
+        opc = input("S=siguiente, A=anterior, número=ir a página, ENTER=salir: ").strip().upper()
+        if opc == "S" and pagina < paginas:
+            pagina += 1
+        elif opc == "A" and pagina > 1:
+            pagina -= 1
+        elif opc.isdigit() and 1 <= int(opc) <= paginas:
+            pagina = int(opc)
+        elif opc == "":
+            return
+
+@instrumentacion.medir("mejores_por_carrera")
+def mejores_por_carrera(fuente, n=20, peores=False, carrera=None):
+    # Un montículo de tamaño n por carrera: una sola pasada, sin ordenar a todos
+    grupos = {}
+    for est in fuente:
+        if carrera is not None and est["carrera"] != carrera:
+            continue
+        promedio = est["promedio"] if "promedio" in est else promedio_estudiante(est)
+        item = (-promedio if peores else promedio, est["carnet"], est["nombre"], promedio)
+        monticulo = grupos.setdefault(est["carrera"], [])
+        if len(monticulo) < n:
+            heapq.heappush(monticulo, item)
+        else:
+            heapq.heappushpop(monticulo, item)
+    return {c: sorted(m, reverse=True) for c, m in sorted(grupos.items())}
+
+def mostrar_mejores(estudiantes):
+    # 'estudiantes' es la lista, o None con carga perezosa
+    print("\n=== MEJORES / PEORES ESTUDIANTES POR CARRERA ===")
+    cantidad = input("¿Cuántos por carrera? (ENTER=20): ").strip()
+    n = int(cantidad) if cantidad.isdigit() and int(cantidad) > 0 else 20
+    peores = input("M=mejores, P=peores (ENTER=mejores): ").strip().upper() == "P"
+    carrera = input("Carrera (ENTER=todas): ").strip().title() or None
+
+    # Sin la lista cargada se leen solo los estudiantes de esa carrera (en modo
+    # "particionado", solo sus particiones)
+    fuente = estudiantes if estudiantes is not None else iterar_estudiantes(carrera)
+    grupos = mejores_por_carrera(fuente, n, peores, carrera)
+    if not grupos:
+        print("No hay estudiantes registrados.\n")
+        return
+    for nombre_carrera, filas in grupos.items():
+        print(f"\n--- {nombre_carrera} ---")
+        print(f"{'#':<4}{'CARNET':<15}{'NOMBRE':<30}{'PROMEDIO':<10}")
+        for i, (_, carnet, nombre, promedio) in enumerate(filas, 1):
+            print(f"{i:<4}{carnet:<15}{nombre:<30}{promedio:<10.2f}")
+    print()
+
+# ---------- HISTORIAL: DESHACER, REHACER, RESTAURAR ----------
+
+def refrescar(estudiantes):
+    # Si otra sesión escribió, se vuelve a leer el disco antes de comparar
+    # la lista en memoria con el historial
+    global version_cargada
+    if ALMACENAMIENTO == "sqlite":
+        return
+    with bloqueo_datos() as f:
+        version = _leer_version(f)
+        if version != version_cargada:
+            fusionar(estudiantes, [])
+            version_cargada = version
+
+def aplicar_estados(estudiantes, destinos, marca=None):
+    """Deja cada carnet de 'destinos' como el registro indicado (None: que no
+    exista) y lo guarda como un solo grupo del historial."""
+    for carnet, nuevo in destinos.items():
+        # La cédula puede estar ahora en otro registro que también se restaura
+        otro = None if nuevo is None else indice_cedula.get(nuevo["cedula"])
+        if otro not in (None, carnet) and otro not in destinos:
+            raise ValueError(validacion.MENSAJES["cedula_repetida"])
+    cambios = []
+    anteriores = {}
+    for carnet, nuevo in destinos.items():
+        actual = obtener_estudiante(estudiantes, carnet)
+        if actual is None and nuevo is None:
+            continue
+        anteriores[carnet] = actual
+        if actual is not None:
+            sumar_agregados(actual, -1)
+        if nuevo is None:
+            quitar_estudiante(estudiantes, carnet)
+            cambios.append(("eliminar", actual, actual.get("version", 0)))
+            continue
+        nuevo = dict(nuevo)
+        sumar_agregados(nuevo)
+        if actual is None:
+            insertar_estudiante(estudiantes, nuevo)
+            cambios.append(("agregar", nuevo, None))
+        else:
+            reemplazar_estudiante(estudiantes, nuevo)
+            cambios.append(("actualizar", nuevo, actual.get("version", 0)))
+    return persistir_cambios(estudiantes, cambios, anteriores, marca)
+
+def deshacer_cambio(estudiantes, rehacer=False):
+    refrescar(estudiantes)
+    pendiente = historial_cambios.pendiente(rehacer)
+    accion = "rehacer" if rehacer else "deshacer"
+    if pendiente is None:
+        print(f"\nNo hay cambios que {accion}.\n")
+        return
+    grupo, entradas = pendiente
+    if input(f"¿{accion.capitalize()} {historial_cambios.describir(entradas)}? (S/N): ").upper() != "S":
+        print("\nOperación cancelada.\n")
+        return
+    try:
+        destinos = historial_cambios.invertir(entradas, lambda carnet: obtener_estudiante(estudiantes, carnet))
+        guardado = aplicar_estados(estudiantes, destinos, ("rehace" if rehacer else "deshace", grupo))
+    except ValueError as e:
+        print(f"\nError: {e}\n")
+        return
+    if guardado:
+        print(f"\nCambio {'rehecho' if rehacer else 'deshecho'} y guardado en fichero.\n")
+    else:
+        print(f"\nOtra sesión modificó {describir_conflictos()} entretanto. No se aplicó a esos registros.\n")
+
+def restaurar_fecha(estudiantes):
+    texto = input("\nFecha y hora a la que volver (AAAA-MM-DD HH:MM): ")
+    try:
+        marca = historial.leer_fecha(texto)
+        refrescar(estudiantes)
+        destino = historial_cambios.estado_en(marca)
+    except ValueError as e:
+        print(f"\nError: {e}\n")
+        return
+    # Solo se tocan los registros que difieren del estado en esa fecha
+    destinos = {carnet: registro for carnet, registro in destino.items()
+                if historial_cambios.limpio(obtener_estudiante(estudiantes, carnet)) != registro}
+    destinos.update((est["carnet"], None) for est in estudiantes if est["carnet"] not in destino)
+    if not destinos:
+        print("\nLos datos ya están como en esa fecha.\n")
+        return
+    altas = sum(1 for c, r in destinos.items() if r is not None and c not in indice_carnet)
+    bajas = sum(1 for r in destinos.values() if r is None)
+    print(f"\nSe volverán a crear {altas}, se eliminarán {bajas} y se modificarán "
+          f"{len(destinos) - altas - bajas} estudiante(s).")
+    if input("¿Continuar? (S/N): ").upper() != "S":
+        print("\nOperación cancelada.\n")
+        return
+    try:
+        guardado = aplicar_estados(estudiantes, destinos)
+    except ValueError as e:
+        print(f"\nError: {e}\n")
+        return
+    if guardado:
+        print(f"\nDatos restaurados al {historial.mostrar_fecha(marca)}. Se puede deshacer.\n")
+    else:
+        print(f"\nOtra sesión modificó {describir_conflictos()} entretanto. Se conservan esos datos.\n")
+
+def menu_historial(estudiantes):
+    if not HISTORIAL:
+        print("\nEl historial está desactivado (NOTAS_HISTORIAL=0).\n")
+        return
+    print("\n D. Deshacer el último cambio")
+    print(" R. Rehacer el último cambio deshecho")
+    print(" F. Volver a los datos de una fecha")
+    opcion = input("Opción: ").upper()
+    if opcion == "D":
+        deshacer_cambio(estudiantes)
+    elif opcion == "R":
+        deshacer_cambio(estudiantes, rehacer=True)
+    elif opcion == "F":
+        restaurar_fecha(estudiantes)
+    else:
+        print("\n Opción inválida.\n")
 
-    
 # ---------- PROGRAMA PRINCIPAL ----------
 
 def main():
-    estudiantes = cargar_estudiantes()
+    # Con carga perezosa 'estudiantes' queda en None hasta la primera modificación
+    estudiantes = None if CARGA_PEREZOSA else cargar_estudiantes()
+    cargar_agregados(estudiantes)
     while True:
         print("\n===========================================")
         print("     SISTEMA DE MATRÍCULA Y CONTROL DE NOTAS")
@@ -262,9 +1186,18 @@ def main():
         print(" 5️. Salir")
         print(" 6️. Eliminar estudiante")
         print(" 7️. Actualizar estudiante")
+        print(" 8️. Reportes estadísticos")
+        print(" 9️. Buscar estudiante por nombre")
+        print(" 10. Mejores / peores estudiantes por carrera")
+        print(" 11. Consultar estudiantes con filtros")
+        print(" 12. Deshacer / rehacer / volver a una fecha")
         print("===========================================")
 
-        opcion = input("Seleccione una opción (1-7): ")
+        opcion = input("Seleccione una opción (1-12): ")
+
+        if estudiantes is None and opcion in ("1", "6", "7", "12"):
+            estudiantes = cargar_estudiantes()
+        fuente = estudiantes if estudiantes is not None else iterar_estudiantes()
 
         if opcion == "1":
             agregar_estudiante(estudiantes)
@@ -281,6 +1214,21 @@ def main():
             eliminar_estudiante(estudiantes)
         elif opcion == "7":
             actualizar_estudiante(estudiantes)
+        elif opcion == "8":
+            try:
+                import analitica_notas
+            except ImportError:
+                print("\n Los reportes requieren NumPy (pip install numpy).\n")
+            else:
+                analitica_notas.mostrar_reportes(fuente)
+        elif opcion == "9":
+            buscar_por_nombre(estudiantes)
+        elif opcion == "10":
+            mostrar_mejores(estudiantes)
+        elif opcion == "11":
+            consultar_filtros(estudiantes)
+        elif opcion == "12":
+            menu_historial(estudiantes)
         else:
             print("\n Opción inválida. Intente de nuevo.\n")
 
@@ -0,0 +1,143 @@
+# ==========================================
+# DEPURACIÓN DE DUPLICADOS EN estudiantes.json
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Recorre una sola vez los estudiantes con dos diccionarios (carnet y cédula):
+#
+#   - Registros con el mismo carnet se fusionan en el primero. Sus notas se
+#     unen por materia, y los campos vacíos se completan con los del
+#     duplicado. Si un campo, o las notas de una misma materia, tienen valores
+#     distintos se conserva el primero y se informa como conflicto.
+#   - Carnets distintos con la misma cédula no se fusionan (no se sabe cuál
+#     es el bueno); se informan para revisarlos a mano.
+#
+# Uso:
+#     python depurar_duplicados.py [estudiantes.json] [--salida archivo.json]
+#                                  [--reemplazar] [--reporte conflictos.csv]
+#
+# Sin --salida ni --reemplazar escribe estudiantes.depurado.json. Con
+# --reemplazar sobrescribe el original con el mismo bloqueo y contador de
+# versiones que usan las sesiones de control_notas.py.
+# ==========================================
+
+import argparse
+import csv
+import json
+import os
+from collections import Counter
+
+import control_notas as cn
+
+# Campos que no se comparan: los calcula o mantiene el programa
+IGNORADOS = {"notas", "version", "promedio"}
+
+
+def _fusionar_notas(primero, otro, conflictos):
+    # Por materia: las del duplicado se añaden si el primero no la tiene; si
+    # ya la tiene con otras notas, se conservan las del primero
+    por_materia = {}
+    for n in primero.setdefault("notas", []):
+        por_materia.setdefault(n["materia"], []).append(n["nota"])
+    nuevas = {}
+    for n in otro.get("notas", []):
+        nuevas.setdefault(n["materia"], []).append(n["nota"])
+    for materia, notas in nuevas.items():
+        actuales = por_materia.get(materia)
+        if actuales is None:
+            primero["notas"].extend({"materia": materia, "nota": nota} for nota in notas)
+        elif Counter(notas) - Counter(actuales):
+            conflictos.append(("carnet", primero.get("carnet"),
+                               f"notas de {materia}: se conserva {actuales!r}, se descarta {notas!r}"))
+    return primero
+
+
+def depurar(estudiantes):
+    """Devuelve (depurados, fusionados, conflictos). 'fusionados' es la
+    cantidad de registros absorbidos y 'conflictos', una lista de
+    (tipo, carnet, detalle)."""
+    por_carnet = {}
+    por_cedula = {}
+    fusionados = 0
+    conflictos = []
+    for est in estudiantes:
+        carnet = est.get("carnet")
+        primero = por_carnet.get(carnet)
+        if primero is None:
+            por_carnet[carnet] = est
+            cedula = est.get("cedula")
+            otro = por_cedula.setdefault(cedula, carnet)
+            if cedula and otro != carnet:
+                conflictos.append(("cedula", carnet, f"cédula {cedula} también registrada en {otro}"))
+            continue
+
+        fusionados += 1
+        _fusionar_notas(primero, est, conflictos)
+        for campo, valor in est.items():
+            if campo in IGNORADOS or valor in ("", None):
+                continue
+            if primero.get(campo) in ("", None):
+                primero[campo] = valor
+            elif primero[campo] != valor:
+                conflictos.append(("carnet", carnet, f"{campo}: se conserva {primero[campo]!r}, "
+                                                     f"se descarta {valor!r}"))
+        # Las otras sesiones deben ver el registro como modificado
+        primero["version"] = max(primero.get("version", 0), est.get("version", 0)) + 1
+        primero.pop("promedio", None)
+    return list(por_carnet.values()), fusionados, conflictos
+
+
+def _escribir(estudiantes, ruta):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(estudiantes, f, ensure_ascii=False, indent=4)
+    os.replace(temporal, ruta)
+
+
+def _leer(ruta):
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fusiona estudiantes con carnet repetido e informa cédulas repetidas.")
+    parser.add_argument("archivo", nargs="?", default=cn.ARCHIVO)
+    destino = parser.add_mutually_exclusive_group()
+    destino.add_argument("--salida", help="archivo depurado (por defecto <archivo>.depurado.json)")
+    destino.add_argument("--reemplazar", action="store_true", help="sobrescribir el archivo original")
+    parser.add_argument("--reporte", help="CSV donde escribir los conflictos")
+    args = parser.parse_args()
+    if not os.path.exists(args.archivo):
+        parser.error(f"No existe el archivo {args.archivo}")
+
+    if args.reemplazar:
+        if os.path.abspath(args.archivo) == os.path.abspath(cn.ARCHIVO) and os.path.exists(cn.ARCHIVO_DIARIO):
+            parser.error(f"Hay cambios pendientes en {cn.ARCHIVO_DIARIO}; compacte el diario antes de depurar.")
+        with cn.bloqueo_datos() as bloqueo:
+            depurados, fusionados, conflictos = depurar(_leer(args.archivo))
+            if fusionados:
+                _escribir(depurados, args.archivo)
+                cn.marcar_escritura(bloqueo)
+        salida = args.archivo
+    else:
+        salida = args.salida or os.path.splitext(args.archivo)[0] + ".depurado.json"
+        depurados, fusionados, conflictos = depurar(_leer(args.archivo))
+        _escribir(depurados, salida)
+
+    print(f"\n Estudiantes:            {len(depurados)}")
+    print(f" Duplicados fusionados:  {fusionados}")
+    print(f" Conflictos:             {len(conflictos)}")
+    for tipo, carnet, detalle in conflictos[:20]:
+        print(f"   [{tipo}] {carnet}: {detalle}")
+    if len(conflictos) > 20:
+        print(f"   ... y {len(conflictos) - 20} más")
+    if args.reporte:
+        with open(args.reporte, "w", encoding="utf-8", newline="") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["tipo", "carnet", "detalle"])
+            escritor.writerows(conflictos)
+        print(f" Conflictos guardados en {args.reporte}")
+    print(f" Resultado en {salida}\n")
+
+
+if __name__ == "__main__":
+    main()
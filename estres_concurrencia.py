@@ -0,0 +1,236 @@
+# ==========================================
+# PRUEBA DE ESTRÉS: VARIAS SESIONES SOBRE EL MISMO FICHERO
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Lanza varios procesos que, como sesiones de control_notas.py abiertas a la
+# vez, cargan los datos una sola vez y luego agregan, actualizan y eliminan
+# estudiantes sobre el mismo estudiantes.json. Al final se vuelve a leer el
+# fichero y se comprueba que no se perdió ninguna escritura:
+#
+#   - cada sesión agrega estudiantes propios y elimina algunos de ellos;
+#   - cada sesión agrega notas a sus propios registros (cambios sin conflicto,
+#     que deben fusionarse con los de las demás);
+#   - todas incrementan un contador en un registro compartido, reintentando
+#     cuando hay conflicto, así que debe terminar en procesos * operaciones;
+#   - en cada operación todas intentan registrar un estudiante distinto con la
+#     misma cédula: solo uno debe quedar guardado por cédula.
+#
+# Se ejecuta en un directorio temporal; no toca los datos reales.
+#
+# Uso:
+#     python estres_concurrencia.py [--procesos 8] [--operaciones 40] [--almacenamiento json|diario|particionado|binario]
+# ==========================================
+
+import argparse
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import control_notas as cn
+
+COMPARTIDO = "99-99999-9"
+PROPIOS = 3  # registros propios de cada sesión
+
+
+def _carnet_propio(sesion, j):
+    return f"{sesion:02d}-{j:05d}-1"
+
+
+def _carnet_nuevo(sesion, k):
+    return f"{sesion:02d}-{k + 1000:05d}-2"
+
+
+def _carnet_disputado(sesion, k):
+    return f"{sesion:02d}-{k + 5000:05d}-3"
+
+
+def _cedula_disputada(k):
+    return f"002-{k:06d}-0000A"
+
+
+def _cedula(carnet):
+    # Única por carnet, como exige comprobar_unicos: sus 8 dígitos
+    digitos = carnet.replace("-", "")
+    return f"001-{digitos[:6]}-{digitos[6:]}00A"
+
+
+def _estudiante(carnet, nombre):
+    return {
+        "carnet": carnet, "nombre": nombre, "estado_civil": "Soltero", "sexo": "F",
+        "cedula": _cedula(carnet), "direccion": "", "departamento": "Leon",
+        "municipio": "Leon", "area_conocimiento": "", "carrera": "Sistemas", "anio": 1,
+        "plan_estudio": "", "ingreso_padre": 0.0,
+        "notas": [{"materia": "Inicial", "nota": 50.0}],
+    }
+
+
+def _configurar(directorio, modo):
+    os.chdir(directorio)
+    cn.ALMACENAMIENTO = modo
+    cn.UMBRAL_COMPACTACION = 16 * 1024  # para que las sesiones compacten a menudo
+
+
+def _preparar(directorio, modo, procesos):
+    _configurar(directorio, modo)
+    estudiantes = cn.cargar_estudiantes()
+    cn.cargar_agregados(estudiantes)
+    nuevos = [_estudiante(COMPARTIDO, "Compartido")]
+    nuevos += [_estudiante(_carnet_propio(s, j), f"Sesion {s}") for s in range(procesos) for j in range(PROPIOS)]
+    for est in nuevos:
+        cn.insertar_estudiante(estudiantes, est)
+        cn.sumar_agregados(est)
+    cn.persistir_lote(estudiantes, nuevos)
+
+
+def _actualizar(estudiantes, carnet, cambio):
+    # Reintenta hasta que el cambio se guarda sin conflicto. Tras un conflicto
+    # la lista ya tiene la versión del disco, así que se vuelve a buscar.
+    reintentos = 0
+    while True:
+        est = cn.obtener_estudiante(estudiantes, carnet)
+        anterior = copy.deepcopy(est)
+        cn.sumar_agregados(est, -1)
+        cambio(est)
+        cn.sumar_agregados(est)
+        cn.reindexar_estudiante(est)
+        if cn.persistir_cambio(estudiantes, "actualizar", est, anterior):
+            return reintentos
+        reintentos += 1
+
+
+def _sesion(directorio, modo, sesion, operaciones):
+    _configurar(directorio, modo)
+    estudiantes = cn.cargar_estudiantes()
+    cn.cargar_agregados(estudiantes)
+    reintentos = 0
+    for k in range(operaciones):
+        nuevo = _estudiante(_carnet_nuevo(sesion, k), f"Nuevo {sesion}-{k}")
+        cn.insertar_estudiante(estudiantes, nuevo)
+        cn.sumar_agregados(nuevo)
+        if not cn.persistir_cambio(estudiantes, "agregar", nuevo):
+            raise RuntimeError(f"Conflicto inesperado al agregar {nuevo['carnet']}")
+
+        # Varias sesiones piden la misma cédula: la que escribe primero la
+        # obtiene y a las demás la fusión les devuelve un conflicto
+        disputado = _estudiante(_carnet_disputado(sesion, k), f"Disputado {sesion}-{k}")
+        disputado["cedula"] = _cedula_disputada(k)
+        try:
+            cn.comprobar_unicos(cedula=disputado["cedula"])
+        except ValueError:
+            pass
+        else:
+            cn.insertar_estudiante(estudiantes, disputado)
+            cn.sumar_agregados(disputado)
+            cn.persistir_cambio(estudiantes, "agregar", disputado)
+
+        materia = f"S{sesion}-{k}"
+        reintentos += _actualizar(estudiantes, _carnet_propio(sesion, k % PROPIOS),
+                                  lambda est: est["notas"].append({"materia": materia, "nota": float(k % 101)}))
+        reintentos += _actualizar(estudiantes, COMPARTIDO,
+                                  lambda est: est.update(ingreso_padre=est["ingreso_padre"] + 1))
+
+        if k % 4 == 3:  # elimina el que agregó en la operación anterior
+            est = cn.obtener_estudiante(estudiantes, _carnet_nuevo(sesion, k - 1))
+            cn.quitar_estudiante(estudiantes, est["carnet"])
+            cn.sumar_agregados(est, -1)
+            if not cn.persistir_cambio(estudiantes, "eliminar", est):
+                raise RuntimeError(f"Conflicto inesperado al eliminar {est['carnet']}")
+    return reintentos
+
+
+def _verificar(directorio, modo, procesos, operaciones):
+    _configurar(directorio, modo)
+    estudiantes = cn.cargar_estudiantes()
+    errores = []
+
+    esperados = {COMPARTIDO}
+    for s in range(procesos):
+        esperados.update(_carnet_propio(s, j) for j in range(PROPIOS))
+        esperados.update(_carnet_nuevo(s, k) for k in range(operaciones) if k % 4 != 2)
+    encontrados = [est["carnet"] for est in estudiantes]
+    if len(encontrados) != len(set(encontrados)):
+        errores.append("Hay carnets duplicados en el fichero.")
+    cedulas = [est["cedula"] for est in estudiantes]
+    if len(cedulas) != len(set(cedulas)):
+        errores.append("Hay cédulas duplicadas en el fichero.")
+    disputadas = {est["cedula"] for est in estudiantes if est["carnet"].endswith("-3")}
+    if disputadas != {_cedula_disputada(k) for k in range(operaciones)}:
+        errores.append(f"Quedaron {len(disputadas)} cédulas disputadas, se esperaban {operaciones}.")
+    encontrados = [carnet for carnet in encontrados if not carnet.endswith("-3")]
+    if set(encontrados) != esperados:
+        faltan = sorted(esperados - set(encontrados))
+        sobran = sorted(set(encontrados) - esperados)
+        errores.append(f"Faltan {len(faltan)} estudiantes {faltan[:5]} y sobran {len(sobran)} {sobran[:5]}.")
+
+    for s in range(procesos):
+        for j in range(PROPIOS):
+            est = cn.obtener_estudiante(estudiantes, _carnet_propio(s, j))
+            if est is None:
+                continue
+            materias = [n["materia"] for n in est["notas"][1:]]
+            esperadas = [f"S{s}-{k}" for k in range(j, operaciones, PROPIOS)]
+            if materias != esperadas:
+                errores.append(f"{est['carnet']}: notas {materias} en vez de {esperadas}.")
+
+    compartido = cn.obtener_estudiante(estudiantes, COMPARTIDO)
+    if compartido is not None and compartido["ingreso_padre"] != procesos * operaciones:
+        errores.append(f"Contador compartido en {compartido['ingreso_padre']:g}, "
+                       f"se esperaba {procesos * operaciones}.")
+
+    # El historial de todas las sesiones, reproducido, debe dar los mismos datos
+    if cn.HISTORIAL:
+        reproducidos = cn.historial_cambios.estado_en(time.time())
+        if reproducidos != {est["carnet"]: cn.historial_cambios.limpio(est) for est in estudiantes}:
+            errores.append("El historial reproducido no coincide con los datos guardados.")
+
+    cn.cargar_agregados(estudiantes)
+    guardados = dict(cn.agregados)
+    cn.recalcular_agregados(estudiantes)
+    if (guardados["estudiantes"], guardados["cantidad"]) != (cn.agregados["estudiantes"], cn.agregados["cantidad"]) \
+            or abs(guardados["suma"] - cn.agregados["suma"]) > 1e-6:
+        errores.append(f"Agregados guardados {guardados} distintos de los recalculados {cn.agregados}.")
+    return len(estudiantes), errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de sesiones concurrentes de control_notas.py.")
+    parser.add_argument("--procesos", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=40)
+    parser.add_argument("--almacenamiento", choices=["json", "diario", "particionado", "binario"], default=cn.ALMACENAMIENTO
+                        if cn.ALMACENAMIENTO in ("json", "diario", "particionado", "binario") else "json")
+    args = parser.parse_args()
+    if not 1 <= args.procesos <= 98:
+        parser.error("--procesos debe estar entre 1 y 98")
+
+    original = os.getcwd()
+    directorio = tempfile.mkdtemp(prefix="estres_notas_")
+    try:
+        _preparar(directorio, args.almacenamiento, args.procesos)
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+            futuros = [pool.submit(_sesion, directorio, args.almacenamiento, s, args.operaciones)
+                       for s in range(args.procesos)]
+            reintentos = sum(f.result() for f in futuros)
+        segundos = time.perf_counter() - inicio
+        total, errores = _verificar(directorio, args.almacenamiento, args.procesos, args.operaciones)
+    finally:
+        os.chdir(original)
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    escrituras = args.procesos * (args.operaciones * 3 + args.operaciones // 4)
+    print(f"\n Modo: {args.almacenamiento}, {args.procesos} sesiones x {args.operaciones} operaciones")
+    print(f" {escrituras} escrituras en {segundos:.2f} s, {reintentos} reintentos por conflicto")
+    print(f" Estudiantes al final: {total}\n")
+    if errores:
+        for error in errores:
+            print(f" ERROR: {error}")
+        sys.exit(1)
+    print(" Sin escrituras perdidas.\n")
+
+
+if __name__ == "__main__":
+    main()
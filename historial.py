@@ -0,0 +1,294 @@
+# ==========================================
+# HISTORIAL DE CAMBIOS: DESHACER, REHACER Y ESTADO EN UNA FECHA
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Cada cambio guardado añade una línea a un fichero JSON Lines con solo lo que
+# cambió de ese registro, nunca una copia de todos los datos:
+#
+#   {"n": 41, "g": 40, "t": 1760800000.5, "clave": "25-02395-0",
+#    "antes": {"carrera": "Derecho"}, "despues": {"carrera": "Medicina"}}
+#
+#   - alta:   "antes" es null y "despues" el registro completo;
+#   - baja:   "antes" es el registro completo y "despues" null;
+#   - cambio: los campos que cambiaron (un campo en "antes" que no está en
+#             "despues" es un campo que se quitó). Si no se conoce el estado
+#             anterior, "despues" lleva el registro completo y "completo":
+#             true; ese cambio se reproduce pero no se puede deshacer.
+#
+# Las líneas de un mismo guardado comparten el grupo "g", que es la unidad de
+# deshacer y rehacer. Deshacer un grupo es guardar el cambio inverso como un
+# grupo nuevo (marcado con "deshace"), así que el fichero solo crece y
+# cualquier momento pasado se puede reconstruir.
+#
+# Cada CADA_PUNTO líneas se escribe un punto de control con el estado completo
+# en <archivo>.puntos/, y un índice con la fecha y la posición en el fichero
+# de cada punto. "Estado en la fecha T" carga el último punto anterior a T y
+# aplica solo las líneas que siguen hasta T.
+# ==========================================
+
+import json
+import os
+import time
+from datetime import datetime
+
+CADA_PUNTO = 500         # líneas entre puntos de control
+LIMITE_DESHACER = 100    # grupos que se pueden deshacer
+FORMATOS_FECHA = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+# Estado anterior desconocido (el registro se modificó en sitio sin copiarlo)
+DESCONOCIDO = object()
+
+
+def leer_fecha(texto):
+    """'AAAA-MM-DD[ HH:MM[:SS]]' en hora local -> marca de tiempo."""
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto.strip(), formato).timestamp()
+        except ValueError:
+            pass
+    raise ValueError("Fecha inválida. Use AAAA-MM-DD HH:MM (ej.: 2025-03-14 16:30).")
+
+
+def mostrar_fecha(marca):
+    return datetime.fromtimestamp(marca).strftime(FORMATOS_FECHA[0])
+
+
+# ---------- DELTAS ----------
+
+def delta(antes, despues):
+    """(antes, despues) con solo los campos que difieren."""
+    viejos = {k: v for k, v in antes.items() if despues.get(k, DESCONOCIDO) != v}
+    nuevos = {k: v for k, v in despues.items() if antes.get(k, DESCONOCIDO) != v}
+    return viejos, nuevos
+
+
+def _aplicar(registro, antes, despues):
+    # Lleva 'registro' del lado 'antes' del delta al lado 'despues'
+    if despues is None:
+        return None
+    if antes is None:
+        return dict(despues)
+    resultado = {k: v for k, v in registro.items() if k in despues or k not in antes}
+    resultado.update(despues)
+    return resultado
+
+
+def _coincide(registro, antes, despues):
+    # ¿Está 'registro' en el lado 'despues' del delta?
+    if despues is None or registro is None:
+        return despues is None and registro is None
+    if antes is None:
+        return registro == despues
+    return (all(registro.get(k, DESCONOCIDO) == v for k, v in despues.items())
+            and not any(k in registro for k in antes if k not in despues))
+
+
+class Historial:
+    def __init__(self, archivo, clave, ignorados=(), cada_punto=CADA_PUNTO):
+        self.archivo = archivo
+        self.directorio = os.path.splitext(archivo)[0] + ".puntos"
+        self.clave = clave  # registro -> clave
+        self.ignorados = frozenset(ignorados)  # campos calculados, no se guardan
+        self.cada_punto = cada_punto
+        # Lo que se sabe del fichero hasta la posición 'leido'; se pone al día
+        # leyendo solo las líneas nuevas (pueden ser de otras sesiones)
+        self._leido = None
+        self._n = 0
+        self._desde_punto = 0
+        self._deshacer = []  # [[grupo, posición de su primera línea]]
+        self._rehacer = []
+
+    def limpio(self, registro):
+        if registro is None or registro is DESCONOCIDO or not self.ignorados:
+            return registro
+        return {k: v for k, v in registro.items() if k not in self.ignorados}
+
+    # ---------- Puntos de control ----------
+
+    def _ruta_indice(self):
+        return os.path.join(self.directorio, "indice.json")
+
+    def puntos(self):
+        """[[n, t, posición, archivo], ...] en orden."""
+        if not os.path.exists(self._ruta_indice()):
+            return []
+        with open(self._ruta_indice(), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _escribir_json(self, ruta, datos):
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False)
+        os.replace(temporal, ruta)
+
+    def _escribir_punto(self, registros, marca):
+        os.makedirs(self.directorio, exist_ok=True)
+        archivo = f"punto_{self._n:08d}.json"
+        self._escribir_json(os.path.join(self.directorio, archivo), {
+            "n": self._n, "t": marca, "posicion": self._leido,
+            "deshacer": self._deshacer, "rehacer": self._rehacer,
+            "registros": [self.limpio(registro) for registro in registros],
+        })
+        puntos = self.puntos()
+        puntos.append([self._n, marca, self._leido, archivo])
+        self._escribir_json(self._ruta_indice(), puntos)
+        self._desde_punto = 0
+
+    def _leer_punto(self, punto):
+        with open(os.path.join(self.directorio, punto[3]), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # ---------- Lectura del fichero ----------
+
+    def _lineas(self, posicion):
+        # (posición, posición siguiente, entrada) desde 'posicion'; se detiene
+        # en una línea cortada por una escritura interrumpida
+        if not os.path.exists(self.archivo):
+            return
+        with open(self.archivo, "rb") as f:
+            f.seek(posicion)
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    return
+                yield posicion, posicion + len(linea), json.loads(linea)
+                posicion += len(linea)
+
+    def _al_dia(self):
+        if self._leido is None:
+            # Primera vez: se parte del último punto de control
+            self._leido = 0
+            puntos = self.puntos()
+            if puntos:
+                punto = self._leer_punto(puntos[-1])
+                self._n, self._leido = punto["n"], punto["posicion"]
+                self._deshacer, self._rehacer = punto["deshacer"], punto["rehacer"]
+        for posicion, siguiente, entrada in self._lineas(self._leido):
+            if entrada["n"] == entrada["g"]:  # primera línea de su grupo
+                self._apilar(entrada["g"], posicion, entrada)
+            self._n = entrada["n"]
+            self._desde_punto += 1
+            self._leido = siguiente
+
+    def _apilar(self, grupo, posicion, entrada):
+        if "deshace" in entrada:
+            self._quitar_de(self._deshacer, entrada["deshace"])
+            self._rehacer.append([grupo, posicion])
+        else:
+            if "rehace" in entrada:
+                self._quitar_de(self._rehacer, entrada["rehace"])
+            else:
+                self._rehacer.clear()  # un cambio nuevo descarta lo deshecho
+            self._deshacer.append([grupo, posicion])
+            del self._deshacer[:-LIMITE_DESHACER]
+
+    @staticmethod
+    def _quitar_de(pila, grupo):
+        for i in range(len(pila) - 1, -1, -1):
+            if pila[i][0] == grupo:
+                del pila[i]
+                return
+
+    # ---------- API ----------
+
+    def registrar(self, cambios, estado, marca=None):
+        """Añade un grupo con los cambios [(clave, antes, despues)] (None si
+        el registro no existe; antes=DESCONOCIDO si no se conoce). 'estado'
+        devuelve todos los registros ya con los cambios; solo se llama para
+        escribir un punto de control. 'marca' es ("deshace"|"rehace", grupo).
+        Debe llamarse con el bloqueo de los datos tomado. Devuelve el grupo,
+        o None si no había nada que guardar."""
+        self._al_dia()
+        ahora = time.time()
+        if self._leido == 0 and not self.puntos():
+            # Historial nuevo sobre datos que ya existían: el primer punto es
+            # el estado de antes de estos cambios
+            cambiadas = {clave for clave, antes, _ in cambios if antes is not DESCONOCIDO}
+            previos = [registro for registro in estado() if self.clave(registro) not in cambiadas]
+            previos += [antes for _, antes, _ in cambios if antes not in (None, DESCONOCIDO)]
+            self._escribir_punto(previos, ahora)
+
+        grupo = self._n + 1
+        lineas = []
+        for clave, antes, despues in cambios:
+            antes, despues = self.limpio(antes), self.limpio(despues)
+            entrada = {"n": self._n + len(lineas) + 1, "g": grupo, "t": ahora, "clave": clave}
+            if antes is DESCONOCIDO:
+                entrada.update(antes=None, despues=despues, completo=True)
+            elif antes is not None and despues is not None:
+                viejos, nuevos = delta(antes, despues)
+                if not viejos and not nuevos:
+                    continue
+                entrada.update(antes=viejos, despues=nuevos)
+            elif antes is None and despues is None:
+                continue
+            else:
+                entrada.update(antes=antes, despues=despues)
+            if marca is not None:
+                entrada[marca[0]] = marca[1]
+            lineas.append(json.dumps(entrada, ensure_ascii=False) + "\n")
+        if not lineas:
+            return None
+
+        with open(self.archivo, "a", encoding="utf-8") as f:
+            f.write("".join(lineas))
+        self._al_dia()
+        if self._desde_punto >= self.cada_punto:
+            self._escribir_punto(estado(), ahora)
+        return grupo
+
+    def pendiente(self, rehacer=False):
+        """(grupo, entradas) que deshacer (o rehacer) a continuación, o None."""
+        self._al_dia()
+        pila = self._rehacer if rehacer else self._deshacer
+        if not pila:
+            return None
+        grupo, posicion = pila[-1]
+        entradas = []
+        for _, _, entrada in self._lineas(posicion):
+            if entrada["g"] != grupo:
+                break
+            entradas.append(entrada)
+        return grupo, entradas
+
+    def invertir(self, entradas, actual):
+        """Estados que deshacen las entradas de un grupo: {clave: registro o
+        None}. 'actual(clave)' da el registro que hay ahora. Lanza ValueError
+        si alguno cambió después o no se puede deshacer."""
+        trabajo = {}
+        for entrada in reversed(entradas):
+            clave = entrada["clave"]
+            if entrada.get("completo"):
+                raise ValueError(f"El cambio de {clave} no guardó su estado anterior; no se puede deshacer.")
+            registro = trabajo[clave] if clave in trabajo else self.limpio(actual(clave))
+            if not _coincide(registro, entrada["antes"], entrada["despues"]):
+                raise ValueError(f"{clave} se modificó después de ese cambio; no se puede deshacer.")
+            trabajo[clave] = _aplicar(registro, entrada["despues"], entrada["antes"])
+        return trabajo
+
+    def estado_en(self, marca):
+        """{clave: registro} tal como estaba en la fecha 'marca': el último
+        punto de control anterior más las líneas que lo siguen hasta 'marca'."""
+        puntos = [punto for punto in self.puntos() if punto[1] <= marca]
+        if not puntos:
+            raise ValueError("El historial no llega tan atrás.")
+        punto = self._leer_punto(puntos[-1])
+        registros = {self.clave(registro): registro for registro in punto["registros"]}
+        for _, _, entrada in self._lineas(punto["posicion"]):
+            if entrada["t"] > marca:
+                break
+            clave = entrada["clave"]
+            registro = _aplicar(registros.get(clave), entrada["antes"], entrada["despues"])
+            if registro is None:
+                registros.pop(clave, None)
+            else:
+                registros[clave] = registro
+        return registros
+
+    def describir(self, entradas):
+        """Resumen de un grupo para mostrarlo antes de deshacer."""
+        primera = entradas[0]
+        if len(entradas) > 1:
+            return f"{len(entradas)} registros ({mostrar_fecha(primera['t'])})"
+        accion = ("alta" if primera["antes"] is None and not primera.get("completo")
+                  else "baja" if primera["despues"] is None else "cambio")
+        return f"{accion} de {primera['clave']} ({mostrar_fecha(primera['t'])})"
@@ -0,0 +1,194 @@
+# ==========================================
+# HOJAS DE MATRÍCULA EN LOTE
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Genera la hoja de matrícula de cada estudiante (o de los de una carrera y/o
+# un año) como fichero de texto y/o HTML, un fichero por estudiante:
+#
+#   - el texto es el mismo que muestra control_notas.py (hoja_matricula);
+#   - el HTML lleva incrustados style.css y logo.html.
+#
+# Las plantillas se compilan una vez por proceso. Los estudiantes se leen del
+# almacenamiento uno a uno (iterar_estudiantes) y se reparten en lotes entre
+# un grupo de procesos, que escriben cada hoja directamente en su fichero. Como
+# nunca hay más de unos pocos lotes en vuelo, la memoria no crece con el
+# tamaño de la matrícula.
+#
+# Uso:
+#     python hojas_matricula.py [--salida hojas] [--formato txt,html]
+#                               [--carrera Medicina] [--anio 2] [--procesos N]
+# ==========================================
+
+import argparse
+import html
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from string import Template
+
+import control_notas as cn
+import modelo
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+FORMATOS = ("txt", "html")
+TAMANO_LOTE = 200
+LOTES_EN_VUELO = 2  # por proceso
+
+_NO_VALIDO = re.compile(r"[^\w.-]+")
+
+
+def _leer_recurso(nombre):
+    # Los "$" se duplican para que la segunda sustitución los deje intactos
+    with open(os.path.join(DIRECTORIO, nombre), "r", encoding="utf-8") as f:
+        return f.read().replace("$", "$$")
+
+
+# style.css y logo.html se sustituyen una sola vez; lo que queda es la
+# plantilla de cada hoja
+PLANTILLA_HTML = Template(Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Hoja de matrícula - $$carnet</title>
+<style>
+$estilo
+body { font-family: 'Arial', sans-serif; color: #0B1F3A; margin: 40px; }
+table { border-collapse: collapse; margin-top: 12px; }
+th, td { border: 1px solid #0B1F3A; padding: 4px 10px; text-align: left; }
+td.nota { text-align: right; }
+.reprobado { color: #B00020; }
+</style>
+</head>
+<body>
+$logo
+<h3>HOJA DE MATRÍCULA - UNAN-León</h3>
+<table>
+<tr><th>Carnet</th><td>$$carnet</td></tr>
+<tr><th>Nombre completo</th><td>$$nombre</td></tr>
+<tr><th>Cédula</th><td>$$cedula</td></tr>
+<tr><th>Sexo</th><td>$$sexo</td></tr>
+<tr><th>Estado civil</th><td>$$estado_civil</td></tr>
+<tr><th>Dirección</th><td>$$direccion</td></tr>
+<tr><th>Departamento</th><td>$$departamento</td></tr>
+<tr><th>Municipio</th><td>$$municipio</td></tr>
+<tr><th>Área</th><td>$$area_conocimiento</td></tr>
+<tr><th>Carrera</th><td>$$carrera</td></tr>
+<tr><th>Año</th><td>$$anio</td></tr>
+<tr><th>Plan de estudio</th><td>$$plan_estudio</td></tr>
+<tr><th>Ingreso Padre</th><td>C$$$$$$ingreso_padre</td></tr>
+</table>
+<h4>DETALLE DE NOTAS</h4>
+<table>
+<tr><th>Materia</th><th>Nota</th><th>Estado</th></tr>
+$$notas</table>
+</body>
+</html>
+""").substitute(estilo=_leer_recurso("style.css"), logo=_leer_recurso("logo.html")))
+
+CAMPOS_HTML = ("carnet", "nombre", "cedula", "sexo", "estado_civil", "direccion", "departamento",
+               "municipio", "area_conocimiento", "carrera", "anio", "plan_estudio")
+
+
+def hoja_html(est):
+    filas = []
+    for n in est["notas"]:
+        if n["nota"] >= modelo.NOTA_APROBACION:
+            fila, estado = "<tr>", "Aprobado"
+        else:
+            fila, estado = '<tr class="reprobado">', "Reprobado"
+        filas.append(f'{fila}<td>{html.escape(n["materia"])}</td><td class="nota">{n["nota"]:.2f}</td>'
+                     f'<td>{estado}</td></tr>\n')
+    valores = {campo: html.escape(str(est[campo])) for campo in CAMPOS_HTML}
+    return PLANTILLA_HTML.substitute(valores, ingreso_padre=f"{est['ingreso_padre']:.2f}", notas="".join(filas))
+
+
+RENDERIZADORES = {"txt": cn.hoja_matricula, "html": hoja_html}
+
+
+def nombre_archivo(est, formato):
+    return f"{_NO_VALIDO.sub('_', str(est['carnet'])) or 'sin_carnet'}.{formato}"
+
+
+def renderizar_lote(estudiantes, salida, formatos):
+    """Escribe las hojas de un lote; se ejecuta en los procesos del grupo.
+    Devuelve (ficheros escritos, carnets omitidos por datos incompletos)."""
+    escritos = 0
+    omitidos = []
+    for est in estudiantes:
+        try:
+            contenidos = [(formato, RENDERIZADORES[formato](est)) for formato in formatos]
+        except (KeyError, TypeError, ValueError):
+            omitidos.append(str(est.get("carnet")))
+            continue
+        for formato, contenido in contenidos:
+            with open(os.path.join(salida, nombre_archivo(est, formato)), "w", encoding="utf-8") as f:
+                f.write(contenido)
+            escritos += 1
+    return escritos, omitidos
+
+
+def _lotes(fuente, tamano):
+    fuente = iter(fuente)
+    while True:
+        lote = list(islice(fuente, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def generar(salida="hojas", formatos=FORMATOS, carrera=None, anio=None, procesos=None,
+            tamano_lote=TAMANO_LOTE):
+    """Genera las hojas de todos los estudiantes que coinciden con el filtro.
+    Devuelve (estudiantes, ficheros escritos, carnets omitidos)."""
+    os.makedirs(salida, exist_ok=True)
+    procesos = procesos or os.cpu_count() or 1
+    estudiantes = ficheros = 0
+    omitidos = []
+
+    def recoger(tareas):
+        nonlocal ficheros
+        for tarea in tareas:
+            escritos, sin_hoja = tarea.result()
+            ficheros += escritos
+            omitidos.extend(sin_hoja)
+
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        en_vuelo = set()
+        for lote in _lotes(cn.iterar_estudiantes(carrera, anio), tamano_lote):
+            # Se espera a que termine alguno antes de leer más estudiantes
+            if len(en_vuelo) >= procesos * LOTES_EN_VUELO:
+                hechos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                recoger(hechos)
+            en_vuelo.add(grupo.submit(renderizar_lote, lote, salida, formatos))
+            estudiantes += len(lote)
+        recoger(wait(en_vuelo).done)
+    return estudiantes, ficheros, omitidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera las hojas de matrícula en lote.")
+    parser.add_argument("--salida", default="hojas", help="directorio de salida (por defecto 'hojas')")
+    parser.add_argument("--formato", default=",".join(FORMATOS), help="txt, html o ambos separados por comas")
+    parser.add_argument("--carrera", help="solo los estudiantes de esta carrera")
+    parser.add_argument("--anio", type=int, help="solo los estudiantes de este año")
+    parser.add_argument("--procesos", type=int, help="procesos en paralelo (por defecto, uno por CPU)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="estudiantes por lote")
+    args = parser.parse_args()
+    formatos = [f.strip().lower() for f in args.formato.split(",") if f.strip()]
+    if not formatos or any(f not in FORMATOS for f in formatos):
+        parser.error(f"--formato debe ser uno o varios de: {', '.join(FORMATOS)}")
+
+    inicio = time.perf_counter()
+    estudiantes, ficheros, omitidos = generar(args.salida, formatos, args.carrera, args.anio,
+                                              args.procesos, args.lote)
+    print(f" {estudiantes} estudiantes, {ficheros} ficheros en {args.salida} "
+          f"({time.perf_counter() - inicio:.2f} s).")
+    if omitidos:
+        print(f" {len(omitidos)} sin hoja por datos incompletos: {', '.join(omitidos[:10])}"
+              f"{' ...' if len(omitidos) > 10 else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# ==========================================
+# IMPORTACIÓN MASIVA DE ESTUDIANTES (CSV / JSONL)
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Registra de una vez un ingreso completo de estudiantes. Las filas se validan
+# por columnas con el mismo motor (validacion.py) que usan las funciones
+# validar_* del registro interactivo; la validación se reparte por lotes
+# entre varios procesos y las filas válidas se guardan con una sola escritura.
+#
+# Uso:
+#     python importacion_masiva.py nuevos.csv [--procesos 4] [--reporte errores.csv]
+#
+# Columnas (CSV) o claves (JSONL): las mismas de estudiantes.json. En CSV la
+# columna "notas" se escribe como "Calculo:73;Historia:95"; en JSONL puede ser
+# esa cadena o una lista [{"materia": ..., "nota": ...}].
+# ==========================================
+
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import control_notas as cn
+import validacion
+
+TAMANO_LOTE = 500
+
+# Orden de las claves en estudiantes.json
+ORDEN_CAMPOS = [
+    "carnet", "nombre", "estado_civil", "sexo", "cedula", "direccion",
+    "departamento", "municipio", "area_conocimiento", "carrera", "anio",
+    "plan_estudio", "ingreso_padre", "notas",
+]
+
+
+# ---------- LECTURA ----------
+
+def leer_filas(ruta):
+    """Devuelve [(número de línea, fila)] del CSV o JSONL indicado."""
+    filas = []
+    with open(ruta, "r", encoding="utf-8-sig", newline="") as f:
+        if ruta.lower().endswith((".jsonl", ".json")):
+            for numero, linea in enumerate(f, 1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    fila = {"_error": f"JSON inválido: {e.msg}"}
+                if not isinstance(fila, dict):
+                    fila = {"_error": "La línea no es un objeto JSON con los datos del estudiante."}
+                filas.append((numero, fila))
+        else:
+            # La línea 1 es el encabezado
+            for numero, fila in enumerate(csv.DictReader(f), 2):
+                filas.append((numero, fila))
+    return filas
+
+
+# ---------- VALIDACIÓN (se ejecuta en los procesos del pool) ----------
+
+# Campos validados por el motor de validacion.py y campos de texto libre con
+# la misma normalización que el registro interactivo
+CAMPOS_VALIDADOS = ["carnet", "estado_civil", "sexo", "cedula", "anio", "ingreso_padre"]
+CAMPOS_TEXTO = {
+    "nombre": str.title,
+    "direccion": str.title,
+    "departamento": str.title,
+    "municipio": str.title,
+    "area_conocimiento": str.title,
+    "carrera": str.title,
+    "plan_estudio": str.upper,
+}
+
+
+def _texto(fila, campo):
+    valor = fila.get(campo)
+    return "" if valor is None else str(valor).strip()
+
+
+def _pares_notas(valor):
+    # Lanza ValueError si la lista de notas no tiene la forma esperada
+    if isinstance(valor, list):
+        if not all(isinstance(n, dict) for n in valor):
+            raise ValueError("Cada nota debe ser un objeto con \"materia\" y \"nota\".")
+        return [(str(n.get("materia", "")).strip().title(), str(n.get("nota", "")).strip()) for n in valor]
+    pares = []
+    for parte in str(valor or "").split(";"):
+        if parte.strip():
+            materia, _, nota = parte.rpartition(":")
+            pares.append((materia.strip().title(), nota.strip()))
+    return pares
+
+
+def _validar_lote(lote):
+    """Valida un lote completo por columnas. Devuelve (válidos, errores)."""
+    filas = [fila for _, fila in lote]
+    columnas = {campo: [_texto(fila, campo) for fila in filas] for campo in CAMPOS_VALIDADOS}
+    normalizadas, _, codigos = validacion.validar_columnas(columnas)
+    mensajes = [[validacion.MENSAJES[c] for c in cs] for cs in codigos]
+
+    # Las notas de todas las filas se validan juntas en una sola columna
+    pares_por_fila, valores_nota = [], []
+    for i, fila in enumerate(filas):
+        if "_error" in fila:
+            mensajes[i] = [fila["_error"]]
+            pares_por_fila.append([])
+            continue
+        try:
+            pares = _pares_notas(fila.get("notas"))
+        except ValueError as e:
+            mensajes[i].append(str(e))
+            pares_por_fila.append([])
+            continue
+        if not pares:
+            mensajes[i].append("El estudiante no tiene notas.")
+        elif not all(materia for materia, _ in pares):
+            mensajes[i].append("Materia vacía en la lista de notas.")
+        pares_por_fila.append(pares)
+        valores_nota.extend(nota for _, nota in pares)
+    notas, errores_nota = validacion.columna_nota(valores_nota)
+
+    validos, errores = [], []
+    posicion = 0
+    for i, (numero, fila) in enumerate(lote):
+        pares = pares_por_fila[i]
+        fin = posicion + len(pares)
+        if any(errores_nota[posicion:fin]):
+            mensajes[i].append(validacion.MENSAJES["nota"])
+        if mensajes[i]:
+            errores.append((numero, _texto(fila, "carnet"), " ".join(mensajes[i])))
+        else:
+            est = {campo: normalizadas[campo][i] for campo in CAMPOS_VALIDADOS}
+            for campo, normalizar in CAMPOS_TEXTO.items():
+                est[campo] = normalizar(_texto(fila, campo))
+            est["notas"] = [{"materia": materia, "nota": notas[posicion + j]}
+                            for j, (materia, _) in enumerate(pares)]
+            validos.append((numero, {campo: est[campo] for campo in ORDEN_CAMPOS}))
+        posicion = fin
+    return validos, errores
+
+
+def validar_fila(fila):
+    """Valida una sola fila (diccionario). Devuelve (estudiante, None) o
+    (None, mensaje de error)."""
+    validos, errores = _validar_lote([(0, fila)])
+    if errores:
+        return None, errores[0][2]
+    return validos[0][1], None
+
+
+# ---------- IMPORTACIÓN ----------
+
+def importar(ruta, procesos=None, tamano_lote=TAMANO_LOTE):
+    """Valida e importa el archivo. Devuelve (importados, errores), donde
+    errores es una lista de (línea, carnet, mensaje)."""
+    filas = leer_filas(ruta)
+    lotes = [filas[i:i + tamano_lote] for i in range(0, len(filas), tamano_lote)]
+
+    validos, errores = [], []
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for v, e in pool.map(_validar_lote, lotes):
+            validos.extend(v)
+            errores.extend(e)
+
+    estudiantes = cn.cargar_estudiantes()
+    cn.cargar_agregados(estudiantes)
+    nuevos = []
+    for numero, est in validos:
+        try:
+            cn.comprobar_unicos(est["carnet"], est["cedula"])
+        except ValueError as e:
+            errores.append((numero, est["carnet"], str(e)))
+            continue
+        cn.insertar_estudiante(estudiantes, est)
+        cn.sumar_agregados(est)
+        nuevos.append(est)
+
+    importados = len(nuevos)
+    if nuevos and not cn.persistir_lote(estudiantes, nuevos):
+        # Carnets registrados por otra sesión mientras se validaba el archivo
+        lineas = {est["carnet"]: numero for numero, est in validos}
+        for carnet in cn.conflictos:
+            codigo = "cedula_repetida" if carnet in cn.cedulas_en_conflicto else "carnet_repetido"
+            errores.append((lineas[carnet], carnet, validacion.MENSAJES[codigo]))
+        importados -= len(cn.conflictos)
+    errores.sort()
+    return importados, errores
+
+
+def escribir_reporte(errores, ruta):
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["linea", "carnet", "error"])
+        escritor.writerows(errores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación masiva de estudiantes desde CSV o JSONL.")
+    parser.add_argument("archivo")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos de validación (por defecto, uno por CPU)")
+    parser.add_argument("--reporte", help="CSV donde escribir las filas rechazadas")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archivo):
+        parser.error(f"No existe el archivo {args.archivo}")
+
+    importados, errores = importar(args.archivo, args.procesos)
+    print(f"\n Estudiantes importados: {importados}")
+    print(f" Filas rechazadas:       {len(errores)}\n")
+    if args.reporte:
+        escribir_reporte(errores, args.reporte)
+        print(f" Reporte de errores guardado en {args.reporte}\n")
+    else:
+        for numero, carnet, mensaje in errores:
+            print(f" Línea {numero} ({carnet or 'sin carnet'}): {mensaje}")
+
+
+if __name__ == "__main__":
+    main()
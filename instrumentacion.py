@@ -0,0 +1,188 @@
+# ==========================================
+# INSTRUMENTACIÓN DE LAS OPERACIONES PRINCIPALES
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Se activa con variables de entorno; desactivada, el decorador medir()
+# devuelve la misma función sin envolver, así que no cuesta nada.
+#
+#   NOTAS_INSTRUMENTAR=1            resumen al salir (en stderr)
+#   NOTAS_INSTRUMENTAR=archivo.json además lo guarda en ese archivo
+#   NOTAS_PERFILAR=<operación>      perfila esa operación con cProfile y
+#                                   tracemalloc (activa también el resumen)
+#
+# Por operación se registran llamadas, tiempo total, un histograma de
+# latencias en potencias de dos de microsegundos (de ahí salen p50/p90/p99
+# aproximados) y los bytes de los ficheros leídos y escritos.
+# ==========================================
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+PERFILAR = os.environ.get("NOTAS_PERFILAR", "")
+_DESTINO = os.environ.get("NOTAS_INSTRUMENTAR", "")
+ACTIVA = bool(_DESTINO) or bool(PERFILAR)
+
+_operaciones = {}  # nombre -> estadísticas
+_candado = threading.Lock()
+_perfil = {"perfilador": None, "instantanea": None, "pico": 0}
+
+
+def _estadisticas(nombre):
+    est = _operaciones.get(nombre)
+    if est is None:
+        est = _operaciones[nombre] = {
+            "llamadas": 0, "total_ns": 0, "max_ns": 0,
+            "histograma": [0] * 40, "bytes_leidos": 0, "bytes_escritos": 0,
+        }
+    return est
+
+
+def _tamano(rutas):
+    total = 0
+    for ruta in rutas:
+        try:
+            total += os.path.getsize(ruta)
+        except OSError:
+            pass
+    return total
+
+
+def registrar(nombre, duracion_ns, leidos=0, escritos=0):
+    with _candado:
+        est = _estadisticas(nombre)
+        est["llamadas"] += 1
+        est["total_ns"] += duracion_ns
+        est["max_ns"] = max(est["max_ns"], duracion_ns)
+        est["histograma"][min((duracion_ns // 1000).bit_length(), 39)] += 1
+        est["bytes_leidos"] += leidos
+        est["bytes_escritos"] += escritos
+
+
+def medir(nombre, lee=None, escribe=None):
+    """Decorador. 'lee' y 'escribe' son funciones opcionales que reciben los
+    mismos argumentos que la función medida y devuelven las rutas que lee o
+    escribe; se cuenta su tamaño (antes de la llamada para las lecturas,
+    después para las escrituras)."""
+    def decorador(funcion):
+        if not ACTIVA:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            leidos = _tamano(lee(*args, **kwargs)) if lee is not None else 0
+            perfilar = nombre == PERFILAR
+            if perfilar:
+                _iniciar_perfil()
+            inicio = time.perf_counter_ns()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                duracion = time.perf_counter_ns() - inicio
+                if perfilar:
+                    _terminar_perfil()
+                escritos = _tamano(escribe(*args, **kwargs)) if escribe is not None else 0
+                registrar(nombre, duracion, leidos, escritos)
+        return envoltura
+    return decorador
+
+
+# ---------- PERFIL DE UNA OPERACIÓN ----------
+
+def _iniciar_perfil():
+    import cProfile
+    import tracemalloc
+
+    if _perfil["perfilador"] is None:
+        _perfil["perfilador"] = cProfile.Profile()
+    tracemalloc.start()
+    _perfil["perfilador"].enable()
+
+
+def _terminar_perfil():
+    import tracemalloc
+
+    _perfil["perfilador"].disable()
+    # Se conserva la instantánea de memoria de la llamada con mayor pico
+    _, pico = tracemalloc.get_traced_memory()
+    if pico >= _perfil["pico"]:
+        _perfil["pico"] = pico
+        _perfil["instantanea"] = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+
+def _informe_perfil(salida):
+    import pstats
+
+    if _perfil["perfilador"] is None:
+        print(f"\n La operación '{PERFILAR}' no se ejecutó; no hay perfil.", file=salida)
+        return
+    archivo = f"perfil_{PERFILAR}.prof"
+    _perfil["perfilador"].dump_stats(archivo)
+    print(f"\n=== PERFIL DE '{PERFILAR}' (guardado en {archivo}) ===", file=salida)
+    pstats.Stats(_perfil["perfilador"], stream=salida).sort_stats("cumulative").print_stats(15)
+    print(f"=== MEMORIA: pico de {_perfil['pico'] / 1024:,.0f} KiB; líneas que más asignaron ===", file=salida)
+    for linea in _perfil["instantanea"].statistics("lineno")[:10]:
+        print(f"  {linea}", file=salida)
+
+
+# ---------- RESUMEN ----------
+
+def _percentil(histograma, llamadas, q):
+    # Límite superior del cubo donde cae el percentil, en microsegundos
+    objetivo = q / 100 * llamadas
+    acumulado = 0
+    for cubo, cantidad in enumerate(histograma):
+        acumulado += cantidad
+        if acumulado >= objetivo and cantidad:
+            return 2 ** cubo
+    return 0
+
+
+def resumen():
+    """Estadísticas por operación, listas para guardar como JSON."""
+    with _candado:
+        filas = []
+        for nombre, est in sorted(_operaciones.items(), key=lambda par: -par[1]["total_ns"]):
+            llamadas = est["llamadas"]
+            filas.append({
+                "operacion": nombre,
+                "llamadas": llamadas,
+                "total_ms": est["total_ns"] / 1e6,
+                "media_us": est["total_ns"] / llamadas / 1e3,
+                "p50_us": _percentil(est["histograma"], llamadas, 50),
+                "p90_us": _percentil(est["histograma"], llamadas, 90),
+                "p99_us": _percentil(est["histograma"], llamadas, 99),
+                "max_us": est["max_ns"] / 1e3,
+                "bytes_leidos": est["bytes_leidos"],
+                "bytes_escritos": est["bytes_escritos"],
+                "histograma_us": {f"<{2 ** cubo}": n for cubo, n in enumerate(est["histograma"]) if n},
+            })
+    return filas
+
+
+def _al_salir():
+    salida = sys.stderr
+    filas = resumen()
+    if filas:
+        print("\n=== INSTRUMENTACIÓN ===", file=salida)
+        print(f"{'OPERACIÓN':<26}{'LLAMADAS':>9}{'TOTAL ms':>11}{'MEDIA µs':>11}{'p50 µs':>9}"
+              f"{'p90 µs':>9}{'p99 µs':>9}{'MÁX µs':>11}{'LEÍDO KiB':>11}{'ESCRITO KiB':>12}", file=salida)
+        for f in filas:
+            print(f"{f['operacion']:<26}{f['llamadas']:>9}{f['total_ms']:>11.1f}{f['media_us']:>11.1f}"
+                  f"{f['p50_us']:>9}{f['p90_us']:>9}{f['p99_us']:>9}{f['max_us']:>11.0f}"
+                  f"{f['bytes_leidos'] / 1024:>11.0f}{f['bytes_escritos'] / 1024:>12.0f}", file=salida)
+        if _DESTINO not in ("", "1"):
+            with open(_DESTINO, "w", encoding="utf-8") as archivo:
+                json.dump(filas, archivo, ensure_ascii=False, indent=2)
+            print(f"Resumen guardado en {_DESTINO}", file=salida)
+    if PERFILAR:
+        _informe_perfil(salida)
+
+
+if ACTIVA:
+    atexit.register(_al_salir)
@@ -1,7 +1,27 @@
+import time
+_inicio_programa = time.perf_counter()
+
+import os
+import csv
+import importlib.util
+import json
+import queue
+import itertools
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
-import pandas as pd
+from tkinter import ttk, messagebox, filedialog, simpledialog
+
+import busqueda
+import historial
+import instrumentacion
+import modelo
+import validacion
+# openpyxl, pyarrow y PIL se importan solo cuando se necesitan (exportar /
+# redimensionar la bandera la primera vez), para que la ventana aparezca antes.
+
+# NOTAS_MEDIR_INICIO=1 imprime el tiempo hasta la primera pintura de la ventana;
+# con NOTAS_MEDIR_INICIO=salir además cierra la ventana después de medir.
+MEDIR_INICIO = os.environ.get("NOTAS_MEDIR_INICIO", "")
 
 # ===================== CONFIG VENTANA =====================
 ventana = tk.Tk()
@@ -11,10 +31,22 @@ COLOR_FONDO = "#FFFFFF"
 ventana.config(bg=COLOR_FONDO)
 
 # ===================== BANDERA / LOGO =====================
+# La bandera redimensionada se guarda en disco y se carga directo con Tk
+# (que lee PNG sin PIL); PIL solo se usa si falta la copia o está desactualizada.
+RUTA_BANDERA = "bandera_unan.png"
+RUTA_BANDERA_CACHE = ".bandera_unan_250x140.png"
+TAMANO_BANDERA = (250, 140)
+
+def cargar_bandera():
+    if (not os.path.exists(RUTA_BANDERA_CACHE)
+            or os.path.getmtime(RUTA_BANDERA_CACHE) < os.path.getmtime(RUTA_BANDERA)):
+        from PIL import Image
+        with Image.open(RUTA_BANDERA) as img:
+            img.resize(TAMANO_BANDERA).save(RUTA_BANDERA_CACHE, format="PNG")
+    return tk.PhotoImage(file=RUTA_BANDERA_CACHE)
+
 try:
-    img = Image.open("bandera_unan.png")
-    img = img.resize((250, 140))
-    img_tk = ImageTk.PhotoImage(img)
+    img_tk = cargar_bandera()
     label_bandera = tk.Label(ventana, image=img_tk, bg=COLOR_FONDO)
     label_bandera.image = img_tk
     label_bandera.pack(pady=6)
@@ -22,13 +54,126 @@ except Exception:
     tk.Label(ventana, text="[ Bandera no encontrada ]", bg=COLOR_FONDO, fg="red", font=("Arial", 12, "bold")).pack(pady=6)
 
 # ===================== DATOS =====================
-estudiantes = []
+# iid de la fila en la tabla -> modelo.Estudiante (en orden de ingreso). Los
+# diccionarios de la GUI (Cedula, ..., Parcial 1..4) se arman con modelo.a_gui
+# solo para mostrar, buscar, guardar o exportar un registro.
+estudiantes = {}
+orden_iids = []  # mismo orden que 'estudiantes', para acceder por posición
+_contador_iid = itertools.count(1)
+
+# Con muchos registros la tabla solo contiene las filas visibles (modo virtual)
+UMBRAL_VIRTUAL = 2000
+FORZAR_VIRTUAL = os.environ.get("NOTAS_TABLA_VIRTUAL") == "1"
+vista = {"virtual": False, "inicio": 0, "filas": 12}
+
+# Filtro por texto: índice invertido sobre estos campos, mantenido en cada
+# alta, cambio o baja. filtro["iids"] es None cuando no hay filtro activo.
+CAMPOS_BUSQUEDA = ('Nombre', 'Apellido', 'Carrera', 'Departamento', 'Direccion')
+indice_texto = busqueda.IndiceTexto()
+filtro = {"iids": None}
+
+# Cédula -> iid; la cédula es única entre los registros
+indice_cedula = {}
+
+# Historial de cambios por registro (historial.py), con la cédula como clave:
+# deshacer (Ctrl+Z), rehacer (Ctrl+Y) y volver a los datos de una fecha
+ARCHIVO_HISTORIAL_GUI = "matricula_gui.historial.jsonl"
+historial_gui = historial.Historial(ARCHIVO_HISTORIAL_GUI, clave=lambda est: est["Cedula"])
+
+# ===================== GUARDADO AUTOMÁTICO =====================
+# Cada cambio reprograma un temporizador; cuando pasan DEMORA_GUARDADO ms sin
+# cambios, se toma una copia de la lista y un hilo la escribe en disco. Una
+# ráfaga de ediciones produce una sola escritura. El mismo hilo escribe el
+# historial (y sus puntos de control), en orden y sin saltarse ninguno.
+ARCHIVO_GUI = "matricula_gui.json"
+DEMORA_GUARDADO = 1000  # ms
+_guardado = {"temporizador": None}
+_cola_guardado = queue.Queue()
+
+@instrumentacion.medir("guardar_gui", escribe=lambda *_: [ARCHIVO_GUI])
+def escribir_archivo(registros):
+    # Escritura atómica: temporal + renombrar
+    temporal = ARCHIVO_GUI + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump([modelo.a_gui(est) for est in registros], f, ensure_ascii=False)
+    os.replace(temporal, ARCHIVO_GUI)
+
+def _hilo_guardado():
+    terminar = False
+    while not terminar:
+        registros = None
+        cambios = []
+        pedidos = [_cola_guardado.get()]
+        # Si se acumularon varias copias solo interesa la más reciente; los
+        # cambios del historial (tuplas) se escriben todos. None indica que la
+        # ventana se está cerrando.
+        while True:
+            pedido = pedidos[-1]
+            if pedido is None:
+                terminar = True
+            elif isinstance(pedido, tuple):
+                cambios.append(pedido)
+            else:
+                registros = pedido
+            if _cola_guardado.empty():
+                break
+            pedidos.append(_cola_guardado.get_nowait())
+        try:
+            for cambio, copia, marca in cambios:
+                historial_gui.registrar(cambio, lambda: [modelo.a_gui(est) for est in copia], marca)
+        except OSError as e:
+            print(f"No se pudo escribir {ARCHIVO_HISTORIAL_GUI}: {e}")
+        if registros is not None:
+            try:
+                escribir_archivo(registros)
+            except OSError as e:
+                print(f"No se pudo guardar {ARCHIVO_GUI}: {e}")
+        for _ in pedidos:
+            _cola_guardado.task_done()
+
+def _guardar_ahora():
+    _guardado["temporizador"] = None
+    _cola_guardado.put(list(estudiantes.values()))
+
+def programar_guardado():
+    if _guardado["temporizador"] is not None:
+        ventana.after_cancel(_guardado["temporizador"])
+    _guardado["temporizador"] = ventana.after(DEMORA_GUARDADO, _guardar_ahora)
+
+def cargar_archivo():
+    if not os.path.exists(ARCHIVO_GUI):
+        return
+    try:
+        with open(ARCHIVO_GUI, "r", encoding="utf-8") as f:
+            registros = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        messagebox.showwarning("Advertencia", f"No se pudo leer {ARCHIVO_GUI}: {e}")
+        return
+    for datos in registros:
+        iid = nuevo_iid()
+        estudiantes[iid] = modelo.desde_gui(datos)
+        indice_cedula.setdefault(datos.get("Cedula"), iid)
+        orden_iids.append(iid)
+        registrar_anchos(datos)
+        indexar(iid, datos)
+    actualizar_tabla()
+
+def cerrar_ventana():
+    # Guarda lo pendiente y espera a que el hilo termine antes de salir
+    if _guardado["temporizador"] is not None:
+        ventana.after_cancel(_guardado["temporizador"])
+        _guardar_ahora()
+    _cola_guardado.put(None)
+    hilo_guardado.join(timeout=10)
+    ventana.destroy()
+
+hilo_guardado = threading.Thread(target=_hilo_guardado, daemon=True)
 
 # ===================== FUNCIONES =====================
 def calcular_promedio(notas_list):
     try:
         notas = [float(n) for n in notas_list if str(n).strip() != ""]
-        return round(sum(notas) / len(notas), 2) if notas else 0
+        return round(modelo.promedio(notas), 2)
     except Exception:
         return 0
 
@@ -37,7 +182,7 @@ def obtener_estado(promedio):
         prom = float(promedio)
         if prom == 0:
             return "Sin notas"
-        return "Aprobado ✅" if prom >= 60 else "Reprobado ❌"
+        return "Aprobado ✅" if prom >= modelo.NOTA_APROBACION else "Reprobado ❌"
     except Exception:
         return "Inválido"
 
@@ -69,30 +214,148 @@ def recolectar_campos():
     datos["Estado"] = obtener_estado(datos["Promedio"])
     return datos
 
+def nuevo_iid():
+    return f"E{next(_contador_iid)}"
+
+def registro(iid):
+    return modelo.a_gui(estudiantes[iid])
+
+def fila_de(est):
+    return [est.get(c, '') for c in cols]
+
+def indexar(iid, datos):
+    indice_texto.actualizar(iid, [datos.get(c, '') for c in CAMPOS_BUSQUEDA])
+
+def filas_mostradas():
+    return orden_iids if filtro["iids"] is None else filtro["iids"]
+
+def aplicar_filtro(*_):
+    texto = var_filtro.get().strip()
+    if texto:
+        # Los iid son 'E<n>' crecientes: ordenarlos por n respeta el orden de ingreso
+        filtro["iids"] = sorted(indice_texto.buscar(texto), key=lambda iid: int(iid[1:]))
+    else:
+        filtro["iids"] = None
+    vista["inicio"] = 0
+    actualizar_tabla()
+
+@instrumentacion.medir("actualizar_tabla")
 def actualizar_tabla():
-    """Actualiza la vista de la tabla con la lista 'estudiantes' (diccionarios)."""
-    # Limpia la tabla
-    for fila in tabla.get_children():
-        tabla.delete(fila)
-    # Inserta filas (manteniendo el orden de columnas 'cols')
-    for est in estudiantes:
-        fila = [
-            est.get('Cedula',''), est.get('Nombre',''), est.get('Apellido',''), est.get('Sexo',''),
-            est.get('Fecha Nac',''), est.get('Estado Civil',''), est.get('Nacionalidad',''), est.get('Departamento',''),
-            est.get('Direccion',''), est.get('Telefono',''), est.get('Correo',''), est.get('Carrera',''),
-            est.get('Año',''), est.get('Nombre Padre',''), est.get('Nombre Madre',''), est.get('Ingresos Padres',''),
-            est.get('Parcial 1',''), est.get('Parcial 2',''), est.get('Parcial 3',''), est.get('Parcial 4',''),
-            est.get('Promedio',''), est.get('Estado','')
-        ]
-        tabla.insert("", "end", values=fila)
+    """Reconstruye la tabla completa. Las altas, cambios y bajas usan las
+    funciones por fila de abajo; esta solo se usa al cargar, al filtrar o al
+    cambiar de modo."""
+    vista["virtual"] = FORZAR_VIRTUAL or len(filas_mostradas()) > UMBRAL_VIRTUAL
+    tabla.delete(*tabla.get_children())
+    if vista["virtual"]:
+        scroll_tabla.config(command=desplazar_virtual)
+        tabla.config(yscrollcommand='')
+        mostrar_ventana()
+    else:
+        scroll_tabla.config(command=tabla.yview)
+        tabla.config(yscrollcommand=scroll_tabla.set)
+        for iid in filas_mostradas():
+            tabla.insert("", "end", iid=iid, values=fila_de(registro(iid)))
+
+# ---------- Modo virtual: solo existen en la tabla las filas visibles ----------
+def mostrar_ventana():
+    mostradas = filas_mostradas()
+    total = len(mostradas)
+    filas = vista["filas"]
+    vista["inicio"] = max(0, min(vista["inicio"], total - filas))
+    inicio = vista["inicio"]
+    visibles = mostradas[inicio:inicio + filas]
+    seleccion = tabla.focus()
+    tabla.delete(*tabla.get_children())
+    for iid in visibles:
+        tabla.insert("", "end", iid=iid, values=fila_de(registro(iid)))
+    if seleccion and tabla.exists(seleccion):
+        tabla.focus(seleccion)
+        tabla.selection_set(seleccion)
+    if total:
+        scroll_tabla.set(inicio / total, min(inicio + filas, total) / total)
+    else:
+        scroll_tabla.set(0, 1)
+
+def desplazar_virtual(accion, cantidad, unidad=None):
+    total = len(filas_mostradas())
+    if accion == "moveto":
+        vista["inicio"] = int(float(cantidad) * total)
+    elif accion == "scroll":
+        paso = vista["filas"] if unidad == "pages" else 1
+        vista["inicio"] += int(cantidad) * paso
+    mostrar_ventana()
+
+def rueda_virtual(event):
+    if not vista["virtual"]:
+        return
+    vista["inicio"] += -3 if (event.delta > 0 or getattr(event, 'num', 0) == 4) else 3
+    mostrar_ventana()
+    return "break"
+
+def redimensionar_tabla(event):
+    filas = max(1, (event.height - 30) // 24)  # 24 = rowheight del estilo
+    if filas != vista["filas"]:
+        vista["filas"] = filas
+        if vista["virtual"]:
+            mostrar_ventana()
+
+# ---------- Cambios por fila ----------
+def insertar_fila(iid):
+    if filtro["iids"] is not None:
+        aplicar_filtro()  # solo se muestra si coincide con el filtro
+    elif vista["virtual"]:
+        mostrar_ventana()
+    elif FORZAR_VIRTUAL or len(estudiantes) > UMBRAL_VIRTUAL:
+        actualizar_tabla()  # se pasó el umbral: cambia a modo virtual
+    else:
+        tabla.insert("", "end", iid=iid, values=fila_de(registro(iid)))
+
+def cambiar_fila(iid):
+    if filtro["iids"] is not None:
+        aplicar_filtro()
+    elif tabla.exists(iid):
+        tabla.item(iid, values=fila_de(registro(iid)))
+
+def quitar_fila(iid):
+    if filtro["iids"] is not None:
+        aplicar_filtro()
+    elif vista["virtual"]:
+        mostrar_ventana()
+    elif tabla.exists(iid):
+        tabla.delete(iid)
+
+def parcial_invalido(datos):
+    for parcial in modelo.PARCIALES:
+        if datos[parcial] and validacion.validar("nota", datos[parcial])[1] is not None:
+            messagebox.showwarning("Advertencia", f"{parcial}: {validacion.MENSAJES['nota']}")
+            return True
+    return False
+
+def cedula_repetida(cedula, iid=None):
+    # 'iid' es el registro que se actualiza (None al agregar uno nuevo)
+    otro = indice_cedula.get(cedula)
+    if otro is not None and otro != iid:
+        messagebox.showwarning("Advertencia", f"Ya existe un estudiante con la cédula {cedula}.")
+        return True
+    return False
 
 def agregar_estudiante():
     datos = recolectar_campos()
     if not datos["Cedula"] or not datos["Nombre"]:
         messagebox.showwarning("Advertencia", "Cédula y Nombre son obligatorios.")
         return
-    estudiantes.append(datos)
-    actualizar_tabla()
+    if parcial_invalido(datos) or cedula_repetida(datos["Cedula"]):
+        return
+    iid = nuevo_iid()
+    estudiantes[iid] = modelo.desde_gui(datos)
+    datos = registro(iid)
+    indice_cedula[datos["Cedula"]] = iid
+    orden_iids.append(iid)
+    registrar_anchos(datos)
+    indexar(iid, datos)
+    insertar_fila(iid)
+    anotar_cambios([(datos["Cedula"], None, datos)])
+    programar_guardado()
     limpiar_campos()
 
 def actualizar_estudiante():
@@ -100,10 +363,24 @@ def actualizar_estudiante():
     if not sel:
         messagebox.showwarning("Advertencia", "Selecciona un registro para actualizar.")
         return
-    idx = tabla.index(sel)
     datos = recolectar_campos()
-    estudiantes[idx] = datos
-    actualizar_tabla()
+    if parcial_invalido(datos) or cedula_repetida(datos["Cedula"], sel):
+        return
+    previo = registro(sel)
+    anterior = previo["Cedula"]
+    if indice_cedula.get(anterior) == sel:
+        del indice_cedula[anterior]
+    estudiantes[sel] = modelo.desde_gui(datos)
+    datos = registro(sel)
+    indice_cedula[datos["Cedula"]] = sel
+    if anterior == datos["Cedula"]:
+        anotar_cambios([(anterior, previo, datos)])
+    else:
+        anotar_cambios([(anterior, previo, None), (datos["Cedula"], None, datos)])
+    registrar_anchos(datos)
+    indexar(sel, datos)
+    cambiar_fila(sel)
+    programar_guardado()
     limpiar_campos()
 
 def eliminar_estudiante():
@@ -113,11 +390,103 @@ def eliminar_estudiante():
         return
     if not messagebox.askyesno("Confirmar", "¿Deseas eliminar el registro seleccionado?"):
         return
-    idx = tabla.index(sel[0])
-    estudiantes.pop(idx)
-    actualizar_tabla()
+    iid = sel[0]
+    previo = registro(iid)
+    if indice_cedula.get(previo["Cedula"]) == iid:
+        del indice_cedula[previo["Cedula"]]
+    del estudiantes[iid]
+    anotar_cambios([(previo["Cedula"], previo, None)])
+    orden_iids.remove(iid)
+    indice_texto.quitar(iid)
+    quitar_fila(iid)
+    programar_guardado()
+    limpiar_campos()
+
+# ---------- Historial ----------
+def anotar_cambios(cambios, marca=None):
+    # Lo escribe el hilo de guardado; la copia de la lista (solo referencias,
+    # los registros se reemplazan y nunca se modifican) es para los puntos
+    # de control
+    _cola_guardado.put((cambios, list(estudiantes.values()), marca))
+
+def esperar_historial():
+    # Antes de leer el historial se espera a que el hilo escriba lo pendiente
+    _cola_guardado.join()
+
+def registro_por_cedula(cedula):
+    iid = indice_cedula.get(cedula)
+    return None if iid is None else registro(iid)
+
+def aplicar_estados(destinos, marca=None):
+    # Deja cada cédula de 'destinos' con ese registro (None: que no exista)
+    cambios = []
+    for cedula, nuevo in destinos.items():
+        iid = indice_cedula.get(cedula)
+        actual = None if iid is None else registro(iid)
+        if actual is None and nuevo is None:
+            continue
+        if nuevo is not None:
+            # Se anota el registro tal como queda en el modelo
+            nuevo = modelo.a_gui(modelo.desde_gui(nuevo))
+        cambios.append((cedula, actual, nuevo))
+        if nuevo is None:
+            del indice_cedula[cedula]
+            del estudiantes[iid]
+            orden_iids.remove(iid)
+            indice_texto.quitar(iid)
+            quitar_fila(iid)
+        elif actual is None:
+            iid = nuevo_iid()
+            estudiantes[iid] = modelo.desde_gui(nuevo)
+            indice_cedula[cedula] = iid
+            orden_iids.append(iid)
+            registrar_anchos(nuevo)
+            indexar(iid, nuevo)
+            insertar_fila(iid)
+        else:
+            estudiantes[iid] = modelo.desde_gui(nuevo)
+            registrar_anchos(nuevo)
+            indexar(iid, nuevo)
+            cambiar_fila(iid)
+    anotar_cambios(cambios, marca)
+    programar_guardado()
+
+def deshacer(rehacer=False):
+    esperar_historial()
+    pendiente = historial_gui.pendiente(rehacer)
+    if pendiente is None:
+        messagebox.showinfo("Historial", f"No hay cambios que {'rehacer' if rehacer else 'deshacer'}.")
+        return
+    grupo, entradas = pendiente
+    try:
+        destinos = historial_gui.invertir(entradas, registro_por_cedula)
+    except ValueError as e:
+        messagebox.showwarning("Advertencia", str(e))
+        return
+    aplicar_estados(destinos, ("rehace" if rehacer else "deshace", grupo))
     limpiar_campos()
 
+def restaurar_fecha():
+    texto = simpledialog.askstring("Volver a una fecha", "Fecha y hora (AAAA-MM-DD HH:MM):", parent=ventana)
+    if not texto:
+        return
+    try:
+        marca = historial.leer_fecha(texto)
+        esperar_historial()
+        destino = historial_gui.estado_en(marca)
+    except ValueError as e:
+        messagebox.showwarning("Advertencia", str(e))
+        return
+    destinos = {cedula: est for cedula, est in destino.items() if registro_por_cedula(cedula) != est}
+    destinos.update((cedula, None) for cedula in indice_cedula if cedula not in destino)
+    if not destinos:
+        messagebox.showinfo("Historial", "Los datos ya están como en esa fecha.")
+        return
+    if messagebox.askyesno("Confirmar", f"Se cambiarán {len(destinos)} registro(s) para dejarlos como el "
+                                        f"{historial.mostrar_fecha(marca)}. Se puede deshacer. ¿Continuar?"):
+        aplicar_estados(destinos)
+        limpiar_campos()
+
 def limpiar_campos():
     for e in [entry_cedula, entry_nombre, entry_apellido, entry_fecha, entry_nacionalidad, entry_departamento,
               entry_direccion, entry_telefono, entry_correo, entry_carrera, entry_anio, entry_padre, entry_madre, entry_ingresos,
@@ -180,25 +549,121 @@ def on_seleccion(event):
         elif k == "Parcial 4":
             entry_parcial4.delete(0, tk.END); entry_parcial4.insert(0, v)
 
+# ---------- Exportación en segundo plano ----------
+# El archivo se escribe fila por fila en un hilo aparte; la ventana solo
+# consulta el avance cada 100 ms para mover la barra de progreso.
+# Los anchos de columna se mantienen al agregar o actualizar registros, así
+# la exportación no necesita otra pasada sobre los datos para calcularlos.
+anchos_columnas = {}
+
+def registrar_anchos(est):
+    for c in cols:
+        largo = len(str(est.get(c, '')))
+        if largo > anchos_columnas.get(c, len(c)):
+            anchos_columnas[c] = largo
+
+# El trabajo de exportar_excel se mide en cada escritor (corre en el hilo)
+@instrumentacion.medir("exportar_excel_xlsx", escribe=lambda archivo, *_: [archivo])
+def _escribir_xlsx(archivo, registros, estado, cancelar):
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet('Matricula')
+    # En modo write_only los anchos deben fijarse antes de la primera fila
+    for i, c in enumerate(cols, 1):
+        hoja.column_dimensions[get_column_letter(i)].width = anchos_columnas.get(c, len(c)) + 2
+    hoja.append(cols)
+    for est in registros:
+        hoja.append(fila_de(modelo.a_gui(est)))
+        estado["filas"] += 1
+        if cancelar.is_set():
+            return
+    libro.save(archivo)
+
+@instrumentacion.medir("exportar_excel_csv", escribe=lambda archivo, *_: [archivo])
+def _escribir_csv(archivo, registros, estado, cancelar):
+    with open(archivo, 'w', encoding='utf-8-sig', newline='') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(cols)
+        for est in registros:
+            escritor.writerow(fila_de(modelo.a_gui(est)))
+            estado["filas"] += 1
+            if cancelar.is_set():
+                return
+
+@instrumentacion.medir("exportar_excel_parquet", escribe=lambda archivo, *_: [archivo])
+def _escribir_parquet(archivo, registros, estado, cancelar, filas_por_grupo=10000):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    esquema = pa.schema([(c, pa.string()) for c in cols])
+    with pq.ParquetWriter(archivo, esquema) as escritor:
+        for inicio in range(0, len(registros), filas_por_grupo):
+            grupo = [modelo.a_gui(est) for est in registros[inicio:inicio + filas_por_grupo]]
+            columnas = [[str(est.get(c, '')) for est in grupo] for c in cols]
+            escritor.write_table(pa.Table.from_arrays(columnas, schema=esquema))
+            estado["filas"] += len(grupo)
+            if cancelar.is_set():
+                return
+
+ESCRITORES = {'.xlsx': _escribir_xlsx, '.csv': _escribir_csv}
+TIPOS_EXPORTACION = [("Excel files", "*.xlsx"), ("CSV", "*.csv")]
+# Parquet solo se ofrece si pyarrow está instalado (se busca sin importarlo)
+if importlib.util.find_spec("pyarrow") is not None:
+    ESCRITORES['.parquet'] = _escribir_parquet
+    TIPOS_EXPORTACION.append(("Parquet", "*.parquet"))
+
 def exportar_excel():
     if not estudiantes:
         messagebox.showwarning("Advertencia", "No hay datos para exportar.")
         return
-    df = pd.DataFrame(estudiantes)
-    archivo = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files","*.xlsx")])
+    archivo = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=TIPOS_EXPORTACION)
     if not archivo:
         return
-    try:
-        with pd.ExcelWriter(archivo, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Matricula')
-            hoja = writer.sheets['Matricula']
-            # ajustar anchos de columna
-            for i, col in enumerate(df.columns, 1):
-                max_len = df[col].astype(str).map(len).max()
-                hoja.column_dimensions[hoja.cell(row=1, column=i).column_letter].width = max(max_len + 2, len(col) + 2)
-        messagebox.showinfo('Éxito', f'Datos exportados a: {archivo}')
-    except Exception as e:
-        messagebox.showerror('Error', f'No se pudo exportar: {e}')
+    escritor = ESCRITORES.get(os.path.splitext(archivo)[1].lower(), _escribir_xlsx)
+    # Copia de las referencias: el hilo no ve los cambios hechos mientras exporta
+    registros = list(estudiantes.values())
+    estado = {"filas": 0, "error": None, "terminado": False}
+    cancelar = threading.Event()
+
+    dialogo = tk.Toplevel(ventana)
+    dialogo.title('Exportando...')
+    dialogo.transient(ventana)
+    tk.Label(dialogo, text=f'Exportando {len(registros)} registros a {os.path.basename(archivo)}').pack(padx=12, pady=(12, 4))
+    barra = ttk.Progressbar(dialogo, length=320, maximum=len(registros))
+    barra.pack(padx=12, pady=4)
+    tk.Button(dialogo, text='Cancelar', command=cancelar.set).pack(pady=(4, 12))
+
+    def trabajar():
+        # Se escribe en un temporal y solo al terminar bien reemplaza al
+        # archivo elegido; si se cancela o falla, el archivo que ya hubiera
+        # queda intacto
+        temporal = archivo + ".tmp"
+        try:
+            escritor(temporal, registros, estado, cancelar)
+            if not cancelar.is_set():
+                os.replace(temporal, archivo)
+        except Exception as e:
+            estado["error"] = e
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            estado["terminado"] = True
+
+    def revisar():
+        barra['value'] = estado["filas"]
+        if not estado["terminado"]:
+            ventana.after(100, revisar)
+            return
+        dialogo.destroy()
+        if estado["error"] is not None:
+            messagebox.showerror('Error', f'No se pudo exportar: {estado["error"]}')
+        elif cancelar.is_set():
+            messagebox.showinfo('Exportación', 'Exportación cancelada.')
+        else:
+            messagebox.showinfo('Éxito', f'Datos exportados a: {archivo}')
+
+    threading.Thread(target=trabajar, daemon=True).start()
+    ventana.after(100, revisar)
 
 # ===================== INTERFAZ - FORMULARIO =====================
 frame_form = tk.LabelFrame(ventana, text='Datos de Matrícula', bg=COLOR_FONDO, fg='black', font=('Arial', 11, 'bold'))
@@ -300,7 +765,12 @@ tk.Button(frame_botones, text='Agregar', command=agregar_estudiante, bg='#4DB6AC
 tk.Button(frame_botones, text='Actualizar', command=actualizar_estudiante, bg='#64B5F6', fg='white', **btn_style).grid(row=0, column=1, padx=8)
 tk.Button(frame_botones, text='Eliminar', command=eliminar_estudiante, bg='#E57373', fg='white', **btn_style).grid(row=0, column=2, padx=8)
 tk.Button(frame_botones, text='Limpiar', command=limpiar_campos, bg='#9E9E9E', fg='white', **btn_style).grid(row=0, column=3, padx=8)
-tk.Button(frame_botones, text='Exportar Excel', command=exportar_excel, bg='#81C784', fg='white', **btn_style).grid(row=0, column=4, padx=8)
+tk.Button(frame_botones, text='Exportar', command=exportar_excel, bg='#81C784', fg='white', **btn_style).grid(row=0, column=4, padx=8)
+tk.Button(frame_botones, text='Deshacer', command=deshacer, bg='#B0BEC5', fg='white', **btn_style).grid(row=1, column=1, padx=8, pady=(6, 0))
+tk.Button(frame_botones, text='Rehacer', command=lambda: deshacer(rehacer=True), bg='#B0BEC5', fg='white', **btn_style).grid(row=1, column=2, padx=8, pady=(6, 0))
+tk.Button(frame_botones, text='Volver a fecha', command=restaurar_fecha, bg='#B0BEC5', fg='white', **btn_style).grid(row=1, column=3, padx=8, pady=(6, 0))
+ventana.bind('<Control-z>', lambda _: deshacer())
+ventana.bind('<Control-y>', lambda _: deshacer(rehacer=True))
 
 # ===================== TABLA =====================
 cols = [
@@ -309,17 +779,49 @@ cols = [
     'Parcial 1','Parcial 2','Parcial 3','Parcial 4','Promedio','Estado'
 ]
 
-tabla = ttk.Treeview(ventana, columns=cols, show='headings', height=12)
+frame_filtro = tk.Frame(ventana, bg=COLOR_FONDO)
+frame_filtro.pack(fill='x', padx=12)
+tk.Label(frame_filtro, text='Buscar (nombre, apellido, carrera, lugar):', bg=COLOR_FONDO).pack(side='left')
+var_filtro = tk.StringVar()
+var_filtro.trace_add('write', aplicar_filtro)
+tk.Entry(frame_filtro, textvariable=var_filtro, width=40, font=('Arial', 10)).pack(side='left', padx=6)
+
+frame_tabla = tk.Frame(ventana, bg=COLOR_FONDO)
+frame_tabla.pack(fill='both', expand=True, padx=12, pady=(4, 12))
+
+tabla = ttk.Treeview(frame_tabla, columns=cols, show='headings', height=12)
 for c in cols:
     tabla.heading(c, text=c)
     tabla.column(c, width=110, anchor='center')
 
-tabla.pack(fill='both', expand=True, padx=12, pady=12)
+scroll_tabla = ttk.Scrollbar(frame_tabla, orient='vertical', command=tabla.yview)
+tabla.config(yscrollcommand=scroll_tabla.set)
+scroll_tabla.pack(side='right', fill='y')
+tabla.pack(side='left', fill='both', expand=True)
 tabla.bind('<<TreeviewSelect>>', on_seleccion)
+tabla.bind('<Configure>', redimensionar_tabla)
+for evento in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+    tabla.bind(evento, rueda_virtual)
 
 # estilo simple
 style = ttk.Style()
 style.configure('Treeview.Heading', font=('Arial', 10, 'bold'))
 style.configure('Treeview', font=('Arial', 10), rowheight=24)
 
-ventana.mainloop()
+def reportar_inicio():
+    ventana.update_idletasks()
+    ms = (time.perf_counter() - _inicio_programa) * 1000
+    print(f"Tiempo hasta la primera pintura: {ms:.1f} ms")
+    if MEDIR_INICIO == "salir":
+        ventana.destroy()
+
+cargar_archivo()
+hilo_guardado.start()
+ventana.protocol("WM_DELETE_WINDOW", cerrar_ventana)
+
+if MEDIR_INICIO:
+    ventana.after_idle(reportar_inicio)
+
+# Importado como módulo (p. ej. desde benchmarks) no se entra al bucle de eventos
+if __name__ == "__main__":
+    ventana.mainloop()
@@ -0,0 +1,160 @@
+# ==========================================
+# MODELO COMPARTIDO: Estudiante y Nota
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Clases con __slots__ (sin diccionario por instancia). Las notas se guardan
+# en un array('f') y las materias en una tupla de cadenas internadas, en
+# lugar de una lista de diccionarios por estudiante.
+#
+# control_de_notas.py y la GUI (interfaz_notas.py) guardan en memoria
+# objetos Estudiante; los diccionarios solo aparecen al leer o escribir:
+#   desde_cli / a_cli: formato de estudiantes.json;
+#   desde_gui / a_gui: diccionarios de la GUI (Cedula, Nombre, ...,
+#                      Parcial 1..4), que son los de matricula_gui.json.
+# control_notas.py sigue con diccionarios porque los comparte tal cual con
+# los almacenes, el historial y servidor_api.py; de aquí usa la nota de
+# aprobación y el promedio.
+# ==========================================
+
+import sys
+from array import array
+
+NOTA_APROBACION = 60
+PARCIALES = ("Parcial 1", "Parcial 2", "Parcial 3", "Parcial 4")
+
+_intern = sys.intern
+
+
+def promedio(notas):
+    """Promedio de una secuencia de notas (0 si está vacía). Es el mismo
+    cálculo para el CLI y la GUI."""
+    total = 0.0
+    cantidad = 0
+    for nota in notas:
+        total += nota
+        cantidad += 1
+    return total / cantidad if cantidad else 0
+
+
+class Nota:
+    __slots__ = ("materia", "nota")
+
+    def __init__(self, materia, nota):
+        self.materia = materia
+        self.nota = nota
+
+    @property
+    def aprobada(self):
+        return self.nota >= NOTA_APROBACION
+
+    def __repr__(self):
+        return f"Nota({self.materia!r}, {self.nota:.2f})"
+
+
+class Estudiante:
+    __slots__ = (
+        "carnet", "cedula", "nombre", "apellido", "sexo", "estado_civil",
+        "fecha_nac", "nacionalidad", "direccion", "departamento", "municipio",
+        "area_conocimiento", "carrera", "anio", "plan_estudio", "telefono",
+        "correo", "nombre_padre", "nombre_madre", "ingreso_padre",
+        "materias", "notas",
+    )
+
+    def __init__(self, **campos):
+        for campo in self.__slots__:
+            setattr(self, campo, campos.get(campo, ""))
+        self.materias = tuple(_intern(m) for m in campos.get("materias", ()))
+        self.notas = array("f", campos.get("notas", ()))
+
+    def agregar_nota(self, materia, nota):
+        self.materias += (_intern(materia),)
+        self.notas.append(nota)
+
+    def lista_notas(self):
+        return [Nota(m, n) for m, n in zip(self.materias, self.notas)]
+
+    @property
+    def promedio(self):
+        return promedio(self.notas)
+
+    def __repr__(self):
+        return f"Estudiante({self.carnet or self.cedula!r}, {self.nombre!r})"
+
+
+# Los valores categóricos se repiten mucho entre registros; internarlos hace
+# que todos los estudiantes compartan la misma cadena.
+_CATEGORICOS = ("sexo", "estado_civil", "nacionalidad", "departamento", "municipio",
+                "area_conocimiento", "carrera", "plan_estudio")
+
+
+def _crear(campos):
+    for campo in _CATEGORICOS:
+        if isinstance(campos.get(campo), str):
+            campos[campo] = _intern(campos[campo])
+    return Estudiante(**campos)
+
+
+# ---------- CONVERSIÓN: formato del CLI (estudiantes.json) ----------
+
+CAMPOS_CLI = ("carnet", "nombre", "estado_civil", "sexo", "cedula", "direccion",
+              "departamento", "municipio", "area_conocimiento", "carrera", "anio",
+              "plan_estudio", "ingreso_padre")
+
+
+def desde_cli(d):
+    campos = {campo: d.get(campo, "") for campo in CAMPOS_CLI}
+    campos["materias"] = [n["materia"] for n in d.get("notas", [])]
+    campos["notas"] = [n["nota"] for n in d.get("notas", [])]
+    return _crear(campos)
+
+
+def a_cli(est):
+    # array('f') es de precisión simple: se redondea a 2 decimales, que es la
+    # precisión con la que se ingresan las notas
+    d = {campo: getattr(est, campo) for campo in CAMPOS_CLI}
+    d["notas"] = [{"materia": m, "nota": round(n, 2)} for m, n in zip(est.materias, est.notas)]
+    return d
+
+
+# ---------- CONVERSIÓN: formato de la GUI ----------
+
+CAMPOS_GUI = {
+    "Cedula": "cedula", "Nombre": "nombre", "Apellido": "apellido", "Sexo": "sexo",
+    "Fecha Nac": "fecha_nac", "Estado Civil": "estado_civil", "Nacionalidad": "nacionalidad",
+    "Departamento": "departamento", "Direccion": "direccion", "Telefono": "telefono",
+    "Correo": "correo", "Carrera": "carrera", "Año": "anio", "Nombre Padre": "nombre_padre",
+    "Nombre Madre": "nombre_madre", "Ingresos Padres": "ingreso_padre",
+}
+_SEXO_GUI = {"Masculino": "M", "Femenino": "F"}
+_SEXO_CLI = {"M": "Masculino", "F": "Femenino"}
+
+
+def _numero(texto):
+    try:
+        return float(texto)
+    except (TypeError, ValueError):
+        return None
+
+
+def desde_gui(d):
+    campos = {atributo: d.get(clave, "") for clave, atributo in CAMPOS_GUI.items()}
+    campos["sexo"] = _SEXO_GUI.get(campos["sexo"], campos["sexo"])
+    campos["materias"], campos["notas"] = [], []
+    for parcial in PARCIALES:
+        nota = _numero(d.get(parcial, ""))
+        if nota is not None:
+            campos["materias"].append(parcial)
+            campos["notas"].append(nota)
+    return _crear(campos)
+
+
+def a_gui(est):
+    d = {clave: getattr(est, atributo) for clave, atributo in CAMPOS_GUI.items()}
+    d["Sexo"] = _SEXO_CLI.get(est.sexo, est.sexo)
+    parciales = dict(zip(est.materias, est.notas))
+    for parcial in PARCIALES:
+        d[parcial] = f"{round(parciales[parcial], 2):g}" if parcial in parciales else ""
+    d["Promedio"] = round(est.promedio, 2)
+    d["Estado"] = ("Sin notas" if d["Promedio"] == 0 else
+                   "Aprobado ✅" if d["Promedio"] >= NOTA_APROBACION else "Reprobado ❌")
+    return d
@@ -0,0 +1,460 @@
+# ==========================================
+# API HTTP/JSON LOCAL (asyncio)
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Expone los datos de control_notas.py a otros programas:
+#
+#   GET    /estudiantes?pagina=1&tamano=20&orden=carnet|promedio|nombre|carrera&q=texto
+#   GET    /estudiantes/<carnet>
+#   POST   /estudiantes              cuerpo: estudiante como en estudiantes.json
+#   PUT    /estudiantes/<carnet>     cuerpo: solo los campos que cambian
+#   DELETE /estudiantes/<carnet>
+#   GET    /promedio
+#   GET    /reportes?por=carrera|materia|anio|departamento   (requiere NumPy)
+#   GET    /mejores?n=20&peores=1&carrera=Medicina
+#
+# Las consultas se responden desde la lista y los índices en memoria de
+# control_notas.py. Las escrituras responden enseguida y se guardan después
+# (write-behind): los cambios se acumulan por carnet y cada DEMORA_GUARDADO
+# segundos un hilo los escribe con el mismo bloqueo y versiones que usan las
+# sesiones del CLI. Los registros nunca se modifican en sitio (se reemplazan
+# por uno nuevo), así que el hilo puede escribir una copia superficial de la
+# lista mientras se siguen atendiendo peticiones.
+#
+# Uso:
+#     python servidor_api.py [--host 127.0.0.1] [--puerto 8080] [--demora 1.0]
+# ==========================================
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import traceback
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import almacen_sqlite
+import control_notas as cn
+import importacion_masiva
+
+DEMORA_GUARDADO = 1.0  # segundos
+TAMANO_MAXIMO_PAGINA = 500
+TAMANO_MAXIMO_CUERPO = 1024 * 1024
+
+ESTADOS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error", 501: "Not Implemented",
+}
+
+estudiantes = []
+pendientes = {}  # carnet -> (operación, estudiante, versión base), aún sin guardar
+originales = {}  # carnet -> registro tal como está en el disco (para el historial)
+revision = 0  # sube en cada cambio; invalida las columnas de los reportes
+_columnas = {"revision": -1, "datos": None}
+
+_hay_cambios = None  # asyncio.Event y asyncio.Lock, se crean dentro del bucle
+_volcando = None
+_cerrando = False
+
+
+# ---------- CAMBIOS PENDIENTES ----------
+
+def _acumular(destino, operacion, est, base):
+    # Combina con el cambio pendiente del mismo carnet, conservando la versión
+    # base original (la que tiene el registro en el disco)
+    previo = destino.get(est["carnet"])
+    if previo is None:
+        destino[est["carnet"]] = (operacion, est, base)
+        return
+    operacion_previa, _, base = previo
+    if operacion_previa == "agregar":
+        if operacion == "eliminar":
+            del destino[est["carnet"]]  # nunca llegó al disco
+        else:
+            destino[est["carnet"]] = ("agregar", est, base)
+    else:
+        destino[est["carnet"]] = ("actualizar" if operacion == "agregar" else operacion, est, base)
+
+
+def _base(carnet):
+    previo = pendientes.get(carnet)
+    if previo is not None:
+        return previo[2]
+    est = cn.obtener_estudiante(estudiantes, carnet)
+    return None if est is None else est.get("version", 0)
+
+
+def _registrar(operacion, est, base, anterior=None):
+    # 'anterior' es el registro antes de este cambio; el historial necesita el
+    # del disco, que es el del primer cambio pendiente
+    global revision
+    originales.setdefault(est["carnet"], anterior)
+    _acumular(pendientes, operacion, est, base)
+    if est["carnet"] not in pendientes:  # alta y baja que nunca llegaron al disco
+        del originales[est["carnet"]]
+    revision += 1
+    _hay_cambios.set()
+
+
+def _devolver(cambios, anteriores):
+    # Un lote que no se pudo escribir vuelve a quedar pendiente, antes que los
+    # cambios que llegaron mientras tanto
+    originales.update(anteriores)
+    posteriores = list(pendientes.values())
+    pendientes.clear()
+    for operacion, est, base in cambios + posteriores:
+        _acumular(pendientes, operacion, est, base)
+
+
+def _escribir_sqlite(cambios, anteriores):
+    # Conexión propia: las de sqlite3 no se comparten entre hilos
+    con = almacen_sqlite.conectar()
+    try:
+        guardar = [est for operacion, est, _ in cambios if operacion != "eliminar"]
+        if guardar:
+            almacen_sqlite.guardar_lote(con, guardar)
+        for operacion, est, _ in cambios:
+            if operacion == "eliminar":
+                almacen_sqlite.eliminar_estudiante(con, est["carnet"])
+    finally:
+        con.close()
+    with cn.bloqueo_datos():
+        cn.registrar_historial(list(estudiantes), cambios, anteriores)
+
+
+async def volcar():
+    """Escribe los cambios pendientes en un hilo. Si otra sesión escribió
+    entretanto, fusiona en memoria con el disco y vuelve a intentar."""
+    global revision
+    loop = asyncio.get_running_loop()
+    async with _volcando:
+        while pendientes:
+            cambios = list(pendientes.values())
+            pendientes.clear()
+            anteriores = {est["carnet"]: originales.pop(est["carnet"], None) for _, est, _ in cambios}
+            try:
+                if cn.ALMACENAMIENTO == "sqlite":
+                    await loop.run_in_executor(None, _escribir_sqlite, cambios, anteriores)
+                    continue
+                version, disco = await loop.run_in_executor(
+                    None, cn.escribir_cambios, list(estudiantes), cambios,
+                    cn.version_cargada, dict(cn.agregados), anteriores)
+            except BaseException:
+                _devolver(cambios, anteriores)
+                raise
+            cn.version_cargada = version
+            if disco is None:
+                continue
+            # Se fusiona también lo que llegó mientras se escribía
+            _devolver(cambios, anteriores)
+            del cn.conflictos[:]
+            cn.cedulas_en_conflicto.clear()
+            aceptados = cn.fusionar(estudiantes, list(pendientes.values()), disco)
+            pendientes.clear()
+            for operacion, est, base in aceptados:
+                pendientes[est["carnet"]] = (operacion, est, base)
+            for carnet in set(originales) - set(pendientes):
+                del originales[carnet]
+            revision += 1
+            for carnet in cn.conflictos:
+                if carnet in cn.cedulas_en_conflicto:
+                    print(f" Conflicto: la cédula de {carnet} la registró {cn.cedulas_en_conflicto[carnet]} "
+                          f"en otra sesión; no se guardó.", file=sys.stderr)
+                else:
+                    print(f" Conflicto: {carnet} fue modificado en otra sesión; se conserva esa versión.",
+                          file=sys.stderr)
+
+
+async def guardado_diferido(demora):
+    while True:
+        await _hay_cambios.wait()
+        if not _cerrando:
+            await asyncio.sleep(demora)
+        _hay_cambios.clear()
+        try:
+            await volcar()
+        except OSError as e:
+            print(f" Error al guardar: {e}", file=sys.stderr)
+            if not _cerrando:
+                _hay_cambios.set()  # se reintenta en la próxima vuelta
+        if _cerrando:
+            return
+
+
+# ---------- OPERACIONES ----------
+
+def _entero(consulta, nombre, defecto):
+    valor = consulta.get(nombre, "")
+    if not valor:
+        return defecto
+    if not valor.isdigit() or int(valor) < 1:
+        raise ValueError(f"'{nombre}' debe ser un entero positivo.")
+    return int(valor)
+
+
+def listar(consulta):
+    pagina = _entero(consulta, "pagina", 1)
+    tamano = min(_entero(consulta, "tamano", cn.TAMANO_PAGINA), TAMANO_MAXIMO_PAGINA)
+    # Por defecto, por carnet: el orden de la lista cambia con cada baja
+    # (quitar_estudiante mueve el último al hueco) y las páginas se moverían
+    criterio = consulta.get("orden", "carnet")
+    if criterio not in cn.ORDENES.values():
+        return 400, {"error": f"Orden inválido. Opciones: {', '.join(cn.ORDENES.values())}."}
+    inicio = (pagina - 1) * tamano
+
+    if consulta.get("q"):
+        carnets = cn.indice_texto(estudiantes).buscar(consulta["q"])
+        carnets = sorted(carnets, key=lambda c: cn.clave_orden(criterio, cn.obtener_estudiante(estudiantes, c)))
+        total = len(carnets)
+        pagina_actual = [cn.obtener_estudiante(estudiantes, c) for c in carnets[inicio:inicio + tamano]]
+    else:
+        orden = cn.indice_orden(estudiantes, criterio)
+        total = len(orden)
+        pagina_actual = [cn.obtener_estudiante(estudiantes, c) for _, c in orden[inicio:inicio + tamano]]
+    return 200, {
+        "total": total, "pagina": pagina, "tamano": tamano,
+        "paginas": (total + tamano - 1) // tamano, "estudiantes": pagina_actual,
+    }
+
+
+def obtener(carnet):
+    est = cn.obtener_estudiante(estudiantes, carnet)
+    if est is None:
+        return 404, {"error": "No se encontró un estudiante con ese carnet."}
+    return 200, est
+
+
+def crear(datos):
+    if not isinstance(datos, dict):
+        return 400, {"error": "Se esperaba un objeto JSON con los datos del estudiante."}
+    est, error = importacion_masiva.validar_fila(datos)
+    if error:
+        return 400, {"error": error}
+    try:
+        cn.comprobar_unicos(est["carnet"], est["cedula"])
+    except ValueError as e:
+        return 409, {"error": str(e)}
+    base = _base(est["carnet"])
+    est["version"] = (base or 0) + 1
+    cn.insertar_estudiante(estudiantes, est)
+    cn.sumar_agregados(est)
+    _registrar("agregar", est, base)
+    return 201, est
+
+
+def actualizar(carnet, datos):
+    actual = cn.obtener_estudiante(estudiantes, carnet)
+    if actual is None:
+        return 404, {"error": "No se encontró un estudiante con ese carnet."}
+    if not isinstance(datos, dict):
+        return 400, {"error": "Se esperaba un objeto JSON con los campos a cambiar."}
+    if datos.get("carnet", carnet) != carnet:
+        return 400, {"error": "El carnet no se puede cambiar."}
+    fila = {campo: actual[campo] for campo in importacion_masiva.ORDEN_CAMPOS if campo in actual}
+    fila.update((campo, datos[campo]) for campo in importacion_masiva.ORDEN_CAMPOS if campo in datos)
+    est, error = importacion_masiva.validar_fila(fila)
+    if error:
+        return 400, {"error": error}
+
+    try:
+        cn.comprobar_unicos(cedula=est["cedula"], propio=carnet)
+    except ValueError as e:
+        return 409, {"error": str(e)}
+
+    # Se reemplaza el registro por uno nuevo en vez de modificarlo en sitio
+    base = _base(carnet)
+    est["version"] = (base or 0) + 1
+    cn.sumar_agregados(actual, -1)
+    cn.sumar_agregados(est)
+    cn.reemplazar_estudiante(estudiantes, est)
+    _registrar("actualizar", est, base, actual)
+    return 200, est
+
+
+def eliminar(carnet):
+    actual = cn.obtener_estudiante(estudiantes, carnet)
+    if actual is None:
+        return 404, {"error": "No se encontró un estudiante con ese carnet."}
+    base = _base(carnet)
+    cn.quitar_estudiante(estudiantes, carnet)
+    cn.sumar_agregados(actual, -1)
+    _registrar("eliminar", actual, base, actual)
+    return 200, {"eliminado": carnet}
+
+
+def promedio():
+    cantidad = cn.agregados["cantidad"]
+    return 200, {
+        "promedio": cn.agregados["suma"] / cantidad if cantidad else 0,
+        "notas": cantidad,
+        "estudiantes": cn.agregados["estudiantes"],
+    }
+
+
+async def reportes(consulta):
+    try:
+        import analitica_notas
+    except ImportError:
+        return 501, {"error": "Los reportes requieren NumPy (pip install numpy)."}
+    campos = [consulta["por"]] if consulta.get("por") else analitica_notas.AGRUPACIONES
+    if any(campo not in analitica_notas.AGRUPACIONES for campo in campos):
+        return 400, {"error": f"'por' debe ser uno de: {', '.join(analitica_notas.AGRUPACIONES)}."}
+
+    # Las columnas solo se reconstruyen si hubo cambios desde el último reporte
+    loop = asyncio.get_running_loop()
+    if _columnas["revision"] != revision:
+        version = revision
+        columnas = await loop.run_in_executor(None, analitica_notas.construir_columnas, list(estudiantes))
+        _columnas.update(revision=version, datos=columnas)
+    columnas = _columnas["datos"]
+    resultado = await loop.run_in_executor(
+        None, lambda: {campo: analitica_notas.estadisticas_por(columnas, campo) for campo in campos})
+    return 200, resultado
+
+
+async def mejores(consulta):
+    n = _entero(consulta, "n", 20)
+    peores = consulta.get("peores", "0") not in ("", "0", "false")
+    grupos = await asyncio.get_running_loop().run_in_executor(
+        None, cn.mejores_por_carrera, list(estudiantes), n, peores, consulta.get("carrera"))
+    return 200, {
+        carrera: [{"carnet": carnet, "nombre": nombre, "promedio": valor} for _, carnet, nombre, valor in filas]
+        for carrera, filas in grupos.items()
+    }
+
+
+# ---------- HTTP ----------
+
+async def despachar(metodo, destino, cuerpo):
+    partes = urlsplit(destino)
+    ruta = [unquote(p) for p in partes.path.split("/") if p]
+    consulta = {nombre: valores[-1] for nombre, valores in parse_qs(partes.query).items()}
+    datos = None
+    if cuerpo:
+        try:
+            datos = json.loads(cuerpo)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return 400, {"error": "El cuerpo no es JSON válido."}
+
+    try:
+        if ruta == ["estudiantes"]:
+            if metodo == "GET":
+                return listar(consulta)
+            if metodo == "POST":
+                return crear(datos)
+        elif len(ruta) == 2 and ruta[0] == "estudiantes":
+            if metodo == "GET":
+                return obtener(ruta[1])
+            if metodo in ("PUT", "PATCH"):
+                return actualizar(ruta[1], datos)
+            if metodo == "DELETE":
+                return eliminar(ruta[1])
+        elif ruta == ["promedio"]:
+            if metodo == "GET":
+                return promedio()
+        elif ruta == ["reportes"]:
+            if metodo == "GET":
+                return await reportes(consulta)
+        elif ruta == ["mejores"]:
+            if metodo == "GET":
+                return await mejores(consulta)
+        else:
+            return 404, {"error": "Ruta no encontrada."}
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    except Exception:
+        # Un error inesperado no debe cerrar la conexión ni tumbar al servidor
+        traceback.print_exc()
+        return 500, {"error": "Error interno del servidor."}
+    return 405, {"error": "Método no permitido."}
+
+
+def _respuesta(estado, datos, seguir):
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+    cabecera = (
+        f"HTTP/1.1 {estado} {ESTADOS[estado]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if seguir else 'close'}\r\n\r\n"
+    )
+    return cabecera.encode("latin-1") + cuerpo
+
+
+async def atender(reader, writer):
+    # Una conexión puede traer varias peticiones seguidas (keep-alive)
+    try:
+        while True:
+            try:
+                cabecera = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            lineas = cabecera.decode("latin-1").split("\r\n")
+            cabeceras = {}
+            for linea in lineas[1:]:
+                nombre, _, valor = linea.partition(":")
+                if nombre:
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+            try:
+                metodo, destino, protocolo = lineas[0].split(" ")
+                largo = int(cabeceras.get("content-length") or 0)
+            except ValueError:
+                writer.write(_respuesta(400, {"error": "Petición mal formada."}, False))
+                return
+            if largo > TAMANO_MAXIMO_CUERPO:
+                writer.write(_respuesta(413, {"error": "Cuerpo demasiado grande."}, False))
+                return
+            cuerpo = await reader.readexactly(largo) if largo else b""
+
+            seguir = protocolo == "HTTP/1.1" and cabeceras.get("connection", "").lower() != "close"
+            estado, datos = await despachar(metodo, destino, cuerpo)
+            writer.write(_respuesta(estado, datos, seguir))
+            await writer.drain()
+            if not seguir:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def servir(host, puerto, demora):
+    global estudiantes, _hay_cambios, _volcando, _cerrando
+    _hay_cambios = asyncio.Event()
+    _volcando = asyncio.Lock()
+    estudiantes = cn.cargar_estudiantes()
+    cn.cargar_agregados(estudiantes)
+
+    servidor = await asyncio.start_server(atender, host, puerto)
+    guardado = asyncio.create_task(guardado_diferido(demora))
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError):  # Windows
+        pass
+    print(f"\n API de notas en http://{host}:{puerto}/ ({len(estudiantes)} estudiantes). Ctrl+C para salir.\n")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        # Se guarda lo pendiente antes de salir
+        _cerrando = True
+        _hay_cambios.set()
+        await guardado
+        print("\n Cambios guardados. Servidor detenido.\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local sobre los datos de control_notas.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--demora", type=float, default=DEMORA_GUARDADO,
+                        help="segundos que se acumulan los cambios antes de guardarlos")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.demora))
+    except (KeyboardInterrupt, asyncio.CancelledError):  # Ctrl+C o SIGTERM
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# ==========================================
+# MOTOR DE VALIDACIÓN POR COLUMNAS
+# Universidad Nacional Autónoma de Nicaragua - León
+# ==========================================
+# Valida columnas completas de valores con patrones precompilados y, en vez de
+# lanzar una excepción por cada valor, devuelve los valores normalizados junto
+# con un código de error por fila (None si el valor es válido).
+# Las funciones validar_* de control_notas.py son envolturas de este módulo.
+# ==========================================
+
+import re
+
+_CARNET = re.compile(r"^\d{2}-\d{5}-\d$").match
+_CEDULA = re.compile(r"^\d{3}-\d{6}-\d{4}[A-Z]$").match
+_ENTERO = re.compile(r"^[0-9]+$").match
+_NUMERO = re.compile(r"^\s*[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\s*$").match
+
+ESTADOS_CIVILES = frozenset(["soltero", "casado", "divorciado", "viudo"])
+SEXOS = frozenset(["M", "F"])
+
+# Códigos de error -> mensaje mostrado al usuario
+MENSAJES = {
+    "carnet": "Carnet inválido. Ejemplo válido: 25-02395-0",
+    "estado_civil": "Estado civil inválido. Opciones: Soltero, Casado, Divorciado, Viudo.",
+    "sexo": "Sexo inválido. Debe ser M o F.",
+    "cedula": "Cédula inválida. Ejemplo válido: 001-123456-0000A",
+    "anio": "Año inválido. Debe estar entre 1 y 6.",
+    "nota": "Nota inválida. Debe estar entre 0 y 100.",
+    "ingreso_padre": "Monto inválido. Debe ser un número positivo.",
+    "carnet_repetido": "El carnet ya está registrado.",
+    "cedula_repetida": "La cédula ya está registrada para otro estudiante.",
+}
+
+
+# ---------- VALIDADORES DE COLUMNA ----------
+# Cada uno recibe una lista de cadenas y devuelve (valores, errores).
+
+def columna_carnet(valores):
+    errores = [None if _CARNET(v) else "carnet" for v in valores]
+    return list(valores), errores
+
+
+def columna_cedula(valores):
+    errores = [None if _CEDULA(v) else "cedula" for v in valores]
+    return list(valores), errores
+
+
+def columna_estado_civil(valores):
+    errores = [None if v.lower() in ESTADOS_CIVILES else "estado_civil" for v in valores]
+    return [v.capitalize() for v in valores], errores
+
+
+def columna_sexo(valores):
+    normalizados = [v.upper() for v in valores]
+    errores = [None if v in SEXOS else "sexo" for v in normalizados]
+    return normalizados, errores
+
+
+def columna_anio(valores):
+    normalizados, errores = [], []
+    for v in valores:
+        anio = int(v) if _ENTERO(v) else 0
+        normalizados.append(anio)
+        errores.append(None if 1 <= anio <= 6 else "anio")
+    return normalizados, errores
+
+
+def _columna_numero(valores, minimo, maximo, codigo):
+    normalizados, errores = [], []
+    for v in valores:
+        numero = float(v) if _NUMERO(v) else None
+        normalizados.append(numero)
+        if numero is None or numero < minimo or (maximo is not None and numero > maximo):
+            errores.append(codigo)
+        else:
+            errores.append(None)
+    return normalizados, errores
+
+
+def columna_nota(valores):
+    return _columna_numero(valores, 0, 100, "nota")
+
+
+def columna_ingreso(valores):
+    return _columna_numero(valores, 0, None, "ingreso_padre")
+
+
+VALIDADORES = {
+    "carnet": columna_carnet,
+    "estado_civil": columna_estado_civil,
+    "sexo": columna_sexo,
+    "cedula": columna_cedula,
+    "anio": columna_anio,
+    "nota": columna_nota,
+    "ingreso_padre": columna_ingreso,
+}
+
+
+# ---------- API ----------
+
+def validar_columnas(columnas):
+    """Valida un diccionario campo -> lista de cadenas (todas del mismo largo).
+
+    Devuelve (normalizadas, mascara, errores): las columnas con los valores
+    convertidos, una lista de booleanos con las filas válidas y, por fila, la
+    lista de códigos de error encontrados.
+    """
+    filas = len(next(iter(columnas.values()), []))
+    normalizadas = {}
+    errores = [[] for _ in range(filas)]
+    for campo, valores in columnas.items():
+        validador = VALIDADORES.get(campo)
+        if validador is None:
+            normalizadas[campo] = list(valores)
+            continue
+        normalizadas[campo], codigos = validador(valores)
+        for i, codigo in enumerate(codigos):
+            if codigo is not None:
+                errores[i].append(codigo)
+    mascara = [not e for e in errores]
+    return normalizadas, mascara, errores
+
+
+def validar(campo, valor):
+    """Valida un solo valor. Devuelve (valor normalizado, código de error o None)."""
+    valores, errores = VALIDADORES[campo]([valor])
+    return valores[0], errores[0]